@@ -0,0 +1,256 @@
+"""
+Description:    Asyncio (ASGI) variant of the server where each player holds one WebSocket connection for the whole game.
+                Commands and events are multiplexed over it, and events are pushed the moment the game enqueues them
+                instead of being polled for. An idle connection only costs a coroutine rather than a thread, and there
+                is no per-request connection or HTTP parsing. It has no dependencies beyond an ASGI server, ex.
+                uvicorn asgi:app --port 5000
+Date:           12/13/2023
+Author:         Jordan Bourdeau
+"""
+
+from game_logic.commands import COMMANDS, run_batch, run_command
+from game_logic.constants import DEFAULT_ROOM_ID
+from game_logic.game import Game
+from game_logic.game_registry import GameRegistry
+from game_logic.game_store import GameStore
+
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qs
+
+import asyncio
+import json
+import os
+
+# Path of the SQLite database rooms are persisted to. Rooms are only kept in memory if it isn't set.
+DATABASE_PATH: str = os.environ.get("MONOPOLY_DATABASE_PATH")
+# WebSocket close code sent when the room doesn't exist (or was closed)
+ROOM_NOT_FOUND: int = 4404
+
+
+class _Connection:
+
+    def __init__(self, game: Game, room_id: str, player_id: str, send: Callable[[dict], Awaitable[None]]) -> None:
+        """
+        Description:        State of a single player's WebSocket connection.
+        :param game:        Game for the room the connection is in.
+        :param room_id:     ID of the room.
+        :param player_id:   ID of the player, or the empty string until they register over the connection.
+        :param send:        ASGI send callable.
+        :returns:           None.
+        """
+        self.game: Game = game
+        self.room_id: str = room_id
+        self.player_id: str = player_id
+        self._send: Callable[[dict], Awaitable[None]] = send
+        # Replies and pushed events are sent from different tasks, so sends are serialized
+        self._send_lock: asyncio.Lock = asyncio.Lock()
+        # Set whenever there may be events for the player
+        self.wakeup: asyncio.Event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+    def listener(self, target_ids: list[str]) -> None:
+        # Called by the game while it is locked (possibly from another thread), so it only schedules the wakeup
+        if self.player_id and (target_ids is None or self.player_id in target_ids):
+            self._loop.call_soon_threadsafe(self.wakeup.set)
+
+    async def send(self, message: dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self._send({"type": "websocket.send", "text": json.dumps(message)})
+
+
+class GameServer:
+
+    def __init__(self, registry: GameRegistry) -> None:
+        """
+        Description:        ASGI application hosting the rooms of a registry over WebSockets. Players connect to
+                            /ws?room_id=<room_id>&player_id=<player_id> (leaving out the player ID to register over the
+                            connection) and send commands as JSON objects. /room/create and /room/list are also served
+                            over HTTP.
+        :param registry:    Registry of the rooms being hosted.
+        :returns:           None.
+        """
+        self.registry: GameRegistry = registry
+
+    async def __call__(self, scope: dict, receive: Callable[[], Awaitable[dict]],
+                       send: Callable[[dict], Awaitable[None]]) -> None:
+        match scope["type"]:
+            case "lifespan":
+                await self._lifespan(receive, send)
+            case "http":
+                await self._http(scope, send)
+            case "websocket":
+                await self._websocket(scope, receive, send)
+
+    """ Private Helper Methods """
+
+    async def _lifespan(self, receive: Callable[[], Awaitable[dict]], send: Callable[[dict], Awaitable[None]]) -> None:
+        while True:
+            message: dict = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.registry.store is not None:
+                    self.registry.store.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: dict, send: Callable[[dict], Awaitable[None]]) -> None:
+        """
+        Description:    Method handling plain HTTP requests, which are only used to open and find rooms.
+        :param scope:   ASGI connection scope.
+        :param send:    ASGI send callable.
+        :return:        None.
+        """
+        query: dict[str, list[str]] = parse_qs(scope.get("query_string", b"").decode())
+        match scope["path"]:
+            case "/room/create":
+                room_id: str = query.get("room_id", [None])[0]
+                room_id = self.registry.create(room_id.lower() if room_id else None)
+                status, body = 200, {"event": "createRoom", "roomId": room_id, "success": room_id != ""}
+            case "/room/list":
+                status, body = 200, {"event": "listRooms", "rooms": self.registry.list_rooms(), "success": True}
+            case _:
+                status, body = 404, {"success": False}
+        data: bytes = json.dumps(body).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]})
+        await send({"type": "http.response.body", "body": data})
+
+    async def _websocket(self, scope: dict, receive: Callable[[], Awaitable[dict]],
+                         send: Callable[[dict], Awaitable[None]]) -> None:
+        """
+        Description:    Method handling a player's connection for as long as it is open. Commands are run in the order
+                        they arrive while a separate task pushes the player's events.
+        :param scope:   ASGI connection scope.
+        :param receive: ASGI receive callable.
+        :param send:    ASGI send callable.
+        :return:        None.
+        """
+        if (await receive())["type"] != "websocket.connect":
+            return
+        query: dict[str, list[str]] = parse_qs(scope.get("query_string", b"").decode())
+        room_id: str = query.get("room_id", [DEFAULT_ROOM_ID])[0].lower()
+        player_id: str = query.get("player_id", [""])[0].lower()
+        game: Game = self.registry.get(room_id)
+        if game is None or (player_id and player_id not in game.players):
+            await send({"type": "websocket.close", "code": ROOM_NOT_FOUND})
+            return
+        await send({"type": "websocket.accept"})
+        connection: _Connection = _Connection(game, room_id, player_id, send)
+        game.add_listener(connection.listener)
+        pusher: asyncio.Task = asyncio.create_task(self._push_events(connection))
+        # Send anything the player missed while they were disconnected
+        connection.wakeup.set()
+        try:
+            while True:
+                message: dict = await receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message["type"] != "websocket.receive":
+                    continue
+                if not await self._handle(connection, message.get("text") or message.get("bytes")):
+                    await send({"type": "websocket.close", "code": ROOM_NOT_FOUND})
+                    break
+        finally:
+            connection.game.remove_listener(connection.listener)
+            pusher.cancel()
+
+    async def _handle(self, connection: _Connection, text: str | bytes) -> bool:
+        """
+        Description:        Method which runs a command from a player and replies with its result. The reply echoes the
+                            command's `id` so clients can match replies to commands.
+        :param connection:  Connection the command was sent over.
+        :param text:        JSON-encoded command.
+        :return:            False if the room no longer exists and the connection should be closed. True otherwise.
+        """
+        try:
+            command: dict[str, Any] = json.loads(text)
+            if not isinstance(command, dict):
+                raise ValueError("Commands must be objects")
+        except (TypeError, ValueError) as e:
+            await connection.send({"event": None, "success": False})
+            return True
+        # Commands wait on the game's locks and persisting them writes to the database, so they are run on a worker
+        # thread rather than stalling every other connection on the event loop
+        reply: dict[str, Any] = await asyncio.to_thread(self._run, connection, command)
+        if reply is None:
+            return False
+        if "id" in command:
+            reply["id"] = command["id"]
+        await connection.send(reply)
+        return True
+
+    def _run(self, connection: _Connection, command: dict[str, Any]) -> dict[str, Any]:
+        """
+        Description:        Method which runs a command and persists what it changed. Blocks, so it is run off the
+                            event loop.
+        :param connection:  Connection the command was sent over.
+        :param command:     Decoded command.
+        :return:            Reply to the command, or None if the room no longer exists.
+        """
+        # Keeps the room from being evicted while it is being played over the connection
+        if self.registry.get(connection.room_id) is not connection.game:
+            return None
+        game: Game = connection.game
+        name: str = command.get("command")
+        if name == "register_player":
+            reply: dict[str, Any] = self._register(connection, command.get("display_name"))
+        elif name == "data":
+            reply = self._data(connection, command.get("since"))
+        elif name == "batch" and connection.player_id and isinstance(command.get("commands"), list):
+            results: list[dict[str, Any]] = run_batch(game, connection.player_id, command["commands"])
+            reply = {"event": "batch", "results": results, "success": all(result["success"] for result in results)}
+        elif name in COMMANDS and connection.player_id:
+            reply = run_command(game, connection.player_id, command)
+        else:
+            reply = {"event": name, "success": False}
+        if self.registry.store is not None:
+            self.registry.persist(connection.room_id)
+        return reply
+
+    @staticmethod
+    def _register(connection: _Connection, display_name: str) -> dict[str, Any]:
+        if connection.player_id or not isinstance(display_name, str):
+            return {"event": "registerPlayer", "playerId": "", "success": False}
+        player_id: str = connection.game.register_player(display_name)
+        if player_id != "":
+            connection.player_id = player_id
+            # The events from joining were enqueued before the connection knew the player ID. Called off the event
+            # loop, so the wakeup is scheduled onto it.
+            connection.listener(None)
+        return {"event": "registerPlayer", "playerId": player_id, "success": player_id != ""}
+
+    @staticmethod
+    def _data(connection: _Connection, since: Any) -> dict[str, Any]:
+        game: Game = connection.game
+        if connection.player_id not in game.players:
+            return {"event": "data", "success": False}
+        with game.lock.read():
+            reply: dict[str, Any] = {"event": "data", "success": True}
+            if since == game.version:
+                reply["version"] = game.version
+                reply["unchanged"] = True
+            else:
+                reply.update(game.to_dict(since=since if isinstance(since, int) else None))
+        return reply
+
+    @staticmethod
+    async def _push_events(connection: _Connection) -> None:
+        """
+        Description:        Task which sends a player their events whenever the game enqueues some for them.
+        :param connection:  Connection of the player.
+        :return:            None.
+        """
+        while True:
+            await connection.wakeup.wait()
+            connection.wakeup.clear()
+            events: list[dict] = connection.game.flush_events(connection.player_id)
+            if len(events) > 0:
+                await connection.send({"event": "events", "events": events})
+
+
+# Every table being hosted by this process. The default room is kept around for clients which don't pass a room ID.
+registry: GameRegistry = GameRegistry(store=GameStore(DATABASE_PATH) if DATABASE_PATH else None)
+registry.restore()
+registry.create(DEFAULT_ROOM_ID, pinned=True)
+app: GameServer = GameServer(registry)
@@ -0,0 +1,72 @@
+"""
+Description:    Micro-benchmark comparing the per-event cost of serializing events for every player before and after
+                caching camelCase keys and memoizing the serialized form.
+                Run from the repository root with: python -m server.benchmarks.event_serialize_benchmark
+Date:           12/04/2023
+Author:         Jordan Bourdeau
+"""
+
+from server.game_logic.constants import MAX_NUM_PLAYERS
+from server.game_logic.event import Event
+
+import timeit
+
+NUM_EVENTS: int = 10000
+REPEAT: int = 5
+
+
+def legacy_serialize(parameters: dict) -> dict:
+    """
+    Description:        Original implementation which converts every key on every call.
+    :param parameters:  Event parameters.
+    :return:            Dictionary of camelCase keys to the appropriate values.
+    """
+    def to_camel_case(in_str: str) -> str:
+        temp = in_str.split("_")
+        return temp[0] + "".join(i.title() for i in temp[1:])
+    return {to_camel_case(key): val for key, val in parameters.items()}
+
+
+def make_events() -> list[Event]:
+    """
+    Description:    Helper building a batch of events shaped like the ones the game enqueues.
+    :return:        List of events.
+    """
+    return [Event({
+        "type": "showRent",
+        "property_name": "Boardwalk",
+        "active_player_name": "player1",
+        "landlord_name": "player2",
+        "amount": n
+    }) for n in range(NUM_EVENTS)]
+
+
+def main() -> None:
+    # Every event is flushed once per player
+    def before():
+        for event in events:
+            for _ in range(MAX_NUM_PLAYERS):
+                legacy_serialize(event.parameters)
+
+    def after():
+        for event in events:
+            for _ in range(MAX_NUM_PLAYERS):
+                event.serialize()
+
+    events: list[Event] = make_events()
+    before_time: float = min(timeit.repeat(before, number=1, repeat=REPEAT))
+    after_times: list[float] = []
+    for _ in range(REPEAT):
+        # Fresh events each round so the memoized form is built once per event rather than reused across rounds
+        events = make_events()
+        after_times.append(timeit.timeit(after, number=1))
+    after_time: float = min(after_times)
+
+    print(f"{NUM_EVENTS} events x {MAX_NUM_PLAYERS} players")
+    print(f"Before: {before_time / NUM_EVENTS * 1e6:.2f} us/event")
+    print(f"After:  {after_time / NUM_EVENTS * 1e6:.2f} us/event")
+    print(f"Speedup: {before_time / after_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Description:    Benchmark of the memory held per room with thousands of rooms resident, along with the size of the
+                objects made for every action and the time taken to create a game.
+                Run from the repository root with: python -m server.benchmarks.memory_benchmark
+Date:           12/15/2023
+Author:         Jordan Bourdeau
+"""
+
+from server.game_logic.constants import MIN_NUM_PLAYERS
+from server.game_logic.event import Event
+from server.game_logic.game import Game
+from server.game_logic.game_registry import GameRegistry
+from server.game_logic.player_updates import MoneyUpdate
+from server.game_logic.roll import Roll
+
+import contextlib
+import gc
+import io
+import sys
+import timeit
+import tracemalloc
+
+NUM_ROOMS: int = 2000
+NUM_CREATIONS: int = 5000
+
+
+def shallow_size(instance: object) -> int:
+    # Instances without slots also carry a dictionary of their attributes
+    return sys.getsizeof(instance) + (sys.getsizeof(instance.__dict__) if hasattr(instance, "__dict__") else 0)
+
+
+def main() -> None:
+    registry: GameRegistry = GameRegistry(max_rooms=NUM_ROOMS)
+    gc.collect()
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    # Rolling prints the roll
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(NUM_ROOMS):
+            game = registry.get(registry.create())
+            player_ids: list[str] = [game.register_player(f"player{n}") for n in range(MIN_NUM_PLAYERS)]
+            game.start_game(player_ids[0])
+            game.roll_dice(game.active_player_id)
+    gc.collect()
+    per_room: float = (tracemalloc.get_traced_memory()[0] - before) / NUM_ROOMS
+    tracemalloc.stop()
+
+    print(f"{NUM_ROOMS} rooms: {per_room / 1024:.1f} KiB per room, {per_room * NUM_ROOMS / 2 ** 20:.1f} MiB total")
+    print(f"Player: {shallow_size(game.players[player_ids[0]])} bytes, tile: {shallow_size(game.tiles[1])} bytes, "
+          f"event: {shallow_size(Event({'type': 'showRoll'}))} bytes, roll: {shallow_size(Roll(1, 2))} bytes, "
+          f"update: {shallow_size(MoneyUpdate(1))} bytes")
+    # Best of several runs since creation is short enough to be thrown off by anything else running
+    creation: float = min(timeit.repeat(Game, number=NUM_CREATIONS, repeat=5)) / NUM_CREATIONS
+    print(f"Game creation: {creation * 10 ** 6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
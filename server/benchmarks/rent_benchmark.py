@@ -0,0 +1,53 @@
+"""
+Description:    Benchmark of AssetTile.rent lookups per second using the flat RENT_TABLE, compared against the nested
+                RENTS dictionary lookups it replaced, over every asset tile of a game in its middle stages.
+                Run from the repository root with: python -m server.benchmarks.rent_benchmark
+Date:           12/14/2023
+Author:         Jordan Bourdeau
+"""
+
+from server.game_logic.asset_tile import AssetTile
+from server.game_logic.constants import RENTS
+from server.game_logic.simulate import AlwaysBuyBot, CashThresholdBot, MonopolySeekerBot, Simulation
+
+import timeit
+
+NUMBER: int = 10000
+REPEAT: int = 5
+
+
+def nested_rent(tile: AssetTile) -> int:
+    # The lookup AssetTile.rent used to do
+    if tile.is_mortgaged or tile.owner is None:
+        return 0
+    rent: dict = RENTS.get(tile.id, None)
+    if rent is not None:
+        rent = rent.get(tile.status)
+    return rent if rent is not None else -1
+
+
+def main() -> None:
+    simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(), MonopolySeekerBot()], seed=0,
+                                        max_turns=150)
+    simulation.run()
+    tiles: list[AssetTile] = [tile for tile in simulation.game.tiles if isinstance(tile, AssetTile)]
+    assert [tile.rent for tile in tiles] == [nested_rent(tile) for tile in tiles]
+
+    def table_lookups() -> None:
+        for tile in tiles:
+            tile.rent
+
+    def nested_lookups() -> None:
+        for tile in tiles:
+            nested_rent(tile)
+
+    lookups: int = NUMBER * len(tiles)
+    table_time: float = min(timeit.repeat(table_lookups, number=NUMBER, repeat=REPEAT))
+    nested_time: float = min(timeit.repeat(nested_lookups, number=NUMBER, repeat=REPEAT))
+    print(f"Rent table:   {lookups / table_time / 1e6:.2f}M lookups/s")
+    print(f"Nested dicts: {lookups / nested_time / 1e6:.2f}M lookups/s")
+    print(f"{nested_time / table_time:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
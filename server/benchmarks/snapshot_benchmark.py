@@ -0,0 +1,48 @@
+"""
+Description:    Benchmark comparing the size and speed of binary snapshots against the JSON state from Game.to_dict()
+                for a game in its middle stages.
+                Run from the repository root with: python -m server.benchmarks.snapshot_benchmark
+Date:           12/10/2023
+Author:         Jordan Bourdeau
+"""
+
+from server.game_logic.game import Game
+from server.game_logic.simulate import AlwaysBuyBot, CashThresholdBot, MonopolySeekerBot, Simulation
+from server.game_logic.snapshot import from_bytes, to_bytes
+
+import json
+import timeit
+
+NUMBER: int = 1000
+REPEAT: int = 5
+
+
+def main() -> None:
+    simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(), MonopolySeekerBot()], seed=0,
+                                        max_turns=150)
+    simulation.run()
+    game: Game = simulation.game
+
+    def encode_json() -> str:
+        # Clear the cached client bindings so every round builds the state from scratch like a cold room would
+        for player in game.players.values():
+            player._dirty = True
+        for tile in game.tiles:
+            tile._dirty = True
+        return json.dumps(game.to_dict(), separators=(",", ":"))
+
+    state: str = encode_json()
+    snapshot: bytes = to_bytes(game)
+    json_time: float = min(timeit.repeat(encode_json, number=NUMBER, repeat=REPEAT)) / NUMBER
+    encode_time: float = min(timeit.repeat(lambda: to_bytes(game), number=NUMBER, repeat=REPEAT)) / NUMBER
+    decode_time: float = min(timeit.repeat(lambda: from_bytes(snapshot, headless=True), number=NUMBER,
+                                           repeat=REPEAT)) / NUMBER
+
+    print(f"JSON:     {len(state)} bytes, {json_time * 1e6:.1f} us to encode")
+    print(f"Snapshot: {len(snapshot)} bytes, {encode_time * 1e6:.1f} us to encode, {decode_time * 1e6:.1f} us to "
+          f"decode")
+    print(f"{len(state) / len(snapshot):.1f}x smaller, {json_time / encode_time:.1f}x faster to encode")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,23 @@ Date:           10/18/2023
 Author:         Jordan Bourdeau, Hayden Collins
 """
 
-from .constants import RENTS
+from .constants import RENT_TABLE
 from .player import Player
 from .tile import Tile
 from .types import AssetGroups, PropertyStatus, RailroadStatus, UtilityStatus
 
 from typing import Union
 
+# Status each group of tiles starts out with. Looked up rather than matched on since a board of tiles is made per game.
+DEFAULT_STATUS: dict[AssetGroups, Union[PropertyStatus, RailroadStatus, UtilityStatus]] = {
+    group: PropertyStatus.NO_MONOPOLY for group in AssetGroups
+}
+DEFAULT_STATUS[AssetGroups.UTILITY] = UtilityStatus.NO_MONOPOLY
+DEFAULT_STATUS[AssetGroups.RAILROAD] = RailroadStatus.UNOWNED
+
 
 class AssetTile(Tile):
+    __slots__ = ("price", "group", "_is_mortgaged", "mortage_price", "_status")
 
     def __init__(self, id: int, name: str, price: int, group: AssetGroups) -> None:
         """
@@ -26,17 +34,49 @@ class AssetTile(Tile):
         self.group: AssetGroups = group
 
         # Default values here
-        self.is_mortgaged: bool = False
+        self._is_mortgaged: bool = False
         self.mortage_price: int = int(price / 2)
 
-        self.status: Union[PropertyStatus, RailroadStatus, UtilityStatus]
-        match group:
-            case AssetGroups.UTILITY:
-                self.status = UtilityStatus.NO_MONOPOLY
-            case AssetGroups.RAILROAD:
-                self.status = RailroadStatus.UNOWNED
-            case _:
-                self.status = PropertyStatus.NO_MONOPOLY
+        self._status: Union[PropertyStatus, RailroadStatus, UtilityStatus] = DEFAULT_STATUS[group]
+
+    @Tile.owner.setter
+    def owner(self, owner: Player) -> None:
+        # Move the tile from the previous owner's net worth and group index to the new owner's
+        if self._owner is not None:
+            self._owner._release(self)
+        Tile.owner.fset(self, owner)
+        if owner is not None:
+            owner._acquire(self)
+
+    @property
+    def status(self) -> Union[PropertyStatus, RailroadStatus, UtilityStatus]:
+        """
+        Description:    Status of the tile used to determine rent (monopoly, number of improvements, etc.).
+        :return:        Enumeration value for the status.
+        """
+        return self._status
+
+    @status.setter
+    def status(self, status: Union[PropertyStatus, RailroadStatus, UtilityStatus]) -> None:
+        value: int = self.liquid_value
+        self._status = status
+        self._mark_dirty()
+        self._revalue(value)
+
+    @property
+    def is_mortgaged(self) -> bool:
+        """
+        Description:    Whether the tile is currently mortgaged.
+        :return:        True/False.
+        """
+        return self._is_mortgaged
+
+    @is_mortgaged.setter
+    def is_mortgaged(self, is_mortgaged: bool) -> None:
+        value: int = self.liquid_value
+        self._is_mortgaged = is_mortgaged
+        self._mark_dirty()
+        self._revalue(value)
 
     @property
     def rent(self) -> int:
@@ -45,14 +85,10 @@ class AssetTile(Tile):
         :return:        Returns integer value for rent or -1 if it could not be computed.
         """
         # No rent if the tile is unowned or mortgaged.
-        if self.is_mortgaged or self.owner is None:
+        if self._is_mortgaged or self._owner is None:
             return 0
-        # Otherwise, look up the cost in the rent map based on the number in the owner's list of assets.
-        else:
-            rent: dict = (RENTS.get(self.id, None))
-            if rent is not None:
-                rent = rent.get(self.status)
-            return rent if rent is not None else -1
+        # Otherwise, look up the cost in the rent table based on the tile's status.
+        return RENT_TABLE[self.id][self._status]
 
     @property
     def liquid_value(self) -> int:
@@ -96,8 +132,17 @@ class AssetTile(Tile):
     def unmortgage(self):
         self.is_mortgaged = False
 
-    def to_dict(self) -> dict:
-        state: dict = super().to_dict()
+    def _revalue(self, previous_value: int) -> None:
+        """
+        Description:            Method used to update the owner's net worth after the tile's liquid value changed.
+        :param previous_value:  Liquid value of the tile before the change.
+        :return:                None.
+        """
+        if self._owner is not None:
+            self._owner._asset_value += self.liquid_value - previous_value
+
+    def _make_client_bindings(self) -> dict:
+        state: dict = super()._make_client_bindings()
         state["price"] = self.price
         state["group"] = str(self.group.name)
         state["status"] = str(PropertyStatus(self.status).name)
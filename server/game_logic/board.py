@@ -0,0 +1,188 @@
+"""
+Description:    Immutable template of the board and card decks shared by every game. The static data (names, prices,
+                groups, tax amounts, card text) is defined once per process, and the tiles which never hold any state
+                are made once and shared by every board. Each game only makes the objects carrying its own state: the
+                asset tiles (owner, status, mortgage), the card tiles (which deck they draw from), and the cards (whether
+                they are in use).
+Date:           12/16/2023
+Author:         Jordan Bourdeau
+"""
+
+from .card_tile import CardTile
+from .cards import Card
+from .constants import CHANCE_TILES, INCOME_TAX, LUXURY_TAX, RAILROAD_COST, UTILITY_COST
+from .deck import Deck
+from .go_to_jail_tile import GoToJailTile
+from .improvable_tile import ImprovableTile
+from .player import Player
+from .railroad_tile import RailroadTile
+from .tax_tile import TaxTile
+from .tile import Tile
+from .types import AssetGroups
+from .utility_tile import UtilityTile
+
+from typing import NamedTuple
+
+import random
+
+
+class TileTemplate(NamedTuple):
+    # Static data of a tile. The price and group are only set for asset tiles, and the amount for tax tiles.
+    id: int
+    name: str
+    kind: type[Tile]
+    price: int = None
+    group: AssetGroups = None
+    amount: int = None
+
+
+BOARD: tuple[TileTemplate, ...] = (
+    TileTemplate(0, "Go", Tile),
+    TileTemplate(1, "Mediterranean Avenue", ImprovableTile, 60, AssetGroups.BROWN),
+    TileTemplate(2, "Community Chest", CardTile),
+    TileTemplate(3, "Baltic Avenue", ImprovableTile, 60, AssetGroups.BROWN),
+    TileTemplate(4, "Income Tax", TaxTile, amount=INCOME_TAX),
+    TileTemplate(5, "Reading Railroad", RailroadTile, RAILROAD_COST, AssetGroups.RAILROAD),
+    TileTemplate(6, "Oriental Avenue", ImprovableTile, 100, AssetGroups.LIGHT_BLUE),
+    TileTemplate(7, "Chance", CardTile),
+    TileTemplate(8, "Vermont Avenue", ImprovableTile, 100, AssetGroups.LIGHT_BLUE),
+    TileTemplate(9, "Connecticut Avenue", ImprovableTile, 120, AssetGroups.LIGHT_BLUE),
+    TileTemplate(10, "Jail", Tile),
+    TileTemplate(11, "St. Charles Place", ImprovableTile, 140, AssetGroups.PINK),
+    TileTemplate(12, "Electric Company", UtilityTile, UTILITY_COST, AssetGroups.UTILITY),
+    TileTemplate(13, "States Avenue", ImprovableTile, 140, AssetGroups.PINK),
+    TileTemplate(14, "Virginia Avenue", ImprovableTile, 160, AssetGroups.PINK),
+    TileTemplate(15, "Pennsylvania Railroad", RailroadTile, RAILROAD_COST, AssetGroups.RAILROAD),
+    TileTemplate(16, "St. James Place", ImprovableTile, 180, AssetGroups.ORANGE),
+    TileTemplate(17, "Community Chest", CardTile),
+    TileTemplate(18, "Tennessee Avenue", ImprovableTile, 180, AssetGroups.ORANGE),
+    TileTemplate(19, "New York Avenue", ImprovableTile, 200, AssetGroups.ORANGE),
+    TileTemplate(20, "Free Parking", Tile),
+    TileTemplate(21, "Kentucky Avenue", ImprovableTile, 220, AssetGroups.RED),
+    TileTemplate(22, "Chance", CardTile),
+    TileTemplate(23, "Indiana Avenue", ImprovableTile, 220, AssetGroups.RED),
+    TileTemplate(24, "Illinois Avenue", ImprovableTile, 240, AssetGroups.RED),
+    TileTemplate(25, "B & O Railroad", RailroadTile, RAILROAD_COST, AssetGroups.RAILROAD),
+    TileTemplate(26, "Atlantic Avenue", ImprovableTile, 260, AssetGroups.YELLOW),
+    TileTemplate(27, "Ventnor Avenue", ImprovableTile, 260, AssetGroups.YELLOW),
+    TileTemplate(28, "Water Works", UtilityTile, UTILITY_COST, AssetGroups.UTILITY),
+    TileTemplate(29, "Marvin Gardens", ImprovableTile, 280, AssetGroups.YELLOW),
+    TileTemplate(30, "Go to Jail", GoToJailTile),
+    TileTemplate(31, "Pacific Avenue", ImprovableTile, 300, AssetGroups.GREEN),
+    TileTemplate(32, "North Carolina Avenue", ImprovableTile, 300, AssetGroups.GREEN),
+    TileTemplate(33, "Community Chest", CardTile),
+    TileTemplate(34, "Pennsylvania Avenue", ImprovableTile, 320, AssetGroups.GREEN),
+    TileTemplate(35, "Short Line Railroad", RailroadTile, RAILROAD_COST, AssetGroups.RAILROAD),
+    TileTemplate(36, "Chance", CardTile),
+    TileTemplate(37, "Park Place", ImprovableTile, 350, AssetGroups.DARK_BLUE),
+    TileTemplate(38, "Luxury Tax", TaxTile, amount=LUXURY_TAX),
+    TileTemplate(39, "Boardwalk", ImprovableTile, 400, AssetGroups.DARK_BLUE)
+)
+
+CHANCE_CARDS: tuple[str, ...] = (
+    "Advance to Boardwalk",
+    "Advance to Go (Collect $200)",
+    "Advance to Illinois Avenue. If you pass Go, collect $200",
+    "Advance to St. Charles Place. If you pass Go, collect $200",
+    "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. "
+    "If owned, pay owner twice the rental to which they are otherwise entitled",
+    "Advance to the nearest Railroad. If unowned, you may buy it from the Bank. "
+    "If owned, pay owner twice the rental to which they are otherwise entitled",
+    "Advance token to nearest Utility. If unowned, you may buy it from the Bank. "
+    "If owned, throw dice and pay owner a total ten times the amount thrown.",
+    "Bank pays you a dividend of $50",
+    "Get Out of Jail Free",
+    "Go Back 3 Spaces",
+    "Go to Jail. Go directly to Jail, do not pass Go, do not collect $200",
+    "Make general repairs on all your property. For each house pay $25. For each hotel pay $100",
+    "Speeding fine $15",
+    "Take a trip to Reading Railroad. If you pass Go, collect $200",
+    "You have been elected Chairman of the Board. Pay each player $50",
+    "Your building loan matures. Collect $150"
+)
+
+COMMUNITY_CHEST_CARDS: tuple[str, ...] = (
+    "Advance to Go (Collect $200)",
+    "Bank error in your favor. Collect $200",
+    "Doctor’s fee. Pay $50",
+    "From the sale of stock, you get $50",
+    "Get Out of Jail Free",
+    "Go to Jail. Go directly to jail, do not pass Go, do not collect $200",
+    "Holiday fund matures. Receive $100",
+    "Income tax refund. Collect $20",
+    "It is your birthday. Collect $10 from every player",
+    "Life insurance matures. Collect $100",
+    "Pay hospital fees of $100",
+    "Pay school fees of $50",
+    "Receive $25 consultancy fee",
+    "You are assessed for street repair. $40 per house. $115 per hotel",
+    "You have won second prize in a beauty contest. Collect $10",
+    "You inherit $100"
+)
+
+
+def _make_shared_tile(template: TileTemplate) -> Tile:
+    """
+    Description:        Function making the single instance of a tile which never holds any state, or None if every game
+                        needs its own.
+    :param template:    Template of the tile.
+    :return:            Tile object or None.
+    """
+    if template.kind is GoToJailTile:
+        tile: Tile = GoToJailTile()
+    elif template.kind is TaxTile:
+        tile = TaxTile(template.id, template.name, template.amount)
+    elif template.kind is Tile:
+        tile = Tile(template.id, template.name)
+    else:
+        return None
+    # Builds the client bindings up front so games never rebuild them concurrently
+    tile.to_dict()
+    return tile
+
+
+# Tiles with no owner or other state (Go, Jail, Free Parking, the tax tiles, and Go to Jail) shared by every board, with
+# None wherever each game makes its own tile.
+SHARED_TILES: tuple[Tile, ...] = tuple(_make_shared_tile(template) for template in BOARD)
+
+
+def _constructor_args(template: TileTemplate) -> tuple:
+    # Railroad and utility tiles fill in their own price and group
+    if template.kind is ImprovableTile:
+        return template.id, template.name, template.price, template.group
+    return template.id, template.name
+
+
+# Class and constructor arguments of each asset tile, worked out once so making a board is a plain loop of constructors
+_ASSET_TILES: tuple[tuple[type[Tile], tuple], ...] = tuple(
+    (template.kind, _constructor_args(template)) for template in BOARD if template.group is not None
+)
+_CARD_TILES: tuple[TileTemplate, ...] = tuple(template for template in BOARD if template.kind is CardTile)
+
+
+def make_board(chance_deck: Deck, community_chest_deck: Deck, players: list[Player]) -> list[Tile]:
+    """
+    Description:                    Function making a game's board from the template. Only the asset and card tiles are
+                                    made, the rest are shared.
+    :param chance_deck:             Chance deck of the game.
+    :param community_chest_deck:    Community chest deck of the game.
+    :param players:                 Players of the game, which card tiles pass to the cards they draw.
+    :return:                        List of tiles corresponding to the Monopoly board.
+    """
+    tiles: list[Tile] = list(SHARED_TILES)
+    for kind, args in _ASSET_TILES:
+        tiles[args[0]] = kind(*args)
+    for template in _CARD_TILES:
+        deck: Deck = chance_deck if template.id in CHANCE_TILES else community_chest_deck
+        tiles[template.id] = CardTile(template.id, template.name, deck, players)
+    return tiles
+
+
+def make_deck(descriptions: tuple[str, ...], rng: random.Random) -> Deck:
+    """
+    Description:            Function making a game's deck of cards from the template.
+    :param descriptions:    Text of each card in the deck.
+    :param rng:             Random number generator of the game used for shuffling.
+    :return:                Deck object.
+    """
+    return Deck([Card(description) for description in descriptions], rng)
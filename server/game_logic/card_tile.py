@@ -12,6 +12,7 @@ from .tile import Tile
 
 
 class CardTile(Tile):
+    __slots__ = ("deck", "players")
 
     def __init__(self, id: int, name: str, deck: Deck, players: list[Player]) -> None:
         """
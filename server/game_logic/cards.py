@@ -9,6 +9,8 @@ from .player_updates import PlayerUpdate
 
 
 class Card:
+    # Every game holds its own cards since whether they are in use is per game. Their text is shared by the board template.
+    __slots__ = ("description", "in_use")
 
     def __init__(self, description: str) -> None:
         """
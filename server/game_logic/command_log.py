@@ -0,0 +1,74 @@
+"""
+Description:    Class representing the log of commands a game accepted, which is enough to replay the game exactly.
+Date:           12/08/2023
+Author:         Jordan Bourdeau
+"""
+
+from typing import Any
+
+import json
+
+
+class CommandLog:
+
+    def __init__(self, seed: int, commands: list[tuple] = None) -> None:
+        """
+        Description:        Append-only log of the commands a game accepted along with the seed of its random number
+                            generator. Games are deterministic given their seed, so re-applying the commands in order
+                            to a game with the same seed rebuilds it exactly. Each command is stored as a tuple of its
+                            name followed by its arguments, which only ever contains strings, integers, and booleans.
+        :param seed:        Seed of the game's random number generator.
+        :param commands:    Commands to start the log with.
+        :returns:           None.
+        """
+        self.seed: int = seed
+        self.commands: list[tuple] = commands if commands is not None else []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, CommandLog) and self.seed == other.seed and self.commands == other.commands
+
+    def append(self, name: str, *args: Any) -> None:
+        """
+        Description:    Method used to add an accepted command to the log.
+        :param name:    Name of the command.
+        :param args:    Arguments needed to replay the command.
+        :return:        None.
+        """
+        self.commands.append((name, *args))
+
+    def since(self, index: int) -> list[tuple]:
+        """
+        Description:    Method used to get the commands after an index so the log can be persisted incrementally.
+        :param index:   Number of commands which were already seen.
+        :return:        List of commands.
+        """
+        return self.commands[index:]
+
+    def to_dict(self) -> dict:
+        return {
+            "seed": self.seed,
+            "commands": [list(command) for command in self.commands]
+        }
+
+    def dumps(self) -> str:
+        """
+        Description:    Method used to encode the log as compact JSON.
+        :return:        JSON string.
+        """
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CommandLog":
+        return cls(data["seed"], [tuple(command) for command in data["commands"]])
+
+    @classmethod
+    def loads(cls, data: str) -> "CommandLog":
+        """
+        Description:    Method used to decode a log encoded with dumps().
+        :param data:    JSON string.
+        :return:        CommandLog object.
+        """
+        return cls.from_dict(json.loads(data))
@@ -0,0 +1,121 @@
+"""
+Description:    Table of the commands clients can send, shared by the transports which take commands as JSON objects
+                (the WebSocket server and the batch endpoint) rather than as one HTTP endpoint each.
+Date:           12/13/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import MAX_BATCH_COMMANDS
+from .game import Game
+from .snapshot import from_bytes, to_bytes
+from .types import JailMethod
+
+from typing import Any, Callable
+
+JAIL_METHODS: dict[str, JailMethod] = {
+    "doubles": JailMethod.DOUBLES,
+    "money": JailMethod.MONEY,
+    "card": JailMethod.CARD
+}
+
+
+def _flag(value: Any) -> bool:
+    # Accepts JSON booleans as well as the "true"/"false" strings the HTTP endpoints take
+    return value if isinstance(value, bool) else str(value).lower() == "true"
+
+
+# Maps the name of each command (the same as its HTTP endpoint) to the name of its response event and a function running
+# it. The functions take the game, the ID of the player sending the command, and the command's arguments, named like
+# the HTTP query parameters.
+COMMANDS: dict[str, tuple[str, Callable[[Game, str, dict[str, Any]], bool]]] = {
+    "start_game": ("startGame", lambda game, player_id, args: game.start_game(player_id)),
+    "roll_dice": ("rollDice", lambda game, player_id, args: game.roll_dice(player_id)),
+    "buy_property": ("buyProperty", lambda game, player_id, args: game.buy_property(player_id, int(args["tile_id"]))),
+    "set_improvements": ("setImprovements", lambda game, player_id, args: game.improvements(
+        player_id, int(args["tile_id"]), int(args["quantity"]))),
+    "set_mortgage": ("setMortgage", lambda game, player_id, args: game.mortgage(
+        player_id, int(args["tile_id"]), _flag(args["mortgage"]))),
+    "get_out_of_jail": ("getOutOfJail", lambda game, player_id, args: game.get_out_of_jail(
+        player_id, JAIL_METHODS.get(str(args["method"]).lower(), JailMethod.INVALID))),
+    "end_turn": ("endTurn", lambda game, player_id, args: game.end_turn(player_id)),
+    "reset": ("reset", lambda game, player_id, args: game.reset(player_id))
+}
+
+
+def run_command(game: Game, player_id: str, command: dict[str, Any]) -> dict[str, Any]:
+    """
+    Description:        Function which runs a single command from a client.
+    :param game:        Game the command is for.
+    :param player_id:   ID of the player sending the command.
+    :param command:     Command object with its name under "command" and its arguments alongside it.
+    :return:            Response with the event name and whether the command succeeded, like the HTTP endpoints.
+    """
+    name: str = command.get("command")
+    if not isinstance(name, str) or name not in COMMANDS:
+        return {"event": name, "success": False}
+    event, function = COMMANDS[name]
+    try:
+        success: bool = function(game, player_id, command)
+    # Missing or malformed arguments fail the command like they do on the HTTP endpoints
+    except (KeyError, TypeError, ValueError) as e:
+        success = False
+    return {"event": event, "success": success}
+
+
+def _is_roll(command: Any) -> bool:
+    # Whether a command from a batch draws the dice
+    return isinstance(command, dict) and command.get("command") == "roll_dice"
+
+
+def run_batch(game: Game, player_id: str, commands: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Description:        Function which runs a list of commands from a client atomically, as if it were one command. The
+                        write lock is held throughout so no other player's command can run in between, and the events
+                        they enqueue are held back until the end. If any command fails, the rest are skipped and the
+                        game is rolled back to a snapshot taken before the batch, so either every command is applied
+                        or none is (and nobody sees the events of a rolled back batch). The dice can't be rolled back
+                        though, or a player could preview their next roll and decide what to do before rolling for
+                        real, so roll_dice may only be the last command of a batch.
+    :param game:        Game the commands are for.
+    :param player_id:   ID of the player sending the commands.
+    :param commands:    Command objects, as taken by run_command().
+    :return:            Response to each command. Commands which ran before a failure are marked as rolled back and
+                        the ones after it as skipped. Every command is skipped if the batch is refused.
+    """
+    if len(commands) > MAX_BATCH_COMMANDS or any(_is_roll(command) for command in commands[:-1]):
+        return [{"event": None, "success": False, "skipped": True} for _ in commands]
+    results: list[dict[str, Any]] = []
+    failed: bool = False
+    with game.lock.write():
+        checkpoint: bytes = to_bytes(game, include_commands=True)
+        # Resetting replaces the events, so they are put back as well if the batch is rolled back
+        events: tuple = (game.event_queue, game.event_history)
+        game.defer_events()
+        try:
+            for command in commands:
+                if not isinstance(command, dict):
+                    result: dict[str, Any] = {"event": None, "success": False}
+                elif failed:
+                    name: str = command.get("command")
+                    event: str = COMMANDS[name][0] if isinstance(name, str) and name in COMMANDS else name
+                    result = {"event": event, "success": False, "skipped": True}
+                else:
+                    result = run_command(game, player_id, command)
+                failed = failed or not result["success"]
+                results.append(result)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if failed:
+                game.publish_deferred_events(discard=True)
+                game.restore_state(from_bytes(checkpoint, record_history=False, headless=True))
+                with game._event_lock:
+                    game.event_queue, game.event_history = events
+            else:
+                game.publish_deferred_events()
+                game.event_history.checkpoint_if_due()
+    for result in results:
+        if failed and result["success"]:
+            result.update({"success": False, "rolledBack": True})
+    return results
@@ -6,9 +6,24 @@ Date:           10/15/2023
 
 from .types import AssetGroups, PropertyStatus, RailroadStatus, UtilityStatus
 
+import os
+
 # Secret key
 SECRET_KEY: str = "replace"
 
+# Shared secret required (in the MIGRATION_TOKEN_HEADER header) by the internal endpoints used to move rooms between
+# servers. They are disabled when it isn't set.
+MIGRATION_TOKEN: str = os.environ.get("MONOPOLY_MIGRATION_TOKEN")
+MIGRATION_TOKEN_HEADER: str = "X-Migration-Token"
+# Comma-separated base URLs of the servers rooms can be moved to. Clients of a moved room are only redirected to these.
+MIGRATION_TARGETS: list[str] = [url.rstrip("/") for url in os.environ.get("MONOPOLY_MIGRATION_TARGETS", "").split(",")
+                                if url]
+INTERNAL_PATHS: frozenset[str] = frozenset(["/room/export", "/room/import", "/room/release", "/room/thaw"])
+
+# Whether state which is maintained incrementally (ex. net worth) is checked against a full recomputation every time it
+# is read. Only meant for debugging and tests since it undoes the savings.
+CHECK_INVARIANTS: bool = os.environ.get("MONOPOLY_CHECK_INVARIANTS") == "1"
+
 # Constants for specific tiles
 START_LOCATION: int = 0
 NUM_TILES: int = 40
@@ -40,6 +55,41 @@ MIN_NUM_PLAYERS: int = 2
 MAX_NUM_PLAYERS: int = 8
 PLAYER_ID_LENGTH: int = 16
 
+# Room related constants
+DEFAULT_ROOM_ID: str = "default"
+ROOM_ID_LENGTH: int = 8
+MAX_NUM_ROOMS: int = 4096
+# Number of seconds a room can go without a request before it is evicted
+ROOM_TTL: float = 60 * 60
+# Number of points each server gets on the consistent hash ring used to route rooms. More points spread rooms more
+# evenly at the cost of a bigger ring.
+HASH_RING_REPLICAS: int = 128
+
+# Long-polling constants (seconds)
+LONG_POLL_TIMEOUT: float = 25
+MAX_LONG_POLL_TIMEOUT: float = 60
+
+# Maximum number of commands in a single batch request
+MAX_BATCH_COMMANDS: int = 32
+
+# Event log constants
+# Maximum number of events kept in a game's event history
+MAX_EVENT_HISTORY: int = 1024
+# Number of events between full state checkpoints of the event history (must be less than MAX_EVENT_HISTORY)
+EVENT_CHECKPOINT_INTERVAL: int = 256
+# Maximum number of events waiting in a player's queue. The oldest are dropped if the player stops polling.
+MAX_QUEUED_EVENTS: int = 256
+
+# Simulation constants
+# Number of turns after which a simulated game is called for the richest player
+MAX_SIMULATION_TURNS: int = 1000
+# Number of games in each shard of a Monte Carlo batch
+MONTE_CARLO_SHARD_SIZE: int = 100
+
+# Snapshot constants
+# Version of the binary snapshot format. Bump it whenever the layout changes.
+SNAPSHOT_FORMAT_VERSION: int = 1
+
 # Property Constants
 NUM_RAILROADS: int = 4
 UTILITY_COST: int = 150
@@ -302,6 +352,14 @@ for tile_idx in [12, 28]:
         UtilityStatus.MONOPOLY: 10
     }
 
+# RENTS compiled into a dense table indexed by [tile ID][status] so looking up a rent is two tuple indexes rather than
+# two dictionary lookups hashing enumerations. Covers every tile kind (for utilities it is the roll multiplier), and
+# statuses a tile can't have are -1 like a missing entry in RENTS.
+RENT_TABLE_WIDTH: int = max(len(PropertyStatus), len(RailroadStatus), len(UtilityStatus))
+RENT_TABLE: tuple[tuple[int, ...], ...] = tuple(
+    tuple(RENTS.get(tile_id, {}).get(status, -1) for status in range(RENT_TABLE_WIDTH)) for tile_id in range(NUM_TILES)
+)
+
 COMMUNITY_CHEST: dict[int: str] = {
     1: "Advance to GO.",
     2: "Bank error in your favor.  Collect $200.",
@@ -9,10 +9,14 @@ from .cards import Card
 import random
 
 class Deck:
-    def __init__(self, cards: list[Card]) -> None:
+    def __init__(self, cards: list[Card], rng: random.Random = None) -> None:
+        # Random number generator used for shuffling. Games pass in their own so they can be seeded and replayed.
+        self.rng: random.Random = rng if rng is not None else random.Random()
+        # Every card in the deck in the order it was created, which gives each card a stable index (ex. for snapshots)
+        self.cards: list[Card] = [card for card in cards]
         # Perform shallow copy of list to not affect input list but keep reference to the elements
         self.stack: list[Card] = [card for card in cards]
-        random.shuffle(self.stack)
+        self.rng.shuffle(self.stack)
         self.discard: list[Card] = []
 
     def peek(self) -> Card:
@@ -59,5 +63,5 @@ class Deck:
                 card.reactivate()
         self.stack = used_cards
         self.discard = in_use
-        random.shuffle(self.stack)
+        self.rng.shuffle(self.stack)
 
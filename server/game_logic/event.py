@@ -4,8 +4,14 @@ Date:           11/11/2023
 Author:         Aidan Bonner
 """
 
+# Interned translation table from snake_case keys to their camelCase wire keys. Events only use a small fixed set of
+# keys, so each one is only ever converted once per process.
+_CAMEL_CASE_KEYS: dict[str, str] = {}
+
 
 class Event:
+    # Slotted since a new event is made for nearly every action
+    __slots__ = ("_parameters", "_serialized")
 
     def __init__(self, parameters: dict) -> None:
         """
@@ -14,19 +20,35 @@ class Event:
         """
         self.parameters: dict = parameters
 
+    @property
+    def parameters(self) -> dict:
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: dict) -> None:
+        self._parameters = parameters
+        # Serialized form of the parameters, built the first time the event is serialized
+        self._serialized: dict = None
+
     def to_camel_case(self, in_str: str) -> str:
         """
-        Description:    Converts a snake_case string to a camelCase string.
+        Description:    Converts a snake_case string to a camelCase string. Conversions are cached.
         Source:         https://www.geeksforgeeks.org/python-convert-snake-case-string-to-camel-case/
         :returns:       The camel case string.
         """
-        temp = in_str.split("_")
-        out_str = temp[0] + "".join(i.title() for i in temp[1:])
+        out_str: str = _CAMEL_CASE_KEYS.get(in_str)
+        if out_str is None:
+            temp = in_str.split("_")
+            out_str = temp[0] + "".join(i.title() for i in temp[1:])
+            _CAMEL_CASE_KEYS[in_str] = out_str
         return out_str
 
     def serialize(self) -> dict:
         """
-        Description:    Method to serialize Event data into JSON format to be read in client-side.
+        Description:    Method to serialize Event data into JSON format to be read in client-side. The result is
+                        memoized, so it is shared by every player the event is sent to and must not be modified.
         :return:        Dictionary of camelCase keys to the appropriate values
         """
-        return {self.to_camel_case(key): val for key, val in self.parameters.items()}
+        if self._serialized is None:
+            self._serialized = {self.to_camel_case(key): val for key, val in self._parameters.items()}
+        return self._serialized
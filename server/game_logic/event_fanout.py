@@ -0,0 +1,178 @@
+"""
+Description:    Class representing the event queues of every player as a single shared log with a cursor per player.
+Date:           12/03/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import MAX_QUEUED_EVENTS
+from .event import Event
+
+from collections import deque
+from itertools import islice
+from typing import Iterator
+
+
+# Event sent ahead of a player's events once some meant for them were dropped
+RESYNC_EVENT: Event = Event({"type": "resync"})
+
+
+class EventFanout:
+
+    def __init__(self, max_events: int = MAX_QUEUED_EVENTS) -> None:
+        """
+        Description:        Shared append-only log of the events sent to players. Each event is stored once along
+                            with the players it is for (None meaning everyone), and each player has a cursor pointing
+                            at the next event they haven't received. Broadcasting an event is a single append no matter
+                            how many players there are, and each event is only serialized once since Event memoizes it.
+                            Indexing by a player ID gives the list of their pending events like the old per-player
+                            queues did.
+        :param max_events:  Maximum number of events kept. The oldest are dropped if a player stops polling, and the
+                            next flush for a player who lost events starts with a resync event.
+        :returns:           None.
+        """
+        self.max_events: int = max_events
+        # Entries are (event, target player IDs or None for everyone)
+        self._entries: deque[tuple[Event, frozenset[str]]] = deque()
+        # Sequence number of the oldest entry still kept and the one the next entry will get
+        self._first_sequence: int = 0
+        self._next_sequence: int = 0
+        # Maps player IDs to the sequence number of the next entry they haven't received
+        self._cursors: dict[str, int] = {}
+        # IDs of the players who lost events meant for them since their last flush
+        self._missed: set[str] = set()
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._cursors
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cursors)
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def __getitem__(self, player_id: str) -> list[Event]:
+        return [entry[0] for entry in self._pending_entries(player_id)]
+
+    def keys(self) -> Iterator[str]:
+        return self._cursors.keys()
+
+    def get(self, player_id: str, default: list[Event] = None) -> list[Event]:
+        if player_id not in self._cursors:
+            return default
+        return self[player_id]
+
+    def add_player(self, player_id: str) -> None:
+        """
+        Description:        Method used to start a cursor for a player. They only receive events published after this.
+        :param player_id:   ID of the player.
+        :return:            None.
+        """
+        if player_id not in self._cursors:
+            self._cursors[player_id] = self._next_sequence
+
+    def publish(self, event: Event, targets: list[str] = None) -> None:
+        """
+        Description:        Method used to add an event to the log.
+        :param event:       Event to add.
+        :param targets:     IDs of the players the event is for. Everyone receives it if None.
+        :return:            None.
+        """
+        self._entries.append((event, None if targets is None else frozenset(targets)))
+        self._next_sequence += 1
+        if len(self._entries) > self.max_events:
+            dropped_targets: frozenset[str] = self._entries.popleft()[1]
+            # Only runs once someone stops polling, so checking every cursor is fine
+            for player_id, cursor in self._cursors.items():
+                if cursor <= self._first_sequence and (dropped_targets is None or player_id in dropped_targets):
+                    self._missed.add(player_id)
+            self._first_sequence += 1
+
+    def has_pending(self, player_id: str) -> bool:
+        """
+        Description:        Method used to check whether a player has any events they haven't received.
+        :param player_id:   ID of the player.
+        :return:            True if there is at least one pending event (or they lost events and need to resync).
+        """
+        return player_id in self._missed or next(self._pending_entries(player_id), None) is not None
+
+    def flush(self, player_id: str) -> list[dict]:
+        """
+        Description:        Method used to get a player's pending events in serialized form and move their cursor past
+                            them. If events meant for them were dropped since their last flush, the list starts with a
+                            resync event telling the client to reload the full state since it can't be caught up.
+        :param player_id:   ID of the player.
+        :return:            List of serialized events. Empty if the player doesn't exist.
+        """
+        events: list[dict] = [entry[0].serialize() for entry in self._pending_entries(player_id)]
+        if player_id in self._missed:
+            events.insert(0, RESYNC_EVENT.serialize())
+        self.clear(player_id)
+        return events
+
+    def clear(self, player_id: str) -> None:
+        """
+        Description:        Method used to move a player's cursor past every event and drop the events which every
+                            player has now received.
+        :param player_id:   ID of the player.
+        :return:            None.
+        """
+        if player_id not in self._cursors:
+            return
+        self._cursors[player_id] = self._next_sequence
+        self._missed.discard(player_id)
+        oldest: int = min(self._cursors.values())
+        while self._first_sequence < oldest:
+            self._entries.popleft()
+            self._first_sequence += 1
+
+    def to_dict(self) -> dict:
+        """
+        Description:    Method used to export the events which haven't been received by every player along with each
+                        player's cursor, so delivery can resume from the same place in another process.
+        :return:        Dictionary with the serialized events (and who they are for), the cursors relative to them, and
+                        the players who need to resync.
+        """
+        return {
+            "events": [{
+                "event": event.serialize(),
+                "targets": None if targets is None else sorted(targets)
+            } for event, targets in self._entries],
+            "cursors": {player_id: max(cursor - self._first_sequence, 0) for player_id, cursor in self._cursors.items()},
+            "missed": sorted(self._missed)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_events: int = MAX_QUEUED_EVENTS) -> "EventFanout":
+        """
+        Description:        Method used to rebuild a log exported with to_dict().
+        :param data:        Dictionary from to_dict().
+        :param max_events:  Maximum number of events kept.
+        :return:            EventFanout object.
+        """
+        fanout: EventFanout = cls(max_events)
+        for entry in data["events"]:
+            # Serialized events already have camelCase keys, which serializing again leaves as they are
+            fanout.publish(Event(dict(entry["event"])), entry["targets"])
+        # The exported events are numbered from zero again. Cursors before the oldest event kept start from it, and
+        # those players have lost events.
+        for player_id, cursor in data["cursors"].items():
+            fanout._cursors[player_id] = max(cursor, fanout._first_sequence)
+            if cursor < fanout._first_sequence:
+                fanout._missed.add(player_id)
+        fanout._missed.update(data.get("missed", []))
+        return fanout
+
+    """ Private Helper Methods """
+
+    def _pending_entries(self, player_id: str) -> Iterator[tuple[Event, frozenset[str]]]:
+        """
+        Description:        Generator over the entries a player hasn't received yet.
+        :param player_id:   ID of the player.
+        :return:            Iterator of entries.
+        """
+        cursor: int = self._cursors.get(player_id)
+        if cursor is None:
+            return
+        for entry in islice(self._entries, max(cursor - self._first_sequence, 0), None):
+            if entry[1] is None or player_id in entry[1]:
+                yield entry
@@ -0,0 +1,153 @@
+"""
+Description:    Class representing a bounded log of game events which is periodically checkpointed with the full state.
+Date:           12/02/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import EVENT_CHECKPOINT_INTERVAL, MAX_EVENT_HISTORY
+from .event import Event
+
+from collections import deque
+from typing import Any, Callable, Iterator
+
+import json
+
+
+class EventLog:
+
+    def __init__(self, snapshot: Callable[[], dict] = None, max_events: int = MAX_EVENT_HISTORY,
+                 checkpoint_interval: int = EVENT_CHECKPOINT_INTERVAL, spill_path: str = None) -> None:
+        """
+        Description:                Append-only log of events which keeps at most `max_events` of the newest events.
+                                    Every event gets a sequence number, and once `checkpoint_interval` events have
+                                    been appended a snapshot of the full game state is taken at the next command
+                                    boundary (see checkpoint_if_due()) so the log can be replayed from the checkpoint
+                                    once the events before it have been dropped.
+        :param snapshot:            Function returning the full game state. No checkpoints are taken if it is None.
+        :param max_events:          Maximum number of events kept in memory.
+        :param checkpoint_interval: Number of events between checkpoints. Must be less than `max_events`. Events since
+                                    the last checkpoint are never dropped, so the log may briefly hold more than
+                                    `max_events` if a single command appends many events.
+        :param spill_path:          Optional path of a file which dropped events are appended to as JSON lines.
+        :returns:                   None.
+        """
+        if snapshot is not None and checkpoint_interval >= max_events:
+            raise ValueError("checkpoint_interval must be less than max_events")
+        self.max_events: int = max_events
+        self.checkpoint_interval: int = checkpoint_interval
+        self.spill_path: str = spill_path
+        self._snapshot: Callable[[], dict] = snapshot
+        self._events: deque[Event] = deque()
+        # Sequence number of the oldest event still in memory and the one the next event will get
+        self.first_sequence: int = 0
+        self.next_sequence: int = 0
+        # Sequence number of the first event after the latest checkpoint, which was taken between commands so it is the
+        # state once every event before it had been applied
+        self.checkpoint_sequence: int = 0
+        self.checkpoint_state: dict = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self._events)
+
+    def __getitem__(self, index: int) -> Event:
+        return self._events[index]
+
+    def append(self, event: Event) -> int:
+        """
+        Description:    Method used to add an event to the end of the log, dropping old events as needed. It never
+                        checkpoints since the event may be enqueued partway through a command.
+        :param event:   Event to add.
+        :return:        The sequence number of the event.
+        """
+        sequence: int = self.next_sequence
+        self._events.append(event)
+        self.next_sequence += 1
+        self._trim()
+        return sequence
+
+    def checkpoint(self) -> None:
+        """
+        Description:    Method used to record a snapshot of the full state as of the next sequence number. Must only be
+                        called between commands, so the snapshot never holds a half-applied command.
+        :return:        None.
+        """
+        self.checkpoint_state = self._snapshot()
+        self.checkpoint_sequence = self.next_sequence
+        self._trim()
+
+    def checkpoint_if_due(self) -> None:
+        """
+        Description:    Method used to checkpoint at a command boundary if at least `checkpoint_interval` events have
+                        been appended since the last checkpoint.
+        :return:        None.
+        """
+        if self._snapshot is not None and self.next_sequence - self.checkpoint_sequence >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def since(self, sequence: int = None) -> tuple[dict, list[Event]]:
+        """
+        Description:        Method used to get what a client needs to catch up from a sequence number. If the events
+                            after it are still in memory, only those are returned. Otherwise (or if no sequence number
+                            is given) the latest checkpoint is returned along with every event after it.
+        :param sequence:    Sequence number of the last event the client has seen.
+        :return:            Tuple of the checkpointed state (None if it isn't needed) and the list of events.
+        """
+        if sequence is not None and self.first_sequence <= sequence + 1 <= self.next_sequence:
+            return None, self._slice(sequence + 1)
+        if self.checkpoint_state is None:
+            return None, list(self._events)
+        return self.checkpoint_state, self._slice(self.checkpoint_sequence)
+
+    def to_dict(self, sequence: int = None) -> dict[str, Any]:
+        """
+        Description:        Method used to serialize since() for the client.
+        :param sequence:    Sequence number of the last event the client has seen.
+        :return:            Dictionary with the checkpoint, serialized events, and the sequence number of the last
+                            event.
+        """
+        state, events = self.since(sequence)
+        return {
+            "checkpoint": state,
+            "events": [event.serialize() for event in events],
+            "sequence": self.next_sequence - 1
+        }
+
+    """ Private Helper Methods """
+
+    def _slice(self, start: int) -> list[Event]:
+        """
+        Description:    Method used to get every in-memory event from a sequence number onwards.
+        :param start:   First sequence number to include.
+        :return:        List of events.
+        """
+        offset: int = max(start - self.first_sequence, 0)
+        return [self._events[index] for index in range(offset, len(self._events))]
+
+    def _trim(self) -> None:
+        """
+        Description:    Method used to drop the events past `max_events`, keeping every event since the last checkpoint
+                        so the log can always be replayed from it.
+        :return:        None.
+        """
+        count: int = len(self._events) - self.max_events
+        if self._snapshot is not None:
+            count = min(count, self.checkpoint_sequence - self.first_sequence)
+        if count > 0:
+            self._drop(count)
+
+    def _drop(self, count: int) -> None:
+        """
+        Description:    Method used to drop the oldest events, spilling them to disk if a path was given.
+        :param count:   Number of events to drop.
+        :return:        None.
+        """
+        dropped: list[Event] = [self._events.popleft() for _ in range(count)]
+        if self.spill_path is not None:
+            with open(self.spill_path, "a") as file:
+                for offset, event in enumerate(dropped):
+                    file.write(json.dumps({"sequence": self.first_sequence + offset, "event": event.serialize()}))
+                    file.write("\n")
+        self.first_sequence += count
@@ -5,16 +5,21 @@ Author:         Jordan Bourdeau, Hayden Collins
 """
 
 from .asset_tile import AssetTile
+from .board import CHANCE_CARDS, COMMUNITY_CHEST_CARDS, make_board, make_deck
 from .cards import Card
+from .command_log import CommandLog
 from .card_tile import CardTile
 from .constants import (CHANCE_TILES, COMMUNITY_CHEST_TILES, INCOME_TAX, LUXURY_TAX, MAX_DIE, MIN_DIE, MAX_NUM_PLAYERS,
                         MIN_NUM_PLAYERS, NUM_TILES, PLAYER_ID_LENGTH, RENTS, START_LOCATION)
 from .deck import Deck
 from .event import Event
+from .event_fanout import EventFanout
+from .event_log import EventLog
 from .improvable_tile import ImprovableTile
 from .go_to_jail_tile import GoToJailTile
 from .railroad_tile import RailroadTile
 from .player import Player
+from .read_write_lock import ReadWriteLock
 from .player_updates import (BuyUpdate, ImprovementUpdate, LeaveJailUpdate, MoneyUpdate, MortgageUpdate, PlayerUpdate,
                              RollUpdate)
 from .roll import Roll
@@ -23,18 +28,120 @@ from .tile import Tile
 from .types import AssetGroups, CardType, EventType, JailMethod, PlayerStatus, PropertyStatus
 from .utility_tile import UtilityTile
 
+from typing import Any, Callable
 
 import functools
+import json
 import random
 import secrets
 import string
+import threading
+
+
+def _reader(method):
+    """
+    Description:    Decorator for Game methods which only read the game state. Holds the game's read lock while running.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Acquired directly rather than through the context manager since this wraps every call on the hot path
+        self.lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release_read()
+    return wrapper
+
+
+def _writer(method):
+    """
+    Description:    Decorator for Game methods which mutate the game state. Holds the game's write lock while running.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Acquired directly rather than through the context manager since this wraps every call on the hot path
+        self.lock.acquire_write()
+        try:
+            result = method(self, *args, **kwargs)
+            # Checkpoint only once the outermost command is done so the snapshot never holds a half-applied one
+            if self.lock.holds_outermost_write():
+                self.event_history.checkpoint_if_due()
+            return result
+        finally:
+            self.lock.release_write()
+    return wrapper
+
+
+def _command(rejected: Any = False):
+    """
+    Description:        Decorator for Game methods which are commands from clients. Commands are rejected while the
+                        game is frozen (ex. while it is being migrated). Goes under _writer() so the check is made
+                        holding the lock.
+    :param rejected:    Value returned when the command is rejected.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.frozen:
+                return rejected
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Attributes holding the game state which restore_state() takes over. The card tiles hold the list of players and the
+# decks hold the random number generator, so all of these are taken together.
+_RESTORED_ATTRIBUTES: tuple[str, ...] = (
+    "rng", "command_log", "started", "players", "turn_order", "active_player_index", "active_player_id", "_players",
+    "chance_deck", "community_chest_deck", "tiles", "last_roll", "rolled_this_turn", "version", "_base_version",
+    "_player_versions", "_tile_versions"
+)
 
 
 class Game:
 
-    def __init__(self) -> None:
-        """
-        Description:    Main class holding all the game state used for managing game logic.
+    def __init__(self, record_history: bool = True, headless: bool = False, seed: int = None) -> None:
+        """
+        Description:            Main class holding all the game state used for managing game logic.
+        :param record_history:  Whether UPDATE events are appended to the event history. It is only an audit log and is
+                                never read by the game logic, so it can be turned off.
+        :param headless:        Whether the game is being played without clients (ex. simulations). No events are
+                                enqueued or logged.
+        :param seed:            Seed for the game's random number generator, which is used for the dice, the decks,
+                                and the turn order. Games with the same seed and the same requests play out identically.
+                                A random seed is picked if it is not given.
+        :returns:               None.
+        """
+        self.record_history: bool = record_history
+        self.headless: bool = headless
+        self.seed: int = seed if seed is not None else secrets.randbits(64)
+        # Per-game random number generator so games don't share hidden state through the global one. It is kept across
+        # resets so a reset game continues the same stream.
+        self.rng: random.Random = random.Random(self.seed)
+        # Log of every command the game accepted. Along with the seed it is enough to replay the game, so it is also
+        # kept across resets.
+        self.command_log: CommandLog = CommandLog(self.seed)
+        # Whether commands are being rejected (ex. while the game is being moved to another process)
+        self.frozen: bool = False
+        # Callbacks run with the target player IDs (None for everyone) whenever events are enqueued, so servers can push
+        # events instead of waiting for clients to poll. They are kept across resets.
+        self._listeners: list[Callable[[list[str]], None]] = []
+        # Events held back while a group of commands runs as one (see defer_events()), or None if they are published
+        # as they are enqueued
+        self._deferred_events: list[tuple[Event, list[str], bool]] = None
+        # Readers/writer lock guarding the game state. Mutating methods hold the write lock while serializing the
+        # state holds the read lock, so concurrent reads don't serialize behind one another.
+        self.lock: ReadWriteLock = ReadWriteLock()
+        # Lock guarding the event queue. Its condition is notified whenever an event is enqueued so long-polling
+        # clients can block until there is something new. Kept across resets like the lock above.
+        self._event_lock: threading.RLock = threading.RLock()
+        self._event_condition: threading.Condition = threading.Condition(self._event_lock)
+        self._init_state()
+
+    def _init_state(self) -> None:
+        """
+        Description:    Method used to (re)initialize all the game state. Kept separate from __init__() so resetting
+                        the game doesn't replace the locks other threads may be waiting on.
         :returns:       None.
         """
         self.started: bool = False
@@ -50,14 +157,30 @@ class Game:
         # Used in the chance/community chest deck
         self._players: list[Player] = []
         # Save initialization until game is started
-        self.chance_deck: Deck = self._make_chance_deck()
-        self.community_chest_deck: Deck = self._make_community_chest_deck()
-        self.tiles: list[Tile] = self._make_board()
+        # The board and decks are made from the shared template, which only leaves the per-game state to create
+        self.chance_deck: Deck = make_deck(CHANCE_CARDS, self.rng)
+        self.community_chest_deck: Deck = make_deck(COMMUNITY_CHEST_CARDS, self.rng)
+        self.tiles: list[Tile] = make_board(self.chance_deck, self.community_chest_deck, self._players)
         # Variables to keep track of events that each client needs to receive
-        # Maps player ID to a list of events in the order which the events were received
-        self.event_queue: dict[str: list[Event]] = {}
-        # History of the events which palpably affect game state (not informational).
-        self.event_history: list[Event] = []
+        # Shared log of events with a cursor per player. Indexing it by player ID gives their pending events in order.
+        self.event_queue: EventFanout = EventFanout()
+        # Bounded history of the events which palpably affect game state (not informational). It is checkpointed with
+        # the full state so it can still be replayed once older events are dropped.
+        self.event_history: EventLog = EventLog(snapshot=self.to_dict)
+        # Per-turn state: the most recent roll and whether the active player has rolled during their turn.
+        self.last_roll: Roll = None
+        self.rolled_this_turn: bool = False
+        # Monotonically increasing state version which goes up on every mutation. Players and tiles are stamped with
+        # the version they last changed at so clients can request only what changed since the version they have.
+        self.version: int = 0
+        # Version the game was (re)initialized at. Deltas can't be computed from before this.
+        self._base_version: int = 0
+        self._player_versions: dict[str: int] = {}
+        self._tile_versions: list[int] = [0] * NUM_TILES
+        # to_dict() encoded as JSON for the current version, keyed by the version it was built since (None for the full
+        # state), so polling clients don't re-encode the whole state while nothing has changed.
+        self._json_version: int = None
+        self._json_cache: dict[int, str] = {}
 
     """ Exposed API Methods """
 
@@ -68,13 +191,109 @@ class Game:
         :param player_id:   ID of the player to get events for.
         :return:            List of Event objects serialized into dictionary (JSON) format.
         """
-        player_queue: list[Event] = self.event_queue.get(player_id)
-        if player_queue is None:
-            return []
-        events: list[dict] = [event.serialize() for event in player_queue]
-        self._clear_player_queue(player_id)
-        return events
+        with self._event_lock:
+            return self.event_queue.flush(player_id)
+
+    def wait_for_events(self, player_id: str, timeout: float) -> list[dict]:
+        """
+        Description:        Method which blocks until a player has events in their queue (or the timeout expires) and
+                            then flushes them.
+        :param player_id:   ID of the player to get events for.
+        :param timeout:     Maximum number of seconds to wait for an event.
+        :return:            List of Event objects serialized into dictionary (JSON) format. Empty if it timed out.
+        """
+        with self._event_condition:
+            if player_id not in self.event_queue:
+                return []
+            # The player's queue disappears if the game is reset while waiting
+            self._event_condition.wait_for(
+                lambda: player_id not in self.event_queue or self.event_queue.has_pending(player_id), timeout)
+            return self.flush_events(player_id)
+
+    def add_listener(self, listener: Callable[[list[str]], None]) -> None:
+        """
+        Description:        Method used to be told whenever events are enqueued. Listeners are called while the game is
+                            locked, so they must be quick and must not call back into the game.
+        :param listener:    Function taking the IDs of the players the events are for (None for everyone).
+        :return:            None.
+        """
+        with self._event_lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[list[str]], None]) -> None:
+        """
+        Description:        Method used to stop calling a listener added with add_listener().
+        :param listener:    Listener to remove.
+        :return:            None.
+        """
+        with self._event_lock:
+            self._listeners = [other for other in self._listeners if other != listener]
+
+    @_writer
+    def freeze(self) -> None:
+        """
+        Description:    Method used to stop accepting commands. Takes the write lock, so once it returns no command is
+                        still running and the state can't change until the game is thawed.
+        :return:        None.
+        """
+        self.frozen = True
+
+    @_writer
+    def thaw(self) -> None:
+        """
+        Description:    Method used to start accepting commands again after freeze().
+        :return:        None.
+        """
+        self.frozen = False
+
+    def defer_events(self) -> None:
+        """
+        Description:    Method used to hold back the events enqueued from now on until publish_deferred_events() is
+                        called, so a group of commands which may be rolled back never shows its events to anyone. Must
+                        be called holding the write lock.
+        :return:        None.
+        """
+        self._deferred_events = []
+
+    def publish_deferred_events(self, discard: bool = False) -> None:
+        """
+        Description:    Method used to publish the events held back since defer_events() and go back to publishing
+                        events as they are enqueued. Must be called holding the write lock.
+        :param discard: Whether to drop the events instead (ex. because the commands were rolled back).
+        :return:        None.
+        """
+        deferred, self._deferred_events = self._deferred_events, None
+        if not discard:
+            for event, target_ids, record in deferred or []:
+                self._publish_event(event, target_ids, record)
+
+    def restore_state(self, other: "Game") -> None:
+        """
+        Description:    Method used to take over the game state of another game, ex. one rebuilt from a snapshot to roll
+                        back to. The lock, listeners, and events are kept, so waiting threads and connected clients
+                        carry on as if the state had never changed. Must be called holding the write lock.
+        :param other:   Game to take the state of. It shouldn't be used afterwards.
+        :return:        None.
+        """
+        for name in _RESTORED_ATTRIBUTES:
+            setattr(self, name, getattr(other, name))
+        # The version may have gone back, so the encodings built since may not match the state anymore
+        self._json_version = None
+
+    @_reader
+    def get_history(self, sequence: int = None) -> dict:
+        """
+        Description:        Method used to get the event history after a sequence number so a client which fell behind
+                            (or joined late) can catch up. If those events were already dropped, the latest checkpoint of
+                            the full state is returned along with the events after it.
+        :param sequence:    Sequence number of the last event the client has seen.
+        :return:            Dictionary with the checkpoint (None if it isn't needed), the serialized events, and the
+                            sequence number of the last event.
+        """
+        return self.event_history.to_dict(sequence)
 
+    @_writer
+    @_command()
     def start_game(self, player_id: str) -> bool:
         """
         Description:        Method used to start the game with the currently active players (must be >= 2 and <= max).
@@ -86,9 +305,11 @@ class Game:
         elif MIN_NUM_PLAYERS <= len(self.players) <= MAX_NUM_PLAYERS:
             self.started = True
             # Shuffle turn order and set active player idx/id
-            random.shuffle(self.turn_order)
+            self.rng.shuffle(self.turn_order)
             self.active_player_index = 0
             self.active_player_id = self.turn_order[0]
+            self._bump_version()
+            self.command_log.append("start_game", player_id)
             # Enqueue events to prompt client
             start_game: Event = Event({
                 "type": "showStartGame",
@@ -105,28 +326,36 @@ class Game:
             return True
         return False
 
-    def register_player(self, display_name: str) -> str:
+    @_writer
+    @_command(rejected="")
+    def register_player(self, display_name: str, player_id: str = None) -> str:
         """
-        Description:    Method used to register a player and return their player ID. Doesn't allow players to be
-                        added once the game has started.
-        :return:        Player ID generated or the empty string if player cap has been reached.
+        Description:            Method used to register a player and return their player ID. Doesn't allow players
+                                to be added once the game has started.
+        :param display_name:    Name shown to the other players.
+        :param player_id:       ID to register the player under (used when replaying a game). Generated if not given.
+        :return:                Player ID generated or the empty string if player cap has been reached.
         """
         if len(self.players) == MAX_NUM_PLAYERS or self.started:
             return ""
-        # Keep generating random 16-character hex strings until one is not taken
+        if player_id is not None and player_id in self.players:
+            return ""
+        # Keep generating random 16-character hex strings until one is not taken. IDs are secrets, so they come from
+        # the system's generator rather than the seeded one and are recorded in the command log instead.
         character_set: str = string.ascii_lowercase + string.digits
-        player_id: str = "".join(secrets.choice(character_set)
-                                 for _ in range(PLAYER_ID_LENGTH))
-        while self.players.get(player_id, None) is not None:
+        while player_id is None or self.players.get(player_id, None) is not None:
             player_id = "".join(secrets.choice(character_set)
                                 for _ in range(PLAYER_ID_LENGTH))
         self.players[player_id] = Player(
             id=player_id, display_name=display_name)
         self._players.append(self.players[player_id])
         self.turn_order.append(player_id)
+        self._bump_version(players=[self.players[player_id]])
+        self.command_log.append("register_player", display_name, player_id)
 
-        # Create a list in the event queue for the player and add some events
-        self.event_queue[player_id] = []
+        # Start a cursor in the event queue for the player and add some events
+        with self._event_lock:
+            self.event_queue.add_player(player_id)
         player_join: Event = Event({
             "type": "showPlayerJoin",
             "displayName": display_name
@@ -136,6 +365,8 @@ class Game:
         self._enqueue_event(ready_prompt, target=player_id)
         return player_id
 
+    @_writer
+    @_command()
     def roll_dice(self, player_id: str, roll: Roll = None) -> bool:
         """
         Description:        Method for rolling the dice.
@@ -149,86 +380,30 @@ class Game:
         if not self._valid_player(player_id, require_game_started=True):
             return False
         player: Player = self.players[self.active_player_id]
+        # Reject a request if the player already rolled this turn but isn't supposed to roll again
+        if self.rolled_this_turn and not player.roll_again:
+            return False
+
+        # Whether the roll came from the game's generator. Replays have to draw it again to keep the stream in step, so
+        # it is only drawn once the roll can no longer be rejected (rejected commands aren't logged).
+        generated: bool = roll is None
         if roll is None:
-            roll = Roll(random.randint(MIN_DIE, MAX_DIE),
-                        random.randint(MIN_DIE, MAX_DIE))
+            roll = Roll(self.rng.randint(MIN_DIE, MAX_DIE),
+                        self.rng.randint(MIN_DIE, MAX_DIE))
         started_in_jail: bool = player.in_jail
         starting_location: int = player.location
 
-        # Reject a request if the player was the last one to roll but isn't supposed to roll again
-        last_roll_event: Event = self._get_last_roll_event()
-        if last_roll_event is not None:
-            if last_roll_event.parameters["playerId"] == player.id and not player.roll_again:
-                return False
-
         # Move the player
         player.update(RollUpdate(roll))
+        self.last_roll = roll
+        self.rolled_this_turn = True
+        self._bump_version(players=[player])
+        self.command_log.append("roll_dice", player_id, roll.first, roll.second, generated)
 
-        # Enqueue the roll and move to everyone
-        roll_event: Event = Event({
-            "type": "showRoll",
-            "displayName": player.display_name,
-            "playerId": player_id,
-            "first": roll.first,
-            "second": roll.second,
-        })
-        print(roll_event.parameters)
-
-        self._enqueue_event(roll_event, EventType.UPDATE)
-        # If they were either sent to jail by the roll or are in jail, don't display them moving or passing Go.
-        if not player.in_jail:
-            move_event: Event = Event({
-                "type": "showMovePlayer",
-                "playerId": player.id,
-                "displayName": player.display_name,
-                "directMovement": False,
-                "intoJail": False,
-                "outOfJail": False
-            })
-            self._enqueue_event(move_event, EventType.UPDATE)
-            # They passed Go since their location wrapped around
-            if player.location < starting_location:
-                go_event: Event = Event({
-                    "type": "showPassGo",
-                    "displayName": player.display_name
-                })
-                self._enqueue_event(go_event, EventType.UPDATE)
-
-        # If the player landed on an unowned asset tile, prompt them to purchase it.
+        # Enqueue the roll, movement, and what they landed on. Skipped entirely when there are no clients.
         tile: Tile = self.tiles[player.location]
-        if isinstance(tile, AssetTile) and tile.owner is None:
-            prompt_buy: Event = Event({
-                "type": "promptPurchase",
-                "propertyName": tile.name,
-                "tileId": tile.id
-            })
-            self._enqueue_event(prompt_buy, EventType.PROMPT)
-        # If the player lands on an owned asset tile, display an event with the rent.
-        elif isinstance(tile, AssetTile) and tile.owner is not player:
-            rent: Event = Event({
-                "type": "showRent",
-                "propertyName": tile.name,
-                "activePlayerName": player.display_name,
-                "landlordName": tile.owner.display_name,
-                "amount": tile.rent
-            })
-            self._enqueue_event(rent, EventType.UPDATE)
-        # If they landed on a CardTile, display an event with the card text which will be drawn.
-        elif isinstance(tile, CardTile):
-            card: Card = tile.deck.peek()
-            card_draw: Event = Event({
-                "type": "showCardDraw",
-                "description": card.description
-            })
-            self._enqueue_event(card_draw, EventType.UPDATE)
-        elif isinstance(tile, TaxTile):
-            tax: Event = Event({
-                "type": "showTax",
-                "displayName": player.display_name,
-                "amount": tile.amount,
-                "taxType": tile.name
-            })
-            self._enqueue_event(tax, EventType.UPDATE)
+        if not self.headless:
+            self._enqueue_roll_events(player, roll, starting_location)
 
         # Get updates from the tile and apply them
         updates: dict[str: PlayerUpdate] = tile.land(player, roll)
@@ -245,8 +420,8 @@ class Game:
                 "outOfJail": False
             })
             self._enqueue_event(go_to_jail, EventType.UPDATE)
-            # End their turn immediately and return early
-            self.end_turn(player_id)
+            # End their turn immediately and return early. Not logged as its own command since replaying the roll does it.
+            self._end_turn(player_id)
             return True
 
         # Does the player need to liquidate assets to pay for rent/card effect?
@@ -282,6 +457,8 @@ class Game:
 
         return player.status != PlayerStatus.INVALID
 
+    @_writer
+    @_command()
     def buy_property(self, player_id: str, tile_id: int) -> bool:
         """
         Description:        Method used for the active player to buy a property.
@@ -310,8 +487,11 @@ class Game:
         elif tile.price > player.money:
             return False
         player.update(BuyUpdate(tile))
+        # Buying can change the status of every tile in the group
+        self._bump_version(players=[player], tiles=player.group_share(tile.group))
+        self.command_log.append("buy_property", player_id, tile_id)
         # Purchase went through. Enqueue the showPurchase event.
-        if tile in player.assets:
+        if player.owns(tile):
             purchase: Event = Event({
                 "type": "showPurchase",
                 "displayName": player.display_name,
@@ -320,6 +500,8 @@ class Game:
             self._enqueue_event(purchase, EventType.UPDATE)
         return True
 
+    @_writer
+    @_command()
     def improvements(self, player_id: str, tile_id: int, amount: int) -> bool:
         """
         Description:        Method used to buy improvements to a property.
@@ -353,6 +535,8 @@ class Game:
         player: Player = self.players[player_id]
         start_status: int = tile.status
         player.update(ImprovementUpdate(tile, amount))
+        self._bump_version(players=[player], tiles=group_share)
+        self.command_log.append("improvements", player_id, tile_id, amount)
         # This means the upgrade actually went through. Enqueue the Event.
         if tile.status == start_status + amount:
             mortgage_event: Event = Event({
@@ -364,6 +548,8 @@ class Game:
             self._enqueue_event(mortgage_event, EventType.UPDATE)
         return True
 
+    @_writer
+    @_command()
     def mortgage(self, player_id: str, tile_id: int, mortgage: bool) -> bool:
         """
         Description:        Method for the active player to mortgage a property.
@@ -390,6 +576,8 @@ class Game:
         elif tile.is_mortgaged == mortgage:
             return False
         player.update(MortgageUpdate(tile, mortgage))
+        self._bump_version(players=[player], tiles=[tile])
+        self.command_log.append("mortgage", player_id, tile_id, mortgage)
         mortgage_event: Event = Event({
             "type": "showMortgage",
             "displayName": player.display_name,
@@ -399,6 +587,8 @@ class Game:
         self._enqueue_event(mortgage_event, EventType.UPDATE)
         return True
 
+    @_writer
+    @_command()
     def get_out_of_jail(self, player_id: str, method: JailMethod) -> bool:
         """
         Description:        Method which is used to get a user out of jail.
@@ -417,6 +607,8 @@ class Game:
             return False
         player.update(LeaveJailUpdate(method))
         if not player.in_jail:
+            self._bump_version(players=[player])
+            self.command_log.append("get_out_of_jail", player_id, int(method))
             # Create an event showing the player has left jail
             leave_jail: Event = Event({
                 "type": "showMovePlayer",
@@ -430,12 +622,49 @@ class Game:
             return True
         return False
 
+    @_writer
+    @_command()
     def end_turn(self, player_id: str) -> bool:
         """
         Description:        Method for ending the active player's turn.
         :param player_id:   ID of the player making the request.
         :return:            True if the request succeeds. False otherwise.
         """
+        if not self._end_turn(player_id):
+            return False
+        self.command_log.append("end_turn", player_id)
+        return True
+
+    @_writer
+    @_command()
+    def reset(self, player_id: str) -> bool:
+        """
+        Description:        Method for resetting the game.
+        :param player_id:   ID of the player making the request.
+        :return:            True if the request succeeds. False otherwise.
+        """
+        if not self._valid_player(player_id, require_active_player=False, require_game_started=True):
+            return False
+        # Keep the version monotonic across resets so clients holding an old version get the full state
+        version: int = self.version + 1
+        # The event queue is replaced under the event lock so nobody flushing or waiting on events sees it change
+        with self._event_condition:
+            self._init_state()
+            self.version = self._base_version = version
+            # Wake up anyone waiting on events from the old game so they don't wait out their timeout
+            self._event_condition.notify_all()
+        self.command_log.append("reset", player_id)
+        self._notify_listeners(None)
+        return True
+
+    """ Private Helper Methods """
+
+    def _end_turn(self, player_id: str) -> bool:
+        """
+        Description:        Method which ends the active player's turn without logging it as a command.
+        :param player_id:   ID of the player whose turn is ending.
+        :return:            True if the turn ended. False otherwise.
+        """
         if not self._valid_player(player_id):
             return False
         # Don't let them end their turn with a negative balance
@@ -447,12 +676,12 @@ class Game:
         })
         self._enqueue_event(end_turn, EventType.UPDATE)
         # Check whether the player has rolled this turn
-        last_roll: Event = self._get_last_roll_event()
-        if last_roll is None or last_roll.parameters.get("playerId", "").lower() != player_id.lower():
+        if not self.rolled_this_turn:
             return False
 
         # Increment to the next player
         self._next_player()
+        self._bump_version()
         # Enqueue new events informing other players of a turn start and prompting player to roll the dice.
         start_turn: Event = Event({
             "type": "showStartTurn",
@@ -463,19 +692,6 @@ class Game:
         self._enqueue_event(prompt_roll, EventType.PROMPT)
         return True
 
-    def reset(self, player_id: str) -> bool:
-        """
-        Description:        Method for resetting the game.
-        :param player_id:   ID of the player making the request.
-        :return:            True if the request succeeds. False otherwise.
-        """
-        if not self._valid_player(player_id, require_active_player=False, require_game_started=True):
-            return False
-        self.__init__()
-        return True
-
-    """ Private Helper Methods """
-
     def _enqueue_event(self, event: Event, event_type: EventType = EventType.UPDATE, target: str = None) -> None:
         """
         Description:        Method used to enqueue an Event object into the event queue accordingly.
@@ -485,145 +701,123 @@ class Game:
         :return:            None.
         """
         # Event must have a name in its parameters
-        if event.parameters.get("type") is None:
+        if self.headless or event.parameters.get("type") is None:
             return
+        # IDs of the players the event is enqueued to (None for everyone)
+        target_ids: list[str] = None
+        record: bool = False
         if target is not None:
-            self.event_queue[target].append(event)
-            return
-        # Iterable for locations to enqueue an event
-        targets: list[list[Event]] = []
-        match event_type:
-            case EventType.STATUS:
-                targets = list(self.event_queue.values())
-            case EventType.PROMPT:
-                targets = [self.event_queue[self.active_player_id]]
-            case EventType.UPDATE:
-                targets = list(self.event_queue.values()) + \
-                    [self.event_history]
-            case _:
-                return
-        for target in targets:
-            target.append(event)
-
-    def _clear_player_queue(self, player_id: str) -> None:
-        """
-        Description:        Method used to clear a player's event queue.
-        :param player_id:   ID of the player whose event queue needs to be cleared.
+            target_ids = [target]
+        else:
+            match event_type:
+                case EventType.STATUS:
+                    pass
+                case EventType.PROMPT:
+                    target_ids = [self.active_player_id]
+                case EventType.UPDATE:
+                    record = self.record_history
+                case _:
+                    return
+        if self._deferred_events is not None:
+            self._deferred_events.append((event, target_ids, record))
+        else:
+            self._publish_event(event, target_ids, record)
+
+    def _publish_event(self, event: Event, target_ids: list[str], record: bool) -> None:
+        """
+        Description:        Method used to publish an enqueued event to the players it is for.
+        :param event:       The Event object.
+        :param target_ids:  IDs of the players the event is for (None for everyone).
+        :param record:      Whether the event is appended to the event history.
         :return:            None.
         """
-        queue: list[Event] = self.event_queue.get(player_id)
-        if queue is None:
-            return
-        self.event_queue[player_id] = []
-
-    def _get_last_roll_event(self) -> Event:
-        """
-        Description:    Method used to get the last roll event from the event history (None if there isn't one).
-        :return:        Event or None.
-        """
-        for event in reversed(self.event_history):
-            if event.parameters.get("type") == "showRoll":
-                return event
-        return None
-
-    def _make_board(self) -> list[Tile]:
-        """
-        Description:    Method for creating the board tiles from scratch.
-        :return:        List of tiles corresponding to the Monopoly board.
-        """
-        tiles: list[Tile] = [
-            Tile(0, "Go"),
-            ImprovableTile(1, "Mediterranean Avenue", 60, AssetGroups.BROWN),
-            CardTile(2, "Community Chest",
-                     self.community_chest_deck, self._players),
-            ImprovableTile(3, "Baltic Avenue", 60, AssetGroups.BROWN),
-            TaxTile(4, "Income Tax", -200),
-            RailroadTile(5, "Reading Railroad"),
-            ImprovableTile(6, "Oriental Avenue", 100, AssetGroups.LIGHT_BLUE),
-            CardTile(7, "Chance", self.chance_deck, self._players),
-            ImprovableTile(8, "Vermont Avenue", 100, AssetGroups.LIGHT_BLUE),
-            ImprovableTile(9, "Connecticut Avenue",
-                           120, AssetGroups.LIGHT_BLUE),
-            Tile(10, "Jail"),
-            ImprovableTile(11, "St. Charles Place", 140, AssetGroups.PINK),
-            UtilityTile(12, "Electric Company"),
-            ImprovableTile(13, "States Avenue", 140, AssetGroups.PINK),
-            ImprovableTile(14, "Virginia Avenue", 160, AssetGroups.PINK),
-            RailroadTile(15, "Pennsylvania Railroad"),
-            ImprovableTile(16, "St. James Place", 180, AssetGroups.ORANGE),
-            CardTile(17, "Community Chest",
-                     self.community_chest_deck, self._players),
-            ImprovableTile(18, "Tennessee Avenue", 180, AssetGroups.ORANGE),
-            ImprovableTile(19, "New York Avenue", 200, AssetGroups.ORANGE),
-            Tile(20, "Free Parking"),
-            ImprovableTile(21, "Kentucky Avenue", 220, AssetGroups.RED),
-            CardTile(22, "Chance", self.chance_deck, self._players),
-            ImprovableTile(23, "Indiana Avenue", 220, AssetGroups.RED),
-            ImprovableTile(24, "Illinois Avenue", 240, AssetGroups.RED),
-            RailroadTile(25, "B & O Railroad"),
-            ImprovableTile(26, "Atlantic Avenue", 260, AssetGroups.YELLOW),
-            ImprovableTile(27, "Ventnor Avenue", 260, AssetGroups.YELLOW),
-            UtilityTile(28, "Water Works"),
-            ImprovableTile(29, "Marvin Gardens", 280, AssetGroups.YELLOW),
-            GoToJailTile(),
-            ImprovableTile(31, "Pacific Avenue", 300, AssetGroups.GREEN),
-            ImprovableTile(32, "North Carolina Avenue",
-                           300, AssetGroups.GREEN),
-            CardTile(33, "Community Chest",
-                     self.community_chest_deck, self._players),
-            ImprovableTile(34, "Pennsylvania Avenue", 320, AssetGroups.GREEN),
-            RailroadTile(35, "Short Line Railroad"),
-            CardTile(36, "Chance", self.chance_deck, self._players),
-            ImprovableTile(37, "Park Place", 350, AssetGroups.DARK_BLUE),
-            TaxTile(38, "Luxury Tax", -75),
-            ImprovableTile(39, "Boardwalk", 400, AssetGroups.DARK_BLUE),
-        ]
-        return tiles
-
-    def _make_chance_deck(self) -> Deck:
-        cards = [
-            Card("Advance to Boardwalk"),
-            Card("Advance to Go (Collect $200)"),
-            Card("Advance to Illinois Avenue. If you pass Go, collect $200"),
-            Card("Advance to St. Charles Place. If you pass Go, collect $200"),
-            Card("Advance to the nearest Railroad. If unowned, you may buy it from the Bank. "
-                 "If owned, pay owner twice the rental to which they are otherwise entitled"),
-            Card("Advance to the nearest Railroad. If unowned, you may buy it from the Bank. "
-                 "If owned, pay owner twice the rental to which they are otherwise entitled"),
-            Card("Advance token to nearest Utility. If unowned, you may buy it from the Bank. "
-                 "If owned, throw dice and pay owner a total ten times the amount thrown."),
-            Card("Bank pays you a dividend of $50"),
-            Card("Get Out of Jail Free"),
-            Card("Go Back 3 Spaces"),
-            Card("Go to Jail. Go directly to Jail, do not pass Go, do not collect $200"),
-            Card("Make general repairs on all your property. For each house pay $25. For each hotel pay $100"),
-            Card("Speeding fine $15"),
-            Card("Take a trip to Reading Railroad. If you pass Go, collect $200"),
-            Card("You have been elected Chairman of the Board. Pay each player $50"),
-            Card("Your building loan matures. Collect $150")
-        ]
-        return Deck(cards)
-
-    def _make_community_chest_deck(self) -> Deck:
-        cards = [
-            Card("Advance to Go (Collect $200)"),
-            Card("Bank error in your favor. Collect $200"),
-            Card("Doctor’s fee. Pay $50"),
-            Card("From the sale of stock, you get $50"),
-            Card("Get Out of Jail Free"),
-            Card("Go to Jail. Go directly to jail, do not pass Go, do not collect $200"),
-            Card("Holiday fund matures. Receive $100"),
-            Card("Income tax refund. Collect $20"),
-            Card("It is your birthday. Collect $10 from every player"),
-            Card("Life insurance matures. Collect $100"),
-            Card("Pay hospital fees of $100"),
-            Card("Pay school fees of $50"),
-            Card("Receive $25 consultancy fee"),
-            Card("You are assessed for street repair. $40 per house. $115 per hotel"),
-            Card("You have won second prize in a beauty contest. Collect $10"),
-            Card("You inherit $100")
-        ]
-        return Deck(cards)
+        if record:
+            self.event_history.append(event)
+        with self._event_lock:
+            self.event_queue.publish(event, target_ids)
+            # Wake up players who are long-polling for events
+            self._event_condition.notify_all()
+        self._notify_listeners(target_ids)
+
+    def _notify_listeners(self, target_ids: list[str]) -> None:
+        # The list is replaced rather than changed in place, so it can be iterated without holding the event lock
+        for listener in self._listeners:
+            listener(target_ids)
+
+    def _enqueue_roll_events(self, player: Player, roll: Roll, starting_location: int) -> None:
+        """
+        Description:                Method used to enqueue the events showing a roll, the resulting movement, and
+                                    what the player landed on.
+        :param player:              Player who rolled.
+        :param roll:                Their roll.
+        :param starting_location:   Location they rolled from.
+        :return:                    None.
+        """
+        # Enqueue the roll and move to everyone
+        roll_event: Event = Event({
+            "type": "showRoll",
+            "displayName": player.display_name,
+            "playerId": player.id,
+            "first": roll.first,
+            "second": roll.second,
+        })
+        print(roll_event.parameters)
+
+        self._enqueue_event(roll_event, EventType.UPDATE)
+        # If they were either sent to jail by the roll or are in jail, don't display them moving or passing Go.
+        if not player.in_jail:
+            move_event: Event = Event({
+                "type": "showMovePlayer",
+                "playerId": player.id,
+                "displayName": player.display_name,
+                "directMovement": False,
+                "intoJail": False,
+                "outOfJail": False
+            })
+            self._enqueue_event(move_event, EventType.UPDATE)
+            # They passed Go since their location wrapped around
+            if player.location < starting_location:
+                go_event: Event = Event({
+                    "type": "showPassGo",
+                    "displayName": player.display_name
+                })
+                self._enqueue_event(go_event, EventType.UPDATE)
+
+        # If the player landed on an unowned asset tile, prompt them to purchase it.
+        tile: Tile = self.tiles[player.location]
+        if isinstance(tile, AssetTile) and tile.owner is None:
+            prompt_buy: Event = Event({
+                "type": "promptPurchase",
+                "propertyName": tile.name,
+                "tileId": tile.id
+            })
+            self._enqueue_event(prompt_buy, EventType.PROMPT)
+        # If the player lands on an owned asset tile, display an event with the rent.
+        elif isinstance(tile, AssetTile) and tile.owner is not player:
+            rent: Event = Event({
+                "type": "showRent",
+                "propertyName": tile.name,
+                "activePlayerName": player.display_name,
+                "landlordName": tile.owner.display_name,
+                "amount": tile.rent
+            })
+            self._enqueue_event(rent, EventType.UPDATE)
+        # If they landed on a CardTile, display an event with the card text which will be drawn.
+        elif isinstance(tile, CardTile):
+            card: Card = tile.deck.peek()
+            card_draw: Event = Event({
+                "type": "showCardDraw",
+                "description": card.description
+            })
+            self._enqueue_event(card_draw, EventType.UPDATE)
+        elif isinstance(tile, TaxTile):
+            tax: Event = Event({
+                "type": "showTax",
+                "displayName": player.display_name,
+                "amount": tile.amount,
+                "taxType": tile.name
+            })
+            self._enqueue_event(tax, EventType.UPDATE)
 
     def _apply_updates(self, deltas: dict[str, PlayerUpdate]) -> bool:
         """
@@ -642,8 +836,27 @@ class Game:
         # Apply all updates
         for id, update in deltas.items():
             self.players[id].update(update)
+        if len(deltas) > 0:
+            self._bump_version(players=[self.players[id] for id in deltas.keys()])
         return True
 
+    def _bump_version(self, players: list[Player] = (), tiles: list[Tile] = ()) -> int:
+        """
+        Description:    Method used to increment the state version after a mutation and stamp the players and tiles
+                        which were changed by it.
+        :param players: Players whose state changed.
+        :param tiles:   Tiles whose state changed. Their owners are stamped as well since players include their assets.
+        :return:        The new version.
+        """
+        self.version += 1
+        for player in players:
+            self._player_versions[player.id] = self.version
+        for tile in tiles:
+            self._tile_versions[tile.id] = self.version
+            if tile.owner is not None:
+                self._player_versions[tile.owner.id] = self.version
+        return self.version
+
     def _valid_player(self, player_id: str, require_active_player: bool = True,
                       require_game_started: bool = False) -> bool:
         """
@@ -690,29 +903,52 @@ class Game:
             # Set new active player index and id then return True
             self.active_player_index = idx
             self.active_player_id = self.turn_order[idx]
+            self.rolled_this_turn = False
             return True
 
-    def to_dict(self) -> dict:
+    @_reader
+    def to_dict(self, since: int = None) -> dict:
         """
         Description:    Method used to return a dictionary representation of the class.
                         Used for creating JSON representation of the game state.
+        :param since:   Optional state version the client already has. Only the players and tiles which changed after
+                        it are included. The full state is returned if it is from before the game was (re)initialized.
         :return:        Dictionary of class attributes.
         """
+        if since is not None and not self._base_version <= since <= self.version:
+            since = None
         game_dict: dict = {}
+        game_dict["version"] = self.version
         game_dict["started"] = self.started
         if self.active_player_id != "":
             game_dict["activePlayerId"] = self.active_player_id
-        game_dict["players"] = [self.players[id].to_dict()
-                                for id in self.turn_order]
-        game_dict["tiles"] = [tile.to_dict() for tile in self.tiles]
+        if since is None:
+            game_dict["players"] = [self.players[id].to_dict()
+                                    for id in self.turn_order]
+            game_dict["tiles"] = [tile.to_dict() for tile in self.tiles]
+        else:
+            game_dict["players"] = [self.players[id].to_dict() for id in self.turn_order
+                                    if self._player_versions.get(id, 0) > since]
+            game_dict["tiles"] = [tile.to_dict() for tile in self.tiles if self._tile_versions[tile.id] > since]
         return game_dict
 
-        """
-        return {
-            "started": self.started,
-            # TODO: Remove this later once we have fully implemented event queue client-side
-            "activePlayerId": self.active_player_id,
-            "players": [player.to_dict() for player in self.players.values()],
-            "tiles": [tile.to_dict() for tile in self.tiles]
-        }
-        """
+    @_reader
+    def to_json(self, since: int = None) -> str:
+        """
+        Description:    Method used to get to_dict() encoded as a JSON object. The encoding is cached until the state
+                        version changes, so it is built once per version rather than once per request.
+        :param since:   Optional state version the client already has, as for to_dict().
+        :return:        JSON string of the game state.
+        """
+        if since is not None and not self._base_version <= since <= self.version:
+            since = None
+        # The version can't change while the read lock is held, so concurrent readers can only race to fill in the
+        # same encoding
+        if self._json_version != self.version:
+            self._json_cache = {}
+            self._json_version = self.version
+        encoded: str = self._json_cache.get(since)
+        if encoded is None:
+            encoded = json.dumps(self.to_dict(since=since), separators=(",", ":"))
+            self._json_cache[since] = encoded
+        return encoded
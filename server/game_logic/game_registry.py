@@ -0,0 +1,298 @@
+"""
+Description:    Class managing the set of Game objects (rooms) hosted by a single server process.
+Date:           11/27/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import DEFAULT_ROOM_ID, MAX_NUM_ROOMS, ROOM_ID_LENGTH, ROOM_TTL
+from .event_fanout import EventFanout
+from .game import Game
+from .game_store import GameStore
+from .replay import replay
+
+from collections import OrderedDict
+from typing import Any, Callable
+
+import logging
+import secrets
+import string
+import threading
+import time
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class GameRegistry:
+
+    def __init__(self, ttl: float = ROOM_TTL, max_rooms: int = MAX_NUM_ROOMS,
+                 clock: Callable[[], float] = time.monotonic, store: GameStore = None) -> None:
+        """
+        Description:        Class which keys Game objects by a room ID and evicts rooms which have been idle for longer
+                            than the time to live.
+        :param ttl:         Number of seconds a room can go without being accessed before it is evicted.
+        :param max_rooms:   Maximum number of rooms which can be open at once.
+        :param clock:       Function returning the current time in seconds (injectable for testing).
+        :param store:       Optional GameStore the rooms are persisted to. Rooms are only kept in memory if it is None.
+        :returns:           None.
+        """
+        self.ttl: float = ttl
+        self.max_rooms: int = max_rooms
+        self.store: GameStore = store
+        self._clock: Callable[[], float] = clock
+        # Rooms ordered from least to most recently accessed so eviction only has to look at the front.
+        self._rooms: OrderedDict[str, Game] = OrderedDict()
+        self._last_access: dict[str, float] = {}
+        # Rooms which are never evicted or closed (ex. the default room).
+        self._pinned: dict[str, Game] = {}
+        # Rooms which were moved to another server, mapped to its URL so their clients can be redirected. Only the most
+        # recent are remembered.
+        self._redirects: OrderedDict[str, str] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __contains__(self, room_id: str) -> bool:
+        return room_id in self._rooms or room_id in self._pinned
+
+    def __len__(self) -> int:
+        return len(self._rooms) + len(self._pinned)
+
+    def create(self, room_id: str = None, pinned: bool = False) -> str:
+        """
+        Description:        Method used to open a new room.
+        :param room_id:     Optional room ID to use. A random one is generated if it is not provided.
+        :param pinned:      Whether the room should be exempt from eviction and closing.
+        :return:            The room ID or the empty string if the room could not be created.
+        """
+        with self._lock:
+            self._evict_idle()
+            if len(self) >= self.max_rooms:
+                return ""
+            if room_id is None:
+                room_id = self._generate_room_id()
+            elif room_id in self:
+                return ""
+            game: Game = Game()
+            self._add(room_id, game, pinned)
+            if self.store is not None:
+                self.store.add_room(room_id, game.seed, pinned)
+            return room_id
+
+    def restore(self) -> list[str]:
+        """
+        Description:    Method used to bring back every room in the store (ex. after a restart) by replaying their
+                        command logs. Rooms which are already open are skipped, and rooms whose logs can't be replayed
+                        are logged and quarantined in the store rather than stopping the rest from being restored.
+        :return:        List of restored room IDs.
+        """
+        if self.store is None:
+            return []
+        restored: list[str] = []
+        with self._lock:
+            for room_id, pinned, log in self.store.load():
+                if room_id in self:
+                    continue
+                try:
+                    game: Game = replay(log)
+                except ValueError as e:
+                    logger.error("Quarantining room %s which could not be restored: %s", room_id, e)
+                    self.store.quarantine(room_id, str(e))
+                    continue
+                self._add(room_id, game, pinned)
+                restored.append(room_id)
+        return restored
+
+    def persist(self, room_id: str) -> int:
+        """
+        Description:        Method used to write the commands a room accepted since it was last persisted. Called once
+                            at the end of each request so the request's commands are committed together. Doesn't count
+                            as an access to the room.
+        :param room_id:     ID of the room.
+        :return:            Number of commands written.
+        """
+        if self.store is None:
+            return 0
+        with self._lock:
+            game: Game = self._rooms.get(room_id) or self._pinned.get(room_id)
+        if game is None:
+            return 0
+        with game.lock.read():
+            return self.store.save(room_id, game.command_log)
+
+    def get(self, room_id: str) -> Game:
+        """
+        Description:        Method used to look up a room and mark it as recently accessed. A room which has outlived
+                            its time to live is evicted rather than returned, even if no sweep has run since.
+        :param room_id:     ID of the room.
+        :return:            Game object for the room or None if it does not exist.
+        """
+        with self._lock:
+            game: Game = self._rooms.get(room_id)
+            if game is not None:
+                now: float = self._clock()
+                if now - self._last_access[room_id] >= self.ttl:
+                    # Rooms are kept in access order, so every room before this one has expired as well
+                    self._evict_idle()
+                    return None
+                self._rooms.move_to_end(room_id)
+                self._last_access[room_id] = now
+                return game
+            return self._pinned.get(room_id)
+
+    def close(self, room_id: str) -> bool:
+        """
+        Description:        Method used to close a room and release its Game object.
+        :param room_id:     ID of the room.
+        :return:            True if the room was closed. False if it does not exist or is pinned.
+        """
+        with self._lock:
+            if room_id not in self._rooms:
+                return False
+            del self._rooms[room_id]
+            del self._last_access[room_id]
+            if self.store is not None:
+                self.store.remove_room(room_id)
+            return True
+
+    def freeze(self, room_id: str) -> Game:
+        """
+        Description:        Method used to stop a room from accepting commands so it can be exported. Pinned rooms
+                            can't be moved.
+        :param room_id:     ID of the room.
+        :return:            Game object for the frozen room or None if it does not exist or is pinned.
+        """
+        with self._lock:
+            game: Game = self._rooms.get(room_id)
+        if game is not None:
+            game.freeze()
+        return game
+
+    def thaw(self, room_id: str) -> bool:
+        """
+        Description:        Method used to let a frozen room accept commands again (ex. if moving it failed).
+        :param room_id:     ID of the room.
+        :return:            True if the room was thawed. False if it does not exist.
+        """
+        with self._lock:
+            game: Game = self._rooms.get(room_id)
+        if game is None:
+            return False
+        game.thaw()
+        return True
+
+    def release(self, room_id: str, target: str) -> bool:
+        """
+        Description:        Method used to drop a frozen room once it has been moved to another server. Requests for
+                            the room are redirected to the target from then on.
+        :param room_id:     ID of the room.
+        :param target:      URL of the server the room was moved to.
+        :return:            True if the room was released. False if it does not exist or isn't frozen.
+        """
+        with self._lock:
+            game: Game = self._rooms.get(room_id)
+            if game is None or not game.frozen:
+                return False
+            del self._rooms[room_id]
+            del self._last_access[room_id]
+            if self.store is not None:
+                self.store.remove_room(room_id)
+            self._redirects[room_id] = target
+            while len(self._redirects) > self.max_rooms:
+                self._redirects.popitem(last=False)
+        # Wake up anyone long-polling the room so they find out it moved
+        with game._event_condition:
+            game.event_queue = EventFanout()
+            game._event_condition.notify_all()
+        return True
+
+    def adopt(self, room_id: str, game: Game) -> bool:
+        """
+        Description:        Method used to host a room which was moved here from another server.
+        :param room_id:     ID of the room.
+        :param game:        Game object for the room.
+        :return:            True if the room was added. False if the ID is taken or there is no room left.
+        """
+        with self._lock:
+            self._evict_idle()
+            if room_id in self or len(self) >= self.max_rooms:
+                return False
+            self._add(room_id, game, pinned=False)
+            self._redirects.pop(room_id, None)
+            if self.store is not None:
+                self.store.add_room(room_id, game.seed)
+                self.store.save(room_id, game.command_log)
+            return True
+
+    def redirect(self, room_id: str) -> str:
+        """
+        Description:        Method used to look up where a room was moved to.
+        :param room_id:     ID of the room.
+        :return:            URL of the server now hosting the room or None if it wasn't moved.
+        """
+        with self._lock:
+            return self._redirects.get(room_id)
+
+    def list_rooms(self) -> list[dict[str, Any]]:
+        """
+        Description:    Method used to list a summary of every open room.
+        :return:        List of dictionaries with the room ID, number of players, and whether the game started.
+        """
+        with self._lock:
+            self._evict_idle()
+            return [{
+                "roomId": room_id,
+                "numPlayers": len(game.players),
+                "started": game.started
+            } for room_id, game in list(self._pinned.items()) + list(self._rooms.items())]
+
+    def evict_idle(self) -> list[str]:
+        """
+        Description:    Method used to evict every room which has gone longer than the time to live without access.
+        :return:        List of evicted room IDs.
+        """
+        with self._lock:
+            return self._evict_idle()
+
+    """ Private Helper Methods """
+
+    def _add(self, room_id: str, game: Game, pinned: bool) -> None:
+        """
+        Description:        Method used to add a room for callers already holding the lock.
+        :param room_id:     ID of the room.
+        :param game:        Game object for the room.
+        :param pinned:      Whether the room should be exempt from eviction and closing.
+        :return:            None.
+        """
+        if pinned:
+            self._pinned[room_id] = game
+        else:
+            self._rooms[room_id] = game
+            self._last_access[room_id] = self._clock()
+
+    def _evict_idle(self) -> list[str]:
+        """
+        Description:    Implementation of evict_idle() for callers already holding the lock. Rooms are kept in access
+                        order, so this stops as soon as it finds a room which is still live.
+        :return:        List of evicted room IDs.
+        """
+        evicted: list[str] = []
+        cutoff: float = self._clock() - self.ttl
+        while len(self._rooms) > 0:
+            room_id: str = next(iter(self._rooms))
+            if self._last_access[room_id] > cutoff:
+                break
+            del self._rooms[room_id]
+            del self._last_access[room_id]
+            if self.store is not None:
+                self.store.remove_room(room_id)
+            evicted.append(room_id)
+        return evicted
+
+    def _generate_room_id(self) -> str:
+        """
+        Description:    Method used to generate a random room ID which is not already in use.
+        :return:        Room ID string.
+        """
+        character_set: str = string.ascii_lowercase + string.digits
+        room_id: str = "".join(secrets.choice(character_set) for _ in range(ROOM_ID_LENGTH))
+        while room_id in self or room_id == DEFAULT_ROOM_ID:
+            room_id = "".join(secrets.choice(character_set) for _ in range(ROOM_ID_LENGTH))
+        return room_id
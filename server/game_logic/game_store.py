@@ -0,0 +1,130 @@
+"""
+Description:    Class persisting the command log of every room to a SQLite database so rooms survive a restart.
+Date:           12/09/2023
+Author:         Jordan Bourdeau
+"""
+
+from .command_log import CommandLog
+
+import json
+import sqlite3
+import threading
+
+
+class GameStore:
+
+    def __init__(self, path: str) -> None:
+        """
+        Description:    Durable store of the rooms hosted by a server process. Games are deterministic given their
+                        seed and command log, so only the commands are written (append-only) rather than the full state,
+                        and a room is restored by replaying them. The database is opened in write-ahead log mode so
+                        each batch of commands is a single sequential append that readers never block on.
+        :param path:    Path of the SQLite database file. Created if it doesn't exist.
+        :returns:       None.
+        """
+        self.path: str = path
+        # Shared between request threads, so every use of the connection is guarded by the lock
+        self._connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock: threading.Lock = threading.Lock()
+        # Maps room IDs to the number of commands of their log which have been written
+        self._saved: dict[str, int] = {}
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only syncs at checkpoints. A power loss can lose the last few commits but never corrupts
+            # the database, and commits no longer wait on an fsync.
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS rooms ("
+                                     "room_id TEXT PRIMARY KEY, seed TEXT NOT NULL, pinned INTEGER NOT NULL)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS commands ("
+                                     "room_id TEXT NOT NULL, idx INTEGER NOT NULL, command TEXT NOT NULL, "
+                                     "PRIMARY KEY (room_id, idx)) WITHOUT ROWID")
+            # Rooms whose logs couldn't be replayed, kept for post-mortem debugging
+            self._connection.execute("CREATE TABLE IF NOT EXISTS quarantine ("
+                                     "room_id TEXT NOT NULL, seed TEXT NOT NULL, pinned INTEGER NOT NULL, "
+                                     "commands TEXT NOT NULL, error TEXT NOT NULL)")
+
+    def add_room(self, room_id: str, seed: int, pinned: bool = False) -> None:
+        """
+        Description:        Method used to start persisting a room.
+        :param room_id:     ID of the room.
+        :param seed:        Seed of the room's game.
+        :param pinned:      Whether the room is exempt from eviction and closing.
+        :return:            None.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.execute("DELETE FROM commands WHERE room_id = ?", (room_id,))
+            # Seeds can be up to 64 unsigned bits which doesn't fit in an SQLite integer, so they are stored as text
+            self._connection.execute("INSERT OR REPLACE INTO rooms VALUES (?, ?, ?)", (room_id, str(seed), int(pinned)))
+            self._saved[room_id] = 0
+
+    def remove_room(self, room_id: str) -> None:
+        """
+        Description:        Method used to delete a room and its commands.
+        :param room_id:     ID of the room.
+        :return:            None.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.execute("DELETE FROM commands WHERE room_id = ?", (room_id,))
+            self._connection.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+            self._saved.pop(room_id, None)
+
+    def quarantine(self, room_id: str, error: str) -> None:
+        """
+        Description:        Method used to set aside a room which can't be restored. Its commands are moved out of the
+                            way (along with the error) so the room ID can be reused and the log can still be debugged.
+        :param room_id:     ID of the room.
+        :param error:       Description of why the room couldn't be restored.
+        :return:            None.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            commands: list[str] = [command for (command,) in self._connection.execute(
+                "SELECT command FROM commands WHERE room_id = ? ORDER BY idx", (room_id,))]
+            self._connection.execute("INSERT INTO quarantine SELECT room_id, seed, pinned, ?, ? FROM rooms "
+                                     "WHERE room_id = ?", (f"[{','.join(commands)}]", error, room_id))
+            self._connection.execute("DELETE FROM commands WHERE room_id = ?", (room_id,))
+            self._connection.execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+            self._saved.pop(room_id, None)
+
+    def save(self, room_id: str, log: CommandLog) -> int:
+        """
+        Description:        Method used to write the commands a room accepted since it was last saved. They are written
+                            in a single transaction, so a request which ran several commands only commits once.
+        :param room_id:     ID of the room.
+        :param log:         Command log of the room's game.
+        :return:            Number of commands written.
+        """
+        with self._lock:
+            start: int = self._saved.get(room_id)
+            if start is None:
+                return 0
+            commands: list[tuple] = log.since(start)
+            if len(commands) == 0:
+                return 0
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.executemany("INSERT INTO commands VALUES (?, ?, ?)",
+                                             [(room_id, start + offset, json.dumps(command, separators=(",", ":")))
+                                              for offset, command in enumerate(commands)])
+            self._saved[room_id] = start + len(commands)
+            return len(commands)
+
+    def load(self) -> list[tuple[str, bool, CommandLog]]:
+        """
+        Description:    Method used to read back every persisted room.
+        :return:        List of (room ID, pinned, command log) tuples.
+        """
+        rooms: list[tuple[str, bool, CommandLog]] = []
+        with self._lock:
+            for room_id, seed, pinned in self._connection.execute("SELECT room_id, seed, pinned FROM rooms").fetchall():
+                commands: list[tuple] = [tuple(json.loads(command)) for (command,) in self._connection.execute(
+                    "SELECT command FROM commands WHERE room_id = ? ORDER BY idx", (room_id,))]
+                rooms.append((room_id, bool(pinned), CommandLog(int(seed), commands)))
+                self._saved[room_id] = len(commands)
+        return rooms
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
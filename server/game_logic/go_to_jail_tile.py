@@ -10,6 +10,7 @@ from .player_updates import GoToJailUpdate
 
 
 class GoToJailTile(Tile):
+    __slots__ = ()
 
     def __init__(self) -> None:
         """
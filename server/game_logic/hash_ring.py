@@ -0,0 +1,90 @@
+"""
+Description:    Consistent hash ring used to assign rooms to server processes.
+Date:           12/12/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import HASH_RING_REPLICAS
+
+import bisect
+import hashlib
+
+
+class HashRing:
+
+    def __init__(self, nodes: list[str] = (), replicas: int = HASH_RING_REPLICAS) -> None:
+        """
+        Description:        Consistent hash ring mapping keys (room IDs) to nodes (server URLs). Each node is placed on
+                            the ring at `replicas` pseudo-random points, and a key belongs to the first node point at or
+                            after its own hash. Adding or removing a node only moves the keys next to its points, which
+                            is about 1/N of them, and the virtual points keep the load even between nodes.
+        :param nodes:       Nodes to start with.
+        :param replicas:    Number of points each node gets on the ring.
+        :returns:           None.
+        """
+        self.replicas: int = replicas
+        self._nodes: set[str] = set()
+        # Sorted hashes of every point on the ring and the node each one belongs to
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def nodes(self) -> list[str]:
+        return sorted(self._nodes)
+
+    def add(self, node: str) -> bool:
+        """
+        Description:    Method used to add a node to the ring.
+        :param node:    Node to add.
+        :return:        True if the node was added. False if it was already on the ring.
+        """
+        if node in self._nodes:
+            return False
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            point: int = self._hash(f"{node}#{replica}")
+            index: int = bisect.bisect_left(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+        return True
+
+    def remove(self, node: str) -> bool:
+        """
+        Description:    Method used to take a node off the ring. Its keys move to the nodes after its points.
+        :param node:    Node to remove.
+        :return:        True if the node was removed. False if it wasn't on the ring.
+        """
+        if node not in self._nodes:
+            return False
+        self._nodes.remove(node)
+        kept: list[int] = [index for index, owner in enumerate(self._owners) if owner != node]
+        self._points = [self._points[index] for index in kept]
+        self._owners = [self._owners[index] for index in kept]
+        return True
+
+    def get(self, key: str) -> str:
+        """
+        Description:    Method used to find the node a key belongs to.
+        :param key:     Key to look up.
+        :return:        The node or None if the ring is empty.
+        """
+        if len(self._points) == 0:
+            return None
+        index: int = bisect.bisect_left(self._points, self._hash(key))
+        # Wrap around past the last point
+        return self._owners[index % len(self._owners)]
+
+    """ Private Helper Methods """
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes (unlike hash()) so every router agrees on where a room lives
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
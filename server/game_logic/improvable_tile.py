@@ -11,6 +11,7 @@ from .types import AssetGroups, PropertyStatus
 
 
 class ImprovableTile(AssetTile):
+    __slots__ = ()
 
     def __init__(self, id: int, name: str, price: int, group: AssetGroups) -> None:
         """
@@ -39,16 +40,17 @@ class ImprovableTile(AssetTile):
         if self.is_mortgaged:
             return 0
         total_worth: int = self.mortage_price
-        total_worth += max(0, self.status - PropertyStatus.MONOPOLY) * self.improvement_cost / 2
+        # Improvement costs are all even, so selling them back at half price stays in whole dollars
+        total_worth += max(0, self.status - PropertyStatus.MONOPOLY) * self.improvement_cost // 2
         return total_worth
 
-    def to_dict(self) -> dict[str, Any]:
+    def _make_client_bindings(self) -> dict[str, Any]:
         """
         Description:    Method used to return a dictionary representation of the class.
                         Used for creating JSON representation of the game state.
         :return:        Dictionary of class attributes.
         """
-        client_bindings: dict = super().to_dict()
+        client_bindings: dict = super()._make_client_bindings()
         client_bindings["type"] = "improvable"
         client_bindings["improvementCost"] = self.improvement_cost
         client_bindings["baseRent"] = RENTS[self.id][PropertyStatus.NO_MONOPOLY]
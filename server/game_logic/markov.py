@@ -0,0 +1,269 @@
+"""
+Description:    Analytics computing the steady-state probability of landing on each tile from a Markov chain over the
+                board, along with the expected rent and return on each improvement. Requires NumPy.
+                Run from the repository root with: python -m server.game_logic.markov
+Date:           12/07/2023
+Author:         Jordan Bourdeau
+"""
+
+from .board import BOARD
+from .constants import (CHANCE_TILES, COMMUNITY_CHEST_TILES, IMPROVEMENT_MAP, JAIL_LOCATION, JAIL_TURNS,
+                        MAX_DIE, MIN_DIE, NUM_TILES, RENT_TABLE)
+from .improvable_tile import ImprovableTile
+from .types import PropertyStatus
+
+import numpy as np
+import time
+
+# Tile players are sent to jail from
+GO_TO_JAIL_LOCATION: int = 30
+# Number of doubles in a row which sends a player to jail
+MAX_DOUBLES_STREAK: int = 3
+# States are (tile, doubles streak) for every tile and streak below the max, followed by one state for each turn a
+# player has left in jail (most turns first).
+NUM_ROLL_STATES: int = NUM_TILES * MAX_DOUBLES_STREAK
+NUM_STATES: int = NUM_ROLL_STATES + JAIL_TURNS
+# Expected total of two dice (twice the expected value of one), used for utility rent multipliers
+EXPECTED_ROLL: float = MIN_DIE + MAX_DIE
+
+# Tiles the "advance to the nearest railroad/utility" cards can send a player to
+RAILROAD_TILES: list[int] = [5, 15, 25, 35]
+UTILITY_TILES: list[int] = [12, 28]
+# Number of cards in each deck
+DECK_SIZE: int = 16
+
+
+def state_index(tile: int, doubles_streak: int) -> int:
+    """
+    Description:            Function mapping a tile and doubles streak to its index in the transition matrix.
+    :param tile:            Tile the player is on.
+    :param doubles_streak:  Number of doubles the player has rolled in a row.
+    :return:                State index.
+    """
+    return doubles_streak * NUM_TILES + tile
+
+
+def jail_index(turns_in_jail: int) -> int:
+    """
+    Description:            Function mapping the number of turns a player has left in jail to its state index.
+    :param turns_in_jail:   Turns left in jail (1 to JAIL_TURNS).
+    :return:                State index.
+    """
+    return NUM_ROLL_STATES + JAIL_TURNS - turns_in_jail
+
+
+def dice_distribution() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Description:    Function computing the distribution of two dice split by whether they were doubles.
+    :return:        Tuple of arrays indexed by the total with the probability of a non-doubles and doubles roll.
+    """
+    faces: np.ndarray = np.arange(MIN_DIE, MAX_DIE + 1)
+    first, second = np.meshgrid(faces, faces)
+    probability: float = 1 / faces.size ** 2
+    totals: np.ndarray = (first + second).ravel()
+    doubles: np.ndarray = (first == second).ravel()
+    non_doubles_distribution: np.ndarray = np.bincount(totals[~doubles], minlength=2 * MAX_DIE + 1) * probability
+    doubles_distribution: np.ndarray = np.bincount(totals[doubles], minlength=2 * MAX_DIE + 1) * probability
+    return non_doubles_distribution, doubles_distribution
+
+
+def movement_matrix(distribution: np.ndarray) -> np.ndarray:
+    """
+    Description:            Function building the NUM_TILES x NUM_TILES matrix of the probability of moving from one
+                            tile to another with a roll from the given distribution.
+    :param distribution:    Probability of each roll total.
+    :return:                Movement matrix.
+    """
+    identity: np.ndarray = np.eye(NUM_TILES)
+    matrix: np.ndarray = np.zeros((NUM_TILES, NUM_TILES))
+    for total in np.nonzero(distribution)[0]:
+        matrix += distribution[total] * np.roll(identity, total, axis=1)
+    return matrix
+
+
+def card_destinations(tile: int) -> list:
+    """
+    Description:    Function listing where each movement card sends a player who draws it on a card tile.
+    :param tile:    Card tile the card was drawn on.
+    :return:        List of destination tiles (or "jail") for each movement card in the deck.
+    """
+    def nearest(tiles: list[int]) -> int:
+        return min(tiles, key=lambda destination: (destination - tile) % NUM_TILES)
+
+    # Each entry is a destination (or "jail") for one of the DECK_SIZE cards in the deck and the rest of the deck
+    # doesn't move the player. Mirrors the card text in Game's decks.
+    if tile in COMMUNITY_CHEST_TILES:
+        return [0, "jail"]
+    # Chance: Boardwalk, Go, Illinois Avenue, St. Charles Place, two nearest railroad cards, nearest utility, go back
+    # three spaces, go to jail, and Reading Railroad.
+    return [39, 0, 24, 11, nearest(RAILROAD_TILES), nearest(RAILROAD_TILES), nearest(UTILITY_TILES),
+            (tile - 3) % NUM_TILES, "jail", 5]
+
+
+def resolution_matrix(doubles_streak: int, card_moves: bool) -> np.ndarray:
+    """
+    Description:            Function building the NUM_TILES x NUM_STATES matrix mapping the tile a roll arrives on to
+                            the state the player ends up in after the Go To Jail tile and any movement cards.
+    :param doubles_streak:  Doubles streak the player has after the roll.
+    :param card_moves:      Whether card tiles move the player.
+    :return:                Resolution matrix.
+    """
+    matrix: np.ndarray = np.zeros((NUM_TILES, NUM_STATES))
+    matrix[np.arange(NUM_TILES), state_index(np.arange(NUM_TILES), doubles_streak)] = 1
+    matrix[GO_TO_JAIL_LOCATION] = 0
+    matrix[GO_TO_JAIL_LOCATION, jail_index(JAIL_TURNS)] = 1
+    if not card_moves:
+        return matrix
+    # Resolve chance tiles last since going back three spaces from one can land on community chest
+    for tile in COMMUNITY_CHEST_TILES + CHANCE_TILES:
+        destinations: list = card_destinations(tile)
+        row: np.ndarray = matrix[tile] * (DECK_SIZE - len(destinations)) / DECK_SIZE
+        for destination in destinations:
+            if destination == "jail":
+                row[jail_index(JAIL_TURNS)] += 1 / DECK_SIZE
+            else:
+                row += matrix[destination] / DECK_SIZE
+        matrix[tile] = row
+    return matrix
+
+
+def transition_matrix(card_moves: bool = False) -> np.ndarray:
+    """
+    Description:        Function building the NUM_STATES x NUM_STATES transition matrix between rolls. Models the
+                        game's rules: doubles roll again, a third doubles in a row goes straight to jail, landing on
+                        the Go To Jail tile goes to jail, and a player in jail only leaves by rolling doubles (moving by
+                        that roll without rolling again) or by waiting out their turns.
+    :param card_moves:  Whether chance and community chest cards move the player. Cards don't have effects in the game
+                        yet, so this is off by default.
+    :return:            Row-stochastic transition matrix.
+    """
+    non_doubles, doubles = dice_distribution()
+    non_doubles_moves: np.ndarray = movement_matrix(non_doubles)
+    doubles_moves: np.ndarray = movement_matrix(doubles)
+    resolutions: list[np.ndarray] = [resolution_matrix(streak, card_moves) for streak in range(MAX_DOUBLES_STREAK)]
+    matrix: np.ndarray = np.zeros((NUM_STATES, NUM_STATES))
+    for streak in range(MAX_DOUBLES_STREAK):
+        rows: slice = slice(state_index(0, streak), state_index(0, streak) + NUM_TILES)
+        matrix[rows] = non_doubles_moves @ resolutions[0]
+        if streak + 1 < MAX_DOUBLES_STREAK:
+            matrix[rows] += doubles_moves @ resolutions[streak + 1]
+        else:
+            matrix[rows, jail_index(JAIL_TURNS)] += doubles.sum()
+    for turns in range(JAIL_TURNS, 0, -1):
+        row: int = jail_index(turns)
+        # Doubles get them out and they move by the roll with their streak reset
+        matrix[row] = doubles_moves[JAIL_LOCATION] @ resolutions[0]
+        if turns > 1:
+            matrix[row, jail_index(turns - 1)] += non_doubles.sum()
+        else:
+            matrix[row, state_index(JAIL_LOCATION, 0)] += non_doubles.sum()
+    return matrix
+
+
+def steady_state(matrix: np.ndarray, method: str = "solve", tolerance: float = 1e-12,
+                 max_iterations: int = 10000) -> np.ndarray:
+    """
+    Description:            Function solving for the stationary distribution of a transition matrix.
+    :param matrix:          Row-stochastic transition matrix.
+    :param method:          "solve" for a direct linear solve or "power" for power iteration.
+    :param tolerance:       Convergence tolerance for power iteration.
+    :param max_iterations:  Iteration cap for power iteration.
+    :return:                Stationary distribution over the states.
+    """
+    num_states: int = matrix.shape[0]
+    if method == "solve":
+        # Solve pi (P - I) = 0 with the last equation replaced by sum(pi) = 1
+        system: np.ndarray = (matrix - np.eye(num_states)).T
+        system[-1] = 1
+        rhs: np.ndarray = np.zeros(num_states)
+        rhs[-1] = 1
+        return np.linalg.solve(system, rhs)
+    elif method == "power":
+        distribution: np.ndarray = np.full(num_states, 1 / num_states)
+        for _ in range(max_iterations):
+            updated: np.ndarray = distribution @ matrix
+            if np.abs(updated - distribution).max() < tolerance:
+                return updated
+            distribution = updated
+        return distribution
+    raise ValueError(f"Unknown method: {method}")
+
+
+def landing_probabilities(card_moves: bool = False, method: str = "solve") -> np.ndarray:
+    """
+    Description:        Function computing the long-run probability of a roll leaving a player on each tile. Every
+                        turn in jail counts as being on the jail tile.
+    :param card_moves:  Whether chance and community chest cards move the player.
+    :param method:      Method used to solve for the steady state.
+    :return:            Array of probabilities indexed by tile ID.
+    """
+    distribution: np.ndarray = steady_state(transition_matrix(card_moves), method)
+    probabilities: np.ndarray = distribution[:NUM_ROLL_STATES].reshape(MAX_DOUBLES_STREAK, NUM_TILES).sum(axis=0)
+    probabilities[JAIL_LOCATION] += distribution[NUM_ROLL_STATES:].sum()
+    return probabilities
+
+
+def rent_table() -> np.ndarray:
+    """
+    Description:    Function converting RENT_TABLE into a NUM_TILES x RENT_TABLE_WIDTH array indexed by tile ID and
+                    status. Utilities use their multiplier times the expected roll. Statuses a tile can't have are 0.
+    :return:        Rent table.
+    """
+    table: np.ndarray = np.array(RENT_TABLE, dtype=float).clip(min=0)
+    table[UTILITY_TILES] *= EXPECTED_ROLL
+    return table
+
+
+def expected_rents(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Description:            Function computing the rent a tile is expected to collect per opponent roll at each
+                            status (for railroads the status is the number owned).
+    :param probabilities:   Landing probabilities indexed by tile ID.
+    :return:                NUM_TILES x RENT_TABLE_WIDTH array of expected rent.
+    """
+    return probabilities[:, np.newaxis] * rent_table()
+
+
+def improvement_costs() -> np.ndarray:
+    """
+    Description:    Function listing the cost of one improvement on each tile (0 for tiles which can't be improved).
+    :return:        Array of costs indexed by tile ID.
+    """
+    costs: np.ndarray = np.zeros(NUM_TILES)
+    for template in BOARD:
+        if template.kind is ImprovableTile:
+            costs[template.id] = IMPROVEMENT_MAP[template.group]
+    return costs
+
+
+def improvement_roi(probabilities: np.ndarray) -> np.ndarray:
+    """
+    Description:            Function computing the return on each improvement: the extra rent it is expected to
+                            collect per opponent roll divided by its cost. Column n is the nth improvement.
+    :param probabilities:   Landing probabilities indexed by tile ID.
+    :return:                NUM_TILES x 5 array of returns (0 for tiles which can't be improved).
+    """
+    rents: np.ndarray = expected_rents(probabilities)
+    extra_rent: np.ndarray = np.diff(rents[:, PropertyStatus.MONOPOLY:], axis=1)
+    costs: np.ndarray = improvement_costs()
+    roi: np.ndarray = np.zeros_like(extra_rent)
+    improvable: np.ndarray = costs > 0
+    roi[improvable] = extra_rent[improvable] / costs[improvable, np.newaxis]
+    return roi
+
+
+def main() -> None:
+    names: list[str] = [template.name for template in BOARD]
+    start: float = time.perf_counter()
+    probabilities: np.ndarray = landing_probabilities()
+    roi: np.ndarray = improvement_roi(probabilities)
+    elapsed: float = time.perf_counter() - start
+    print(f"Solved in {elapsed * 1000:.1f}ms")
+    print(f"{'Tile':<24}{'Landing':>9}  ROI per improvement (per opponent roll)")
+    for tile_id in range(NUM_TILES):
+        returns: str = " ".join(f"{value:.4f}" for value in roi[tile_id]) if roi[tile_id].any() else ""
+        print(f"{names[tile_id]:<24}{probabilities[tile_id]:>9.4f}  {returns}")
+
+
+if __name__ == '__main__':
+    main()
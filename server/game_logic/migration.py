@@ -0,0 +1,113 @@
+"""
+Description:    Moves a live room from one server process (or node) to another. The room is frozen on the source,
+                exported as a binary snapshot along with the events its players haven't received yet, imported on the
+                target, and then released on the source, which redirects its clients to the target from then on.
+                Run from the repository root with:
+                python -m server.game_logic.migration <room_id> http://source:5000 http://target:5000
+Date:           12/11/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import MIGRATION_TOKEN, MIGRATION_TOKEN_HEADER
+from .event_fanout import EventFanout
+from .game import Game
+from .snapshot import from_bytes, to_bytes
+
+from urllib.parse import quote
+
+import argparse
+import json
+import struct
+import time
+import urllib.request
+
+_LENGTH: struct.Struct = struct.Struct("<I")
+
+
+def export_room(game: Game) -> bytes:
+    """
+    Description:    Function which packs a room for migration: a snapshot with the command log (so the room can still
+                    be persisted and replayed on the target) followed by the pending events and player cursors. The
+                    game should be frozen first so nothing changes after it is exported.
+    :param game:    Game for the room.
+    :return:        Packed bytes.
+    """
+    snapshot: bytes = to_bytes(game, include_commands=True)
+    with game._event_lock:
+        events: bytes = json.dumps(game.event_queue.to_dict(), separators=(",", ":")).encode()
+    return _LENGTH.pack(len(snapshot)) + snapshot + events
+
+
+def import_room(data: bytes) -> Game:
+    """
+    Description:    Function which rebuilds a room packed by export_room(). Players receive the events they hadn't
+                    received on the source as if nothing happened.
+    :param data:    Packed bytes.
+    :return:        Game for the room.
+    """
+    if len(data) < _LENGTH.size:
+        raise ValueError("Truncated room export")
+    length: int = _LENGTH.unpack_from(data)[0]
+    game: Game = from_bytes(data[_LENGTH.size:_LENGTH.size + length])
+    try:
+        game.event_queue = EventFanout.from_dict(json.loads(data[_LENGTH.size + length:]))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid events in room export")
+    return game
+
+
+def migrate(room_id: str, source: str, target: str, timeout: float = 10, token: str = MIGRATION_TOKEN) -> float:
+    """
+    Description:        Function which moves a room between two servers using their /room/export, /room/import, and
+                        /room/release endpoints. If anything fails before the room is released, it is thawed on the
+                        source so play continues there.
+    :param room_id:     ID of the room.
+    :param source:      Base URL of the server hosting the room.
+    :param target:      Base URL of the server the room is moved to. Clients are redirected to it, so it must be one of
+                        the source's migration targets.
+    :param timeout:     Number of seconds to wait on each request.
+    :param token:       Migration token both servers require on their internal endpoints.
+    :return:            Number of seconds the room was frozen for.
+    """
+    room: str = quote(room_id)
+    headers: dict[str, str] = {MIGRATION_TOKEN_HEADER: token or ""}
+
+    def request(url: str, data: bytes = None) -> urllib.request.Request:
+        if data is None:
+            return urllib.request.Request(url, headers=headers)
+        return urllib.request.Request(url, data=data, method="POST",
+                                      headers={**headers, "Content-Type": "application/octet-stream"})
+
+    start: float = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request(f"{source}/room/export?room_id={room}"), timeout=timeout) as response:
+            if response.headers.get_content_type() != "application/octet-stream":
+                raise RuntimeError(f"Room {room_id} could not be exported from {source}")
+            data: bytes = response.read()
+        with urllib.request.urlopen(request(f"{target}/room/import?room_id={room}", data), timeout=timeout) as response:
+            if not json.load(response).get("success"):
+                raise RuntimeError(f"Room {room_id} could not be imported into {target}")
+    except Exception:
+        with urllib.request.urlopen(request(f"{source}/room/thaw?room_id={room}"), timeout=timeout):
+            pass
+        raise
+    with urllib.request.urlopen(request(f"{source}/room/release?room_id={room}&target={quote(target)}"),
+                                timeout=timeout) as response:
+        if not json.load(response).get("success"):
+            raise RuntimeError(f"Room {room_id} could not be released from {source}")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Move a live room to another server.")
+    parser.add_argument("room_id", type=str, help="ID of the room.")
+    parser.add_argument("source", type=str, help="Base URL of the server hosting the room.")
+    parser.add_argument("target", type=str, help="Base URL of the server to move the room to.")
+    args = parser.parse_args()
+
+    paused: float = migrate(args.room_id, args.source.rstrip("/"), args.target.rstrip("/"))
+    print(f"Moved room {args.room_id} to {args.target} (frozen for {paused * 1000:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Description:    Parallel Monte Carlo runner which shards simulated games across processes and merges their statistics
+                into one report. Used for balance studies of the rent and improvement tables.
+                Run from the repository root with: python -m server.game_logic.monte_carlo --games 100000
+Date:           12/06/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import MAX_SIMULATION_TURNS, MONTE_CARLO_SHARD_SIZE, NUM_TILES
+from .simulate import BOTS, Bot, SimulationResult, Simulation
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import argparse
+import json
+import os
+import random
+import time
+
+
+class MonteCarloReport:
+
+    def __init__(self, bot_names: list[str]) -> None:
+        """
+        Description:        Running totals over a batch of simulated games. Reports from different shards are merged
+                            by adding their totals together.
+        :param bot_names:   Name of the bot in each seat.
+        :returns:           None.
+        """
+        self.bot_names: list[str] = bot_names
+        self.num_games: int = 0
+        self.total_turns: int = 0
+        # Number of games which were called for the richest player after hitting the turn limit
+        self.timeouts: int = 0
+        self.wins: list[int] = [0] * len(bot_names)
+        self.bankruptcies: list[int] = [0] * len(bot_names)
+        # Sum of the turns each seat went bankrupt on, used for the average
+        self.bankruptcy_turn_totals: list[int] = [0] * len(bot_names)
+        self.landings: list[int] = [0] * NUM_TILES
+        self.rent_collected: list[int] = [0] * NUM_TILES
+
+    def add(self, result: SimulationResult, max_turns: int) -> None:
+        """
+        Description:        Method used to add a single game to the totals.
+        :param result:      Result of the game.
+        :param max_turns:   Turn limit the game was played with.
+        :return:            None.
+        """
+        self.num_games += 1
+        self.total_turns += result.turns
+        if result.turns >= max_turns:
+            self.timeouts += 1
+        self.wins[result.winner] += 1
+        for seat, turn in enumerate(result.bankruptcy_turns):
+            if turn is not None:
+                self.bankruptcies[seat] += 1
+                self.bankruptcy_turn_totals[seat] += turn
+        for tile_id in range(NUM_TILES):
+            self.landings[tile_id] += result.landings[tile_id]
+            self.rent_collected[tile_id] += result.rent_collected[tile_id]
+
+    def merge(self, other: "MonteCarloReport") -> None:
+        """
+        Description:    Method used to add the totals from another report into this one.
+        :param other:   Report to merge in. Must be for the same seats.
+        :return:        None.
+        """
+        if other.bot_names != self.bot_names:
+            raise ValueError("Can't merge reports for different seats")
+        self.num_games += other.num_games
+        self.total_turns += other.total_turns
+        self.timeouts += other.timeouts
+        for seat in range(len(self.bot_names)):
+            self.wins[seat] += other.wins[seat]
+            self.bankruptcies[seat] += other.bankruptcies[seat]
+            self.bankruptcy_turn_totals[seat] += other.bankruptcy_turn_totals[seat]
+        for tile_id in range(NUM_TILES):
+            self.landings[tile_id] += other.landings[tile_id]
+            self.rent_collected[tile_id] += other.rent_collected[tile_id]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Description:    Method used to summarize the report with rates and averages.
+        :return:        Dictionary representation of the report.
+        """
+        total_landings: int = max(sum(self.landings), 1)
+        num_games: int = max(self.num_games, 1)
+        return {
+            "numGames": self.num_games,
+            "averageTurns": self.total_turns / num_games,
+            "timeoutRate": self.timeouts / num_games,
+            "seats": [{
+                "bot": name,
+                "winRate": self.wins[seat] / num_games,
+                "bankruptcyRate": self.bankruptcies[seat] / num_games,
+                "averageBankruptcyTurn": (self.bankruptcy_turn_totals[seat] / self.bankruptcies[seat]
+                                          if self.bankruptcies[seat] > 0 else None)
+            } for seat, name in enumerate(self.bot_names)],
+            "tiles": [{
+                "id": tile_id,
+                "landingFrequency": self.landings[tile_id] / total_landings,
+                "averageRent": self.rent_collected[tile_id] / num_games
+            } for tile_id in range(NUM_TILES)]
+        }
+
+
+def run_shard(bot_names: list[str], num_games: int, seed: int,
+              max_turns: int = MAX_SIMULATION_TURNS) -> MonteCarloReport:
+    """
+    Description:        Function which plays one shard of games and totals them. Runs inside the worker processes, so
+                        the bots are passed by name.
+    :param bot_names:   Name of the bot in each seat.
+    :param num_games:   Number of games to play.
+    :param seed:        Seed for the shard. Each game gets its own seed derived from it.
+    :param max_turns:   Number of turns after which a game is called for the richest player.
+    :return:            MonteCarloReport for the shard.
+    """
+    rng: random.Random = random.Random(seed)
+    report: MonteCarloReport = MonteCarloReport(bot_names)
+    for _ in range(num_games):
+        bots: list[Bot] = [BOTS[name]() for name in bot_names]
+        report.add(Simulation(bots, rng.getrandbits(64), max_turns).run(), max_turns)
+    return report
+
+
+def run_monte_carlo(bot_names: list[str], num_games: int, seed: int = 0, workers: int = None,
+                    max_turns: int = MAX_SIMULATION_TURNS,
+                    shard_size: int = MONTE_CARLO_SHARD_SIZE) -> MonteCarloReport:
+    """
+    Description:        Function which shards games across a process pool and merges the results. Games are split
+                        into fixed-size shards whose seeds only depend on the batch seed, so a batch gives the same
+                        report no matter how many workers it runs on.
+    :param bot_names:   Name of the bot in each seat.
+    :param num_games:   Number of games to play.
+    :param seed:        Seed for the batch.
+    :param workers:     Number of worker processes (defaults to the number of CPUs). Runs in-process if it is 1.
+    :param max_turns:   Number of turns after which a game is called for the richest player.
+    :param shard_size:  Number of games in each shard.
+    :return:            Merged MonteCarloReport.
+    """
+    for name in bot_names:
+        if name not in BOTS:
+            raise ValueError(f"Unknown bot: {name}")
+    rng: random.Random = random.Random(seed)
+    shards: list[tuple[int, int]] = []
+    for start in range(0, num_games, shard_size):
+        shards.append((min(shard_size, num_games - start), rng.getrandbits(64)))
+    report: MonteCarloReport = MonteCarloReport(bot_names)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        for size, shard_seed in shards:
+            report.merge(run_shard(bot_names, size, shard_seed, max_turns))
+        return report
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, bot_names, size, shard_seed, max_turns) for size, shard_seed in shards]
+        # Merge in submission order so the report doesn't depend on which shard finishes first
+        for future in futures:
+            report.merge(future.result())
+    return report
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Run a Monte Carlo batch of bot games.")
+    parser.add_argument("--games", type=int, default=10000, help="Number of games to play.")
+    parser.add_argument("--bots", nargs="+", default=list(BOTS.keys()), choices=list(BOTS.keys()),
+                        help="Bot for each seat.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the batch.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--max-turns", type=int, default=MAX_SIMULATION_TURNS, help="Turn limit for each game.")
+    parser.add_argument("--output", type=str, default=None, help="Path to write the JSON report to.")
+    args = parser.parse_args()
+
+    start: float = time.perf_counter()
+    report: MonteCarloReport = run_monte_carlo(args.bots, args.games, args.seed, args.workers, args.max_turns)
+    elapsed: float = time.perf_counter() - start
+    summary: dict[str, Any] = report.to_dict()
+    print(f"{report.num_games} games in {elapsed:.2f}s ({report.num_games / elapsed:.0f} games/s)")
+    print(f"Average turns: {summary['averageTurns']:.1f}, timeout rate: {summary['timeoutRate']:.1%}")
+    for seat in summary["seats"]:
+        print(f"{seat['bot']}: {seat['winRate']:.1%} wins, {seat['bankruptcyRate']:.1%} bankrupt")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
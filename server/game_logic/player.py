@@ -5,11 +5,15 @@ Author:         Jordan Bourdeau, Hayden Collins
 """
 
 from typing import Any
-from .constants import STARTING_MONEY, START_LOCATION
+from .constants import CHECK_INVARIANTS, STARTING_MONEY, START_LOCATION
 from .types import AssetGroups, PlayerStatus
 
 
 class Player:
+    # Slotted to keep the many short-lived players of simulations (and long-lived ones of hosted rooms) small
+    __slots__ = ("id", "display_name", "assets", "_money", "_location", "_doubles_streak", "_jail_cards",
+                 "_turns_in_jail", "_status", "_asset_value", "_group_assets", "_dirty", "_client_bindings")
+
     def __init__(self, id: str, display_name: str) -> None:
         from .asset_tile import AssetTile
         """
@@ -22,13 +26,80 @@ class Player:
 
         # State variables
         self.assets: list[AssetTile] = []
-        self.money: int = STARTING_MONEY
-        self.location: int = START_LOCATION
-        self.doubles_streak: int = 0
-        self.jail_cards: int = 0
-        self.turns_in_jail: int = 0
-        self.status: PlayerStatus = PlayerStatus.GOOD
+        self._money: int = STARTING_MONEY
+        self._location: int = START_LOCATION
+        self._doubles_streak: int = 0
+        self._jail_cards: int = 0
+        self._turns_in_jail: int = 0
+        self._status: PlayerStatus = PlayerStatus.GOOD
+        # Sum of the liquid value of every tile the player owns. Kept up to date by the tiles whenever their owner,
+        # status, or mortgage changes so the net worth doesn't have to be summed on every money update.
+        self._asset_value: int = 0
+        # Tiles the player owns indexed by group, so ownership and monopoly checks don't scan every asset. Each group
+        # maps to a dictionary used as an ordered set, which keeps the tiles in the order they were acquired like the
+        # asset list does. Also kept up to date by the tiles whenever their owner changes.
+        self._group_assets: dict[AssetGroups, dict[AssetTile, None]] = {group: {} for group in AssetGroups}
         # self.event_queue: list[dict] = []
+        # Client bindings are cached and only rebuilt by to_dict() once the player (or one of their assets) has been
+        # marked dirty.
+        self._dirty: bool = True
+        self._client_bindings: dict[str, Any] = None
+
+    """ State variables which mark the player dirty when they are changed """
+
+    @property
+    def money(self) -> int:
+        return self._money
+
+    @money.setter
+    def money(self, money: int) -> None:
+        self._money = money
+        self._dirty = True
+
+    @property
+    def location(self) -> int:
+        return self._location
+
+    @location.setter
+    def location(self, location: int) -> None:
+        self._location = location
+        self._dirty = True
+
+    @property
+    def doubles_streak(self) -> int:
+        return self._doubles_streak
+
+    @doubles_streak.setter
+    def doubles_streak(self, doubles_streak: int) -> None:
+        self._doubles_streak = doubles_streak
+        self._dirty = True
+
+    @property
+    def jail_cards(self) -> int:
+        return self._jail_cards
+
+    @jail_cards.setter
+    def jail_cards(self, jail_cards: int) -> None:
+        self._jail_cards = jail_cards
+        self._dirty = True
+
+    @property
+    def turns_in_jail(self) -> int:
+        return self._turns_in_jail
+
+    @turns_in_jail.setter
+    def turns_in_jail(self, turns_in_jail: int) -> None:
+        self._turns_in_jail = turns_in_jail
+        self._dirty = True
+
+    @property
+    def status(self) -> PlayerStatus:
+        return self._status
+
+    @status.setter
+    def status(self, status: PlayerStatus) -> None:
+        self._status = status
+        self._dirty = True
 
     @property
     def in_jail(self) -> bool:
@@ -49,16 +120,19 @@ class Player:
     @property
     def net_worth(self) -> int:
         """
-        Description:    Method used to calculate the net worth of a player based on the sum of:
+        Description:    Method used to get the net worth of a player based on the sum of:
                             1) Current money
                             2) Selling improvements
                             3) Mortgaging properties
         :return:        Final dollar amount for a player's net worth.
         """
-        asset_values: int = 0
-        for asset in self.assets:
-            asset_values += asset.liquid_value
-        return self.money + asset_values
+        if CHECK_INVARIANTS:
+            asset_value: int = sum(asset.liquid_value for asset in self.assets)
+            assert self._asset_value == asset_value, \
+                f"Player {self.id} has an asset value of {self._asset_value} but owns {asset_value} in assets"
+            assert {asset for group in self._group_assets.values() for asset in group} == set(self.assets), \
+                f"Player {self.id} has a group index which doesn't match their assets"
+        return self.money + self._asset_value
 
     @property
     def roll_again(self) -> bool:
@@ -74,7 +148,41 @@ class Player:
         :param group:   The group to retrieve.
         :return:        List of group share AssetTile objects.
         """
-        return [asset for asset in self.assets if asset.group == group]
+        return list(self._group_assets[group])
+
+    def group_count(self, group: AssetGroups) -> int:
+        """
+        Description:    Method used to get how many tiles of a group the player owns.
+        :param group:   The group to count.
+        :return:        Number of tiles owned in the group.
+        """
+        return len(self._group_assets[group])
+
+    def owns(self, tile) -> bool:
+        """
+        Description:    Method used to check whether the player owns a tile.
+        :param tile:    Tile to check.
+        :return:        True if the player owns the tile, False otherwise.
+        """
+        return tile in self._group_assets.get(getattr(tile, "group", None), ())
+
+    def _acquire(self, asset) -> None:
+        """
+        Description:    Method called by an AssetTile when the player becomes its owner.
+        :param asset:   The AssetTile acquired.
+        :return:        None.
+        """
+        self._asset_value += asset.liquid_value
+        self._group_assets[asset.group][asset] = None
+
+    def _release(self, asset) -> None:
+        """
+        Description:    Method called by an AssetTile when the player stops owning it (ex. it is transferred).
+        :param asset:   The AssetTile released.
+        :return:        None.
+        """
+        self._asset_value -= asset.liquid_value
+        self._group_assets[asset.group].pop(asset, None)
 
     def update(self, update) -> PlayerStatus:
         """
@@ -88,9 +196,12 @@ class Player:
     def to_dict(self) -> dict[str, Any]:
         """
         Description:    Method used to return a dictionary representation of the class.
-                        Used for creating JSON representation of the game state.
+                        Used for creating JSON representation of the game state. The dictionary is cached until the
+                        player is marked dirty, so it must not be modified by the caller.
         :return:        Dictionary of class attributes.
         """
+        if not self._dirty and self._client_bindings is not None:
+            return self._client_bindings
         client_bindings = {
             "id": self.id,
             "displayName": self.display_name,
@@ -103,4 +214,6 @@ class Player:
             # Include a list of the IDs for the assets they own
             "assets": [asset.to_dict() for asset in self.assets]
         }
+        self._client_bindings = client_bindings
+        self._dirty = False
         return client_bindings
@@ -18,8 +18,10 @@ from .roll import Roll
 
 class PlayerUpdate:
     """
-    Description:    Base class for the Update object interface. Construction varies based on update type.
+    Description:    Base class for the Update object interface. Construction varies based on update type. Updates are
+                    made for every action, so they are all slotted.
     """
+    __slots__ = ()
 
     def update(self, player: Player):
         """
@@ -31,6 +33,8 @@ class PlayerUpdate:
 
 
 class MoneyUpdate(PlayerUpdate):
+    __slots__ = ("amount",)
+
     def __init__(self, amount: int):
         """
         Description:    Object responsible
@@ -59,6 +63,8 @@ class MoneyUpdate(PlayerUpdate):
 
 
 class GoToJailUpdate(PlayerUpdate):
+    __slots__ = ()
+
     def __init__(self):
         """
         Description:
@@ -79,6 +85,8 @@ class GoToJailUpdate(PlayerUpdate):
 
 
 class LeaveJailUpdate(PlayerUpdate):
+    __slots__ = ("method",)
+
     def __init__(self, method: JailMethod):
         """
         Description:    Object for sending a user to jail.
@@ -113,6 +121,8 @@ class LeaveJailUpdate(PlayerUpdate):
 
 
 class RollUpdate(PlayerUpdate):
+    __slots__ = ("roll",)
+
     def __init__(self, roll: Roll):
         """
         Description:    Object for performing a dice roll.
@@ -150,6 +160,8 @@ class RollUpdate(PlayerUpdate):
             player.update(MoneyUpdate(GO_MONEY))
 
 class BuyUpdate(PlayerUpdate):
+    __slots__ = ("tile",)
+
     def __init__(self, tile: AssetTile):
         """
         Description:    Object for a player buying a tile.
@@ -164,7 +176,7 @@ class BuyUpdate(PlayerUpdate):
         :return:        None.
         """
         # Can't buy a property that is already owned
-        if self.tile in player.assets:
+        if player.owns(self.tile):
             return
         # Must be an AssetTile subclass
         elif not isinstance(self.tile, AssetTile):
@@ -196,6 +208,8 @@ class BuyUpdate(PlayerUpdate):
 
 
 class ImprovementUpdate(PlayerUpdate):
+    __slots__ = ("asset", "delta")
+
     def __init__(self, asset: AssetTile, delta: int):
         """
         Description:        Update to change the number of improvements a property has.
@@ -215,7 +229,7 @@ class ImprovementUpdate(PlayerUpdate):
         if not isinstance(self.asset, ImprovableTile):
             return
         # Tile must be owned by the player.
-        elif self.asset not in player.assets:
+        elif not player.owns(self.asset):
             return
         # Must be non-zero and within the max/min ranges.
         elif self.delta == 0 or not -MAX_NUM_IMPROVEMENTS <= self.delta <= MAX_NUM_IMPROVEMENTS:
@@ -267,6 +281,8 @@ class ImprovementUpdate(PlayerUpdate):
 
 
 class MortgageUpdate(PlayerUpdate):
+    __slots__ = ("asset", "mortgage")
+
     def __init__(self, property: AssetTile, mortgage: bool):
         """
         Description:        Update to mortgage a property owned by a player.
@@ -284,7 +300,7 @@ class MortgageUpdate(PlayerUpdate):
         """
 
         # Check the player owns the property
-        if self.asset not in player.assets:
+        if not player.owns(self.asset):
             return
 
         # If the player is trying to mortgage the property, verify it can be mortgaged then mortgage it
@@ -302,6 +318,8 @@ class MortgageUpdate(PlayerUpdate):
             return
 
 class MoveUpdate(PlayerUpdate):
+    __slots__ = ("spaces",)
+
     def __init__(self, spaces: int):
         """
         Description:    Object which is used to move a Player object relative to their current position.
@@ -319,6 +337,8 @@ class MoveUpdate(PlayerUpdate):
 
 
 class LocationUpdate(PlayerUpdate):
+    __slots__ = ("destination",)
+
     def __init__(self, destination: int):
         """
         Description:        Object used to move a Player object forward to a specific location.
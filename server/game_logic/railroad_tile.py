@@ -12,6 +12,7 @@ from typing import Any
 
 
 class RailroadTile(AssetTile):
+    __slots__ = ()
 
     def __init__(self, id: int, name: str) -> None:
         """
@@ -22,8 +23,8 @@ class RailroadTile(AssetTile):
         """
         super().__init__(id, name, RAILROAD_COST, AssetGroups.RAILROAD)
 
-    def to_dict(self) -> dict:
-        client_bindings: dict = super().to_dict()
+    def _make_client_bindings(self) -> dict:
+        client_bindings: dict = super()._make_client_bindings()
         client_bindings["type"] = "railroad"
         client_bindings["oneOwned"] = RENTS[self.id][RailroadStatus.ONE_OWNED]
         client_bindings["twoOwned"] = RENTS[self.id][RailroadStatus.TWO_OWNED]
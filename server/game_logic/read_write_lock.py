@@ -0,0 +1,108 @@
+"""
+Description:    Readers/writer lock used to guard a Game object across threads.
+Date:           12/01/2023
+Author:         Jordan Bourdeau
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+import threading
+
+
+class ReadWriteLock:
+
+    def __init__(self) -> None:
+        """
+        Description:    Lock which allows any number of concurrent readers or a single writer. Waiting writers block new
+                        readers so a steady stream of reads can't starve them. Both locks are reentrant, and a thread
+                        holding the write lock may also take the read lock (ex. a mutating method which calls another
+                        one). Upgrading a read lock to a write lock is not supported.
+        :returns:       None.
+        """
+        self._condition: threading.Condition = threading.Condition(threading.Lock())
+        self._readers: int = 0
+        # Number of times each thread has acquired the read lock, so nested reads don't wait behind a writer which is
+        # itself waiting on the outer read.
+        self._local: threading.local = threading.local()
+        self._waiting_writers: int = 0
+        # Thread identifier of the writer holding the lock and how many times it has acquired it
+        self._writer: int = None
+        self._write_depth: int = 0
+
+    def acquire_read(self) -> None:
+        read_depth: int = getattr(self._local, "read_depth", 0)
+        if read_depth > 0:
+            self._local.read_depth = read_depth + 1
+            return
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._write_depth += 1
+                return
+            while self._writer is not None or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+        self._local.read_depth = 1
+
+    def release_read(self) -> None:
+        read_depth: int = getattr(self._local, "read_depth", 0)
+        if read_depth > 1:
+            self._local.read_depth = read_depth - 1
+            return
+        with self._condition:
+            if read_depth == 0 and self._writer == threading.get_ident():
+                self._write_depth -= 1
+                return
+            self._local.read_depth = 0
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._write_depth += 1
+                return
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers > 0:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.get_ident()
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._condition.notify_all()
+
+    def holds_outermost_write(self) -> bool:
+        """
+        Description:    Method used by the thread holding the write lock to check it isn't nested inside another
+                        acquisition, ex. to do work once a whole command is done.
+        :return:        Whether the calling thread holds the write lock exactly once.
+        """
+        return self._writer == threading.get_ident() and self._write_depth == 1
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Description:    Context manager which holds the read lock for the duration of the block.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Description:    Context manager which holds the write lock for the duration of the block.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,99 @@
+"""
+Description:    Replay engine which rebuilds a Game from its command log without going through the server or building
+                any events. Used for crash recovery and post-mortem debugging.
+                Run from the repository root with: python -m server.game_logic.replay commands.json
+Date:           12/08/2023
+Author:         Jordan Bourdeau
+"""
+
+from .command_log import CommandLog
+from .game import Game
+from .roll import Roll
+from .types import JailMethod
+
+from typing import Callable
+
+import argparse
+import json
+import time
+
+
+def _replay_roll(game: Game, player_id: str, first: int, second: int, generated: bool) -> bool:
+    """
+    Description:        Function which replays a dice roll. Rolls which came from the game's generator are drawn from
+                        it again so the generator stays in step for the decks, and are checked against the log.
+    :param game:        Game being rebuilt.
+    :param player_id:   ID of the player who rolled.
+    :param first:       Value of the first die.
+    :param second:      Value of the second die.
+    :param generated:   Whether the roll came from the game's generator.
+    :return:            True if the roll was accepted and matches the log.
+    """
+    if not generated:
+        return game.roll_dice(player_id, Roll(first, second))
+    return game.roll_dice(player_id) and (game.last_roll.first, game.last_roll.second) == (first, second)
+
+
+# Maps the name of each command in a log to a function applying it to a game. Arguments are in the order they are
+# logged in.
+COMMANDS: dict[str, Callable[..., bool]] = {
+    "register_player": lambda game, display_name, player_id: game.register_player(display_name, player_id) != "",
+    "start_game": Game.start_game,
+    "roll_dice": _replay_roll,
+    "buy_property": Game.buy_property,
+    "improvements": Game.improvements,
+    "mortgage": Game.mortgage,
+    "get_out_of_jail": lambda game, player_id, method: game.get_out_of_jail(player_id, JailMethod(method)),
+    "end_turn": Game.end_turn,
+    "reset": Game.reset
+}
+
+
+def replay(log: CommandLog, record_history: bool = True, headless: bool = False) -> Game:
+    """
+    Description:            Function which rebuilds a game by re-applying its commands to a game with the same seed.
+                            The commands are applied headless so no events are built, and the event history is
+                            checkpointed afterwards so clients can catch up from the rebuilt state.
+    :param log:             Command log of the game.
+    :param record_history:  Whether the rebuilt game records its event history.
+    :param headless:        Whether the rebuilt game is played without clients.
+    :return:                Rebuilt Game object. Its command log matches the one it was rebuilt from.
+    :raises ValueError:     If a command is unknown, malformed, or diverges from the log.
+    """
+    game: Game = Game(record_history=record_history, headless=True, seed=log.seed)
+    for index, (name, *args) in enumerate(log.commands):
+        command: Callable[..., bool] = COMMANDS.get(name)
+        if command is None:
+            raise ValueError(f"Unknown command {name} at index {index}")
+        try:
+            accepted: bool = command(game, *args)
+        # Malformed arguments (ex. from a corrupt log) are reported the same way as a divergence
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed command {name} at index {index}") from e
+        if not accepted:
+            raise ValueError(f"Command {name} at index {index} diverged from the log")
+    game.headless = headless
+    if not headless:
+        game.event_history.checkpoint()
+    return game
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Rebuild a game from its command log.")
+    parser.add_argument("path", type=str, help="Path to the command log (JSON).")
+    parser.add_argument("--output", type=str, default=None, help="Path to write the rebuilt game state to.")
+    args = parser.parse_args()
+
+    with open(args.path) as file:
+        log: CommandLog = CommandLog.loads(file.read())
+    start: float = time.perf_counter()
+    game: Game = replay(log, record_history=False, headless=True)
+    elapsed: float = time.perf_counter() - start
+    print(f"Replayed {len(log)} commands in {elapsed * 1000:.2f}ms")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(game.to_dict(), file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
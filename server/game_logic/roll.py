@@ -8,6 +8,8 @@ from typing import Any
 
 
 class Roll:
+    __slots__ = ("first", "second")
+
     def __init__(self, first=None, second=None):
         self.first: int = first
         self.second: int = second
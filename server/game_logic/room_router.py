@@ -0,0 +1,258 @@
+"""
+Description:    Front-door router which spreads rooms across several server processes. Every request is forwarded to
+                the process owning its room on a consistent hash ring, so all players of a table reach the same process
+                while capacity grows with the number of processes (and cores).
+                Run from the repository root with:
+                python -m server.game_logic.room_router --port 8000 --backend http://127.0.0.1:5001 http://127.0.0.1:5002
+Date:           12/12/2023
+Author:         Jordan Bourdeau
+"""
+
+from .constants import DEFAULT_ROOM_ID, HASH_RING_REPLICAS, INTERNAL_PATHS, MAX_LONG_POLL_TIMEOUT, ROOM_ID_LENGTH
+from .hash_ring import HashRing
+from .migration import migrate
+
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Iterable
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlencode
+from wsgiref.simple_server import WSGIServer, make_server
+
+import argparse
+import json
+import logging
+import secrets
+import string
+import threading
+import urllib.request
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Headers which only apply to a single connection and must not be forwarded
+_HOP_BY_HOP: frozenset[str] = frozenset(["connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+                                         "trailers", "transfer-encoding", "upgrade"])
+
+
+class RoomRouter:
+
+    def __init__(self, backends: list[str], replicas: int = HASH_RING_REPLICAS,
+                 timeout: float = MAX_LONG_POLL_TIMEOUT + 5) -> None:
+        """
+        Description:        WSGI application which forwards each request to the backend owning its room. Requests
+                            without a room ID go to the owner of the default room. New rooms are given their ID here so
+                            they are created on the backend they will be routed to.
+        :param backends:    Base URLs of the backend servers.
+        :param replicas:    Number of points each backend gets on the hash ring.
+        :param timeout:     Number of seconds to wait on a backend. Must be longer than the longest long-poll.
+        :returns:           None.
+        """
+        self.timeout: float = timeout
+        self.ring: HashRing = HashRing([backend.rstrip("/") for backend in backends], replicas)
+        # Rooms which are still routed to the backend hosting them rather than their owner on the ring, because they
+        # haven't been moved yet (or moving them failed)
+        self._placements: dict[str, str] = {}
+        # Guards the ring and placements, which are changed in place when backends join or leave
+        self._lock: threading.Lock = threading.Lock()
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        path: str = environ.get("PATH_INFO", "")
+        query: dict[str, list[str]] = parse_qs(environ.get("QUERY_STRING", ""))
+        if path == "/room/list":
+            return self._respond(start_response, "200 OK", self.list_rooms())
+        # The endpoints used to move rooms are only meant to be called between servers, never through the front door
+        if path in INTERNAL_PATHS:
+            return self._respond(start_response, "404 Not Found", {"success": False})
+        if path == "/room/create" and "room_id" not in query:
+            query["room_id"] = [self._generate_room_id()]
+        room_id: str = query.get("room_id", [DEFAULT_ROOM_ID])[0].lower()
+        return self._forward(self.route(room_id), environ, urlencode(query, doseq=True), start_response)
+
+    def route(self, room_id: str) -> str:
+        """
+        Description:        Method used to find the backend a room lives on.
+        :param room_id:     ID of the room.
+        :return:            Base URL of the backend or None if there are none.
+        """
+        with self._lock:
+            return self._placements.get(room_id) or self.ring.get(room_id)
+
+    def add_backend(self, backend: str) -> list[str]:
+        """
+        Description:        Method used to start routing to a new backend. The rooms which now belong to it are moved
+                            over from the backends they were on, and are routed to where they were until then.
+        :param backend:     Base URL of the backend.
+        :return:            IDs of the rooms which were moved.
+        """
+        with self._lock:
+            backends: list[str] = self.ring.nodes
+        located: dict[str, str] = self._locate_rooms(backends)
+        with self._lock:
+            self._placements.update(located)
+            self.ring.add(backend.rstrip("/"))
+        return self._move_rooms(located)
+
+    def remove_backend(self, backend: str) -> list[str]:
+        """
+        Description:        Method used to drain a backend (ex. before a deploy). Its rooms are moved to the backends
+                            which now own them, after which it can be shut down. They are routed to it until then.
+        :param backend:     Base URL of the backend.
+        :return:            IDs of the rooms which were moved.
+        """
+        backend = backend.rstrip("/")
+        with self._lock:
+            backends: list[str] = self.ring.nodes
+        located: dict[str, str] = self._locate_rooms(backends if backend in backends else backends + [backend])
+        with self._lock:
+            self._placements.update(located)
+            self.ring.remove(backend)
+        return self._move_rooms(located)
+
+    def rebalance(self, extra_backends: list[str] = ()) -> list[str]:
+        """
+        Description:            Method used to move every room which isn't on the backend owning it (ex. to retry the
+                                rooms which failed to move). The default room is pinned on every backend and is never
+                                moved.
+        :param extra_backends:  Backends which are no longer on the ring but may still be hosting rooms.
+        :return:                IDs of the rooms which were moved.
+        """
+        with self._lock:
+            backends: list[str] = self.ring.nodes
+        located: dict[str, str] = self._locate_rooms(backends + list(extra_backends))
+        with self._lock:
+            self._placements.update(located)
+        return self._move_rooms(located)
+
+    def list_rooms(self) -> dict[str, Any]:
+        """
+        Description:    Method used to list the rooms on every backend. The default room is only listed from the
+                        backend requests for it are routed to.
+        :return:        Dictionary in the same format as a backend's /room/list.
+        """
+        with self._lock:
+            backends: list[str] = self.ring.nodes
+            default_owner: str = self.ring.get(DEFAULT_ROOM_ID)
+        rooms: list[dict[str, Any]] = []
+        for backend in backends:
+            for room in self._get_json(f"{backend}/room/list").get("rooms", []):
+                if room["roomId"] != DEFAULT_ROOM_ID or backend == default_owner:
+                    rooms.append(room)
+        return {"event": "listRooms", "rooms": rooms, "success": True}
+
+    """ Private Helper Methods """
+
+    def _forward(self, backend: str, environ: dict, query_string: str, start_response: Callable) -> Iterable[bytes]:
+        """
+        Description:            Method which proxies a request to a backend and relays its response.
+        :param backend:         Base URL of the backend.
+        :param environ:         WSGI environment of the request.
+        :param query_string:    Query string to forward.
+        :param start_response:  WSGI start_response callable.
+        :return:                Response body.
+        """
+        if backend is None:
+            return self._respond(start_response, "503 Service Unavailable", {"success": False})
+        body: bytes = None
+        length: str = environ.get("CONTENT_LENGTH")
+        if length:
+            body = environ["wsgi.input"].read(int(length))
+        url: str = f"{backend}{environ.get('PATH_INFO', '')}"
+        if query_string:
+            url += f"?{query_string}"
+        headers: dict[str, str] = {}
+        if environ.get("CONTENT_TYPE"):
+            headers["Content-Type"] = environ["CONTENT_TYPE"]
+        request: urllib.request.Request = urllib.request.Request(url, data=body, headers=headers,
+                                                                 method=environ.get("REQUEST_METHOD", "GET"))
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        # Error statuses from the backend are relayed as they are
+        except HTTPError as e:
+            response = e
+        except (URLError, OSError) as e:
+            return self._respond(start_response, "502 Bad Gateway", {"success": False})
+        with response:
+            data: bytes = response.read()
+            start_response(f"{response.status} {response.reason}",
+                           [(name, value) for name, value in response.headers.items()
+                            if name.lower() not in _HOP_BY_HOP])
+        return [data]
+
+    def _locate_rooms(self, backends: list[str]) -> dict[str, str]:
+        """
+        Description:        Method used to find which backend each room is hosted on. Backends which can't be reached
+                            are logged and skipped.
+        :param backends:    Base URLs of the backends to look on.
+        :return:            Dictionary mapping room IDs to the backend hosting them, without the default room.
+        """
+        located: dict[str, str] = {}
+        for backend in backends:
+            try:
+                rooms: list[dict[str, Any]] = self._get_json(f"{backend}/room/list").get("rooms", [])
+            except (OSError, ValueError) as e:
+                logger.error("Could not list the rooms on %s: %s", backend, e)
+                continue
+            for room in rooms:
+                if room["roomId"] != DEFAULT_ROOM_ID:
+                    located[room["roomId"]] = backend
+        return located
+
+    def _move_rooms(self, located: dict[str, str]) -> list[str]:
+        """
+        Description:        Method used to move rooms to the backends owning them on the ring. Each room keeps being
+                            routed to the backend hosting it until it has moved (after which the old backend redirects
+                            any stragglers). Rooms which fail to move are logged and stay where they are.
+        :param located:     Dictionary mapping room IDs to the backend hosting them.
+        :return:            IDs of the rooms which were moved.
+        """
+        moved: list[str] = []
+        for room_id, backend in located.items():
+            with self._lock:
+                owner: str = self.ring.get(room_id)
+            if owner is not None and owner != backend:
+                try:
+                    migrate(room_id, backend, owner, self.timeout)
+                except (OSError, RuntimeError, ValueError) as e:
+                    logger.error("Could not move room %s from %s to %s: %s", room_id, backend, owner, e)
+                    continue
+                moved.append(room_id)
+            with self._lock:
+                if self._placements.get(room_id) == backend:
+                    del self._placements[room_id]
+        return moved
+
+    def _get_json(self, url: str) -> dict[str, Any]:
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.load(response)
+
+    @staticmethod
+    def _respond(start_response: Callable, status: str, body: dict[str, Any]) -> Iterable[bytes]:
+        data: bytes = json.dumps(body).encode()
+        start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(data)))])
+        return [data]
+
+    @staticmethod
+    def _generate_room_id() -> str:
+        character_set: str = string.ascii_lowercase + string.digits
+        return "".join(secrets.choice(character_set) for _ in range(ROOM_ID_LENGTH))
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    # Each request gets its own thread so long-polls don't hold up everyone else
+    daemon_threads: bool = True
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Route rooms across backend servers.")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--backend", nargs="+", required=True, help="Base URL of each backend server.")
+    args = parser.parse_args()
+
+    router: RoomRouter = RoomRouter(args.backend)
+    with make_server(args.host, args.port, router, server_class=ThreadingWSGIServer) as server:
+        print(f"Routing rooms across {len(router.ring)} backends on port {args.port}")
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+Description:    Headless simulation engine which plays full games between bots without the Flask endpoints. Used for
+                balance testing and load generation.
+                Run from the repository root with: python -m server.game_logic.simulate --games 1000
+Date:           12/05/2023
+Author:         Jordan Bourdeau
+"""
+
+from .asset_tile import AssetTile
+from .constants import MAX_SIMULATION_TURNS, NUM_TILES
+from .game import Game
+from .improvable_tile import ImprovableTile
+from .player import Player
+from .roll import Roll
+from .types import AssetGroups, JailMethod, PlayerStatus, PropertyStatus
+from .utility_tile import UtilityTile
+
+from typing import Callable
+
+import argparse
+import random
+import time
+
+
+class Bot:
+
+    name: str = "bot"
+
+    def should_leave_jail(self, game: Game, player: Player) -> bool:
+        """
+        Description:    Decides whether the bot pays (or uses a card) to leave jail instead of trying to roll doubles.
+        :param game:    Game being played.
+        :param player:  The bot's player.
+        :return:        True to leave jail before rolling.
+        """
+        return False
+
+    def should_buy(self, game: Game, player: Player, tile: AssetTile) -> bool:
+        """
+        Description:    Decides whether the bot buys the unowned tile it landed on. Only asked when it can afford it.
+        :param game:    Game being played.
+        :param player:  The bot's player.
+        :param tile:    Tile which can be bought.
+        :return:        True to buy the tile.
+        """
+        return True
+
+    def should_improve(self, game: Game, player: Player, tile: ImprovableTile) -> bool:
+        """
+        Description:    Decides whether the bot builds one more improvement on a tile in one of its monopolies.
+        :param game:    Game being played.
+        :param player:  The bot's player.
+        :param tile:    Least improved tile in the monopoly.
+        :return:        True to build.
+        """
+        return False
+
+
+class AlwaysBuyBot(Bot):
+
+    name: str = "always_buy"
+
+    def should_improve(self, game: Game, player: Player, tile: ImprovableTile) -> bool:
+        return player.money >= tile.improvement_cost
+
+
+class CashThresholdBot(Bot):
+
+    name: str = "cash_threshold"
+
+    def __init__(self, threshold: int = 200) -> None:
+        """
+        Description:        Bot which only spends money while it can keep a cash reserve.
+        :param threshold:   Amount of money the bot keeps on hand.
+        :returns:           None.
+        """
+        self.threshold: int = threshold
+
+    def should_leave_jail(self, game: Game, player: Player) -> bool:
+        return player.jail_cards > 0 or player.money >= 2 * self.threshold
+
+    def should_buy(self, game: Game, player: Player, tile: AssetTile) -> bool:
+        return player.money - tile.price >= self.threshold
+
+    def should_improve(self, game: Game, player: Player, tile: ImprovableTile) -> bool:
+        return player.money - tile.improvement_cost >= self.threshold
+
+
+class MonopolySeekerBot(Bot):
+
+    name: str = "monopoly_seeker"
+
+    def should_leave_jail(self, game: Game, player: Player) -> bool:
+        return player.jail_cards > 0 or player.money >= 500
+
+    def should_buy(self, game: Game, player: Player, tile: AssetTile) -> bool:
+        # Railroads and utilities still pay out without the full set
+        if tile.group in (AssetGroups.RAILROAD, AssetGroups.UTILITY):
+            return True
+        # Otherwise only buy into groups nobody else has a stake in
+        for other in game.players.values():
+            if other is not player and other.group_count(tile.group) > 0:
+                return False
+        return True
+
+    def should_improve(self, game: Game, player: Player, tile: ImprovableTile) -> bool:
+        return player.money >= tile.improvement_cost
+
+
+# Bots selectable from the command line by name
+BOTS: dict[str, Callable[[], Bot]] = {
+    AlwaysBuyBot.name: AlwaysBuyBot,
+    CashThresholdBot.name: CashThresholdBot,
+    MonopolySeekerBot.name: MonopolySeekerBot
+}
+
+
+class SimulationResult:
+
+    def __init__(self, bots: list[Bot], players: list[Player], turns: int, winner: int,
+                 landings: list[int], rent_collected: list[int], bankruptcy_turns: list[int]) -> None:
+        """
+        Description:                Summary of a simulated game.
+        :param bots:                Bots which played, in seat order.
+        :param players:             Player objects for each seat.
+        :param turns:               Number of turns which were taken.
+        :param winner:              Seat index of the last player standing or the richest player if the turn limit
+                                    was hit.
+        :param landings:            Number of rolls which ended on each tile.
+        :param rent_collected:      Total rent paid out by each tile.
+        :param bankruptcy_turns:    Turn each seat went bankrupt on (None if they didn't).
+        :returns:                   None.
+        """
+        self.bot_names: list[str] = [bot.name for bot in bots]
+        self.turns: int = turns
+        self.winner: int = winner
+        self.net_worths: list[int] = [player.net_worth for player in players]
+        self.bankrupt: list[bool] = [not player.active for player in players]
+        self.landings: list[int] = landings
+        self.rent_collected: list[int] = rent_collected
+        self.bankruptcy_turns: list[int] = bankruptcy_turns
+
+
+class Simulation:
+
+    def __init__(self, bots: list[Bot], seed: int = None, max_turns: int = MAX_SIMULATION_TURNS) -> None:
+        """
+        Description:        Class which plays a single game between bots. Events are never built so games run as fast
+                            as the game logic allows.
+        :param bots:        Bot controlling each seat.
+        :param seed:        Seed for the dice rolls, decks, and turn order.
+        :param max_turns:   Number of turns after which the game is called for the richest player.
+        :returns:           None.
+        """
+        self.bots: list[Bot] = bots
+        self.max_turns: int = max_turns
+        self.game: Game = Game(record_history=False, headless=True, seed=seed)
+        self.players: list[Player] = []
+        self._bot_for: dict[str, Bot] = {}
+        for index, bot in enumerate(bots):
+            player_id: str = self.game.register_player(f"{bot.name}{index}")
+            self.players.append(self.game.players[player_id])
+            self._bot_for[player_id] = bot
+        # Statistics gathered over the game
+        self.landings: list[int] = [0] * NUM_TILES
+        self.rent_collected: list[int] = [0] * NUM_TILES
+        self.bankruptcy_turns: list[int] = [None] * len(bots)
+        # Improvable tiles by group so bots can look up their monopolies without scanning the board
+        self._groups: dict[AssetGroups, list[ImprovableTile]] = {}
+        for tile in self.game.tiles:
+            if isinstance(tile, ImprovableTile):
+                self._groups.setdefault(tile.group, []).append(tile)
+
+    def run(self) -> SimulationResult:
+        """
+        Description:    Method which plays the game until one player is left or the turn limit is hit.
+        :return:        SimulationResult for the game.
+        """
+        game: Game = self.game
+        game.start_game(self.players[0].id)
+        turns: int = 0
+        num_active: int = len(self.players)
+        while turns < self.max_turns and num_active > 1:
+            player: Player = game.players[game.active_player_id]
+            self._play_turn(player, self._bot_for[player.id])
+            turns += 1
+            num_active = 0
+            for seat, player in enumerate(self.players):
+                if player.active:
+                    num_active += 1
+                elif self.bankruptcy_turns[seat] is None:
+                    self.bankruptcy_turns[seat] = turns
+        standing: list[Player] = [player for player in self.players if player.active] or self.players
+        winner: Player = max(standing, key=lambda player: player.net_worth)
+        return SimulationResult(self.bots, self.players, turns, self.players.index(winner), self.landings,
+                                self.rent_collected, self.bankruptcy_turns)
+
+    """ Private Helper Methods """
+
+    def _play_turn(self, player: Player, bot: Bot) -> None:
+        """
+        Description:    Method which plays out a single turn for the active player.
+        :param player:  Active player.
+        :param bot:     Bot controlling the player.
+        :return:        None.
+        """
+        game: Game = self.game
+        if player.in_jail and bot.should_leave_jail(game, player):
+            game.get_out_of_jail(player.id, JailMethod.CARD if player.jail_cards > 0 else JailMethod.MONEY)
+            self._liquidate(player)
+        while player.active:
+            # The game rolls from its own seeded generator so the game can be replayed from its command log
+            game.roll_dice(player.id)
+            self._record_landing(player, game.last_roll)
+            # Going to jail ends the turn from inside roll_dice()
+            if game.active_player_id != player.id:
+                return
+            tile: AssetTile = game.tiles[player.location]
+            if (isinstance(tile, AssetTile) and tile.owner is None and tile.price <= player.money
+                    and bot.should_buy(game, player, tile)):
+                game.buy_property(player.id, tile.id)
+            self._liquidate(player)
+            if not player.roll_again:
+                break
+        if player.status == PlayerStatus.GOOD:
+            self._build(player, bot)
+        if not game.end_turn(player.id):
+            raise RuntimeError(f"{player.display_name} could not end their turn")
+
+    def _record_landing(self, player: Player, roll: Roll) -> None:
+        """
+        Description:    Method which records where a roll ended and the rent which was paid for landing there.
+        :param player:  Player who rolled.
+        :param roll:    Their roll.
+        :return:        None.
+        """
+        tile: AssetTile = self.game.tiles[player.location]
+        self.landings[tile.id] += 1
+        if isinstance(tile, AssetTile) and tile.owner is not None and tile.owner is not player:
+            self.rent_collected[tile.id] += tile.rent * roll.total if isinstance(tile, UtilityTile) else tile.rent
+
+    def _build(self, player: Player, bot: Bot) -> None:
+        """
+        Description:    Method which lets the bot build on its monopolies one improvement at a time.
+        :param player:  Active player.
+        :param bot:     Bot controlling the player.
+        :return:        None.
+        """
+        for group, tiles in self._groups.items():
+            if tiles[0].owner is not player or tiles[0].status < PropertyStatus.MONOPOLY:
+                continue
+            if any(tile.is_mortgaged for tile in tiles):
+                continue
+            while True:
+                tile: ImprovableTile = min(tiles, key=lambda tile: tile.status)
+                if tile.status == PropertyStatus.FIVE_IMPROVEMENTS or not bot.should_improve(self.game, player, tile):
+                    break
+                if not self.game.improvements(player.id, tile.id, 1):
+                    break
+
+    def _liquidate(self, player: Player) -> None:
+        """
+        Description:    Method which sells improvements and then mortgages properties until the player is out of the
+                        hole. The player's net worth always covers the debt, otherwise they would be bankrupt.
+        :param player:  Active player.
+        :return:        None.
+        """
+        game: Game = self.game
+        while player.status == PlayerStatus.IN_THE_HOLE:
+            improved: list[ImprovableTile] = sorted(
+                (asset for asset in player.assets
+                 if isinstance(asset, ImprovableTile) and asset.status > PropertyStatus.MONOPOLY),
+                key=lambda tile: tile.status, reverse=True)
+            # Improvements can't be sold in a group with a mortgaged tile, so those fall through to mortgaging
+            if any(self._sell_improvement(player, tile) for tile in improved):
+                continue
+            unmortgaged: list[AssetTile] = [asset for asset in player.assets if not asset.is_mortgaged]
+            if not any(game.mortgage(player.id, asset.id, True) and asset.is_mortgaged for asset in unmortgaged):
+                return
+
+    def _sell_improvement(self, player: Player, tile: ImprovableTile) -> bool:
+        """
+        Description:    Method which sells one improvement on a tile.
+        :param player:  Active player.
+        :param tile:    Tile to sell the improvement on.
+        :return:        True if an improvement was sold. False otherwise.
+        """
+        status: PropertyStatus = tile.status
+        return self.game.improvements(player.id, tile.id, -1) and tile.status < status
+
+
+def simulate(bots: list[Callable[[], Bot]], num_games: int, seed: int = None,
+             max_turns: int = MAX_SIMULATION_TURNS) -> list[SimulationResult]:
+    """
+    Description:        Function which plays a batch of games between the same lineup of bots.
+    :param bots:        Factory for the bot in each seat.
+    :param num_games:   Number of games to play.
+    :param seed:        Seed for the batch. Each game gets its own seed derived from it.
+    :param max_turns:   Number of turns after which a game is called for the richest player.
+    :return:            List of SimulationResult objects.
+    """
+    rng: random.Random = random.Random(seed)
+    return [Simulation([bot() for bot in bots], rng.getrandbits(64), max_turns).run() for _ in range(num_games)]
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Play headless games between bots.")
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play.")
+    parser.add_argument("--bots", nargs="+", default=list(BOTS.keys()), choices=list(BOTS.keys()),
+                        help="Bot for each seat.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the dice rolls.")
+    parser.add_argument("--max-turns", type=int, default=MAX_SIMULATION_TURNS, help="Turn limit for each game.")
+    args = parser.parse_args()
+
+    start: float = time.perf_counter()
+    results: list[SimulationResult] = simulate([BOTS[name] for name in args.bots], args.games, args.seed,
+                                               args.max_turns)
+    elapsed: float = time.perf_counter() - start
+    wins: list[int] = [0] * len(args.bots)
+    for result in results:
+        wins[result.winner] += 1
+    turns: int = sum(result.turns for result in results)
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/s, {turns / elapsed:.0f} turns/s)")
+    for index, name in enumerate(args.bots):
+        print(f"Seat {index} ({name}): {wins[index] / args.games:.1%} wins")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Description:    Compact, versioned binary snapshots of the full Game state for cheap checkpointing and for moving rooms
+                between processes. Everything is packed with struct into fixed little-endian layouts, so a snapshot is
+                several times smaller and faster to build than the JSON state from Game.to_dict().
+Date:           12/10/2023
+Author:         Jordan Bourdeau
+"""
+
+from .asset_tile import AssetTile
+from .command_log import CommandLog
+from .constants import MAX_NUM_PLAYERS, NUM_TILES, SNAPSHOT_FORMAT_VERSION
+from .deck import Deck
+from .game import Game
+from .player import Player
+from .roll import Roll
+from .types import PlayerStatus
+
+import json
+import struct
+
+MAGIC: bytes = b"MNPY"
+
+# magic, format version, seed, started, rolled this turn, active player index, last roll (0s if none), version,
+# base version, number of players
+_HEADER: struct.Struct = struct.Struct("<4sBQ??bBBQQB")
+# money, location, doubles streak, jail cards, turns in jail, status, version, number of assets
+_PLAYER: struct.Struct = struct.Struct("<iBBBBBQB")
+# status and mortgage flag of every tile, followed by the version of every tile
+_TILES: struct.Struct = struct.Struct(f"<{2 * NUM_TILES}B{NUM_TILES}Q")
+# Mersenne Twister state (624 words plus the position) and the cached gauss value
+_RNG: struct.Struct = struct.Struct("<625I?d")
+_U8: struct.Struct = struct.Struct("<B")
+_U16: struct.Struct = struct.Struct("<H")
+_U32: struct.Struct = struct.Struct("<I")
+
+
+def to_bytes(game: Game, include_commands: bool = False) -> bytes:
+    """
+    Description:                Function which packs the full state of a game into a binary snapshot. Events aren't
+                                included since they can be rebuilt from the state.
+    :param game:                Game to snapshot.
+    :param include_commands:    Whether to include the command log so the restored game can still be replayed (ex.
+                                when it is persisted). Omitted by default since it grows with the length of the game.
+    :return:                    Snapshot bytes.
+    """
+    with game.lock.read():
+        parts: list[bytes] = []
+        index_of: dict[str, int] = {player.id: index for index, player in enumerate(game._players)}
+        last_roll: Roll = game.last_roll
+        parts.append(_HEADER.pack(MAGIC, SNAPSHOT_FORMAT_VERSION, game.seed, game.started, game.rolled_this_turn,
+                                  game.active_player_index, last_roll.first if last_roll is not None else 0,
+                                  last_roll.second if last_roll is not None else 0, game.version,
+                                  game._base_version, len(game._players)))
+        for player in game._players:
+            parts.append(_pack_string(player.id, _U8))
+            parts.append(_pack_string(player.display_name, _U16))
+            parts.append(_PLAYER.pack(player.money, player.location, player.doubles_streak, player.jail_cards,
+                                      player.turns_in_jail, player.status, game._player_versions.get(player.id, 0),
+                                      len(player.assets)))
+            parts.append(bytes(asset.id for asset in player.assets))
+        parts.append(bytes(index_of[player_id] for player_id in game.turn_order))
+        tile_flags: list[int] = []
+        for tile in game.tiles:
+            if isinstance(tile, AssetTile):
+                tile_flags += (tile.status, tile.is_mortgaged)
+            else:
+                tile_flags += (0, 0)
+        parts.append(_TILES.pack(*tile_flags, *game._tile_versions))
+        for deck in (game.chance_deck, game.community_chest_deck):
+            parts.append(_pack_deck(deck))
+        _, internal_state, gauss_next = game.rng.getstate()
+        parts.append(_RNG.pack(*internal_state, gauss_next is not None, gauss_next or 0.0))
+        if include_commands:
+            commands: bytes = json.dumps(game.command_log.to_dict()["commands"], separators=(",", ":")).encode()
+            parts.append(_U8.pack(True) + _U32.pack(len(commands)) + commands)
+        else:
+            parts.append(_U8.pack(False))
+        return b"".join(parts)
+
+
+def from_bytes(data: bytes, record_history: bool = True, headless: bool = False) -> Game:
+    """
+    Description:            Function which rebuilds a game from a snapshot made by to_bytes(). Every player gets a
+                            fresh event queue cursor, and the event history starts from a checkpoint of the state.
+    :param data:            Snapshot bytes.
+    :param record_history:  Whether the restored game records its event history.
+    :param headless:        Whether the restored game is played without clients.
+    :return:                Restored Game object.
+    :raises ValueError:     If the snapshot is truncated, corrupt, or from another format version.
+    """
+    reader: _Reader = _Reader(data)
+    (magic, format_version, seed, started, rolled_this_turn, active_player_index, first, second, version,
+     base_version, num_players) = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("Not a game snapshot")
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {format_version}")
+    if not -1 <= active_player_index < num_players or num_players > MAX_NUM_PLAYERS:
+        raise ValueError("Invalid snapshot")
+    game: Game = Game(record_history=record_history, headless=headless, seed=seed)
+    for _ in range(num_players):
+        player: Player = Player(reader.string(_U8), reader.string(_U16))
+        (player.money, player.location, player.doubles_streak, player.jail_cards, player.turns_in_jail, status,
+         player_version, num_assets) = reader.unpack(_PLAYER)
+        player.status = PlayerStatus(status)
+        if player.location >= NUM_TILES:
+            raise ValueError("Invalid snapshot")
+        for tile_id in reader.indices(num_assets, NUM_TILES):
+            tile: AssetTile = game.tiles[tile_id]
+            # Only unowned asset tiles can be owned (the rest are shared by every board)
+            if not isinstance(tile, AssetTile) or tile.owner is not None:
+                raise ValueError("Invalid snapshot")
+            tile.owner = player
+            player.assets.append(tile)
+        # The card tiles hold a reference to the player list, so it has to be filled in place
+        game._players.append(player)
+        game.players[player.id] = player
+        game._player_versions[player.id] = player_version
+        game.event_queue.add_player(player.id)
+    game.turn_order = [game._players[index].id for index in reader.indices(num_players, num_players)]
+    tile_state: tuple = reader.unpack(_TILES)
+    for tile in game.tiles:
+        if isinstance(tile, AssetTile):
+            # Each kind of tile has its own status enumeration, which the default status is already an instance of
+            tile.status = type(tile.status)(tile_state[2 * tile.id])
+            tile.is_mortgaged = bool(tile_state[2 * tile.id + 1])
+    game._tile_versions = list(tile_state[2 * NUM_TILES:])
+    for deck in (game.chance_deck, game.community_chest_deck):
+        _unpack_deck(deck, reader)
+    rng_state: tuple = reader.unpack(_RNG)
+    game.rng.setstate((3, rng_state[:625], rng_state[626] if rng_state[625] else None))
+    if reader.unpack(_U8)[0]:
+        commands: list = json.loads(reader.take(reader.unpack(_U32)[0]))
+        if not isinstance(commands, list) or not all(isinstance(command, list) for command in commands):
+            raise ValueError("Invalid snapshot")
+        game.command_log = CommandLog(seed, [tuple(command) for command in commands])
+
+    game.started = started
+    game.active_player_index = active_player_index
+    game.active_player_id = game.turn_order[active_player_index] if active_player_index >= 0 else ""
+    game.last_roll = Roll(first, second) if first > 0 else None
+    game.rolled_this_turn = rolled_this_turn
+    game.version = version
+    game._base_version = base_version
+    if not headless:
+        game.event_history.checkpoint()
+    return game
+
+
+""" Private Helper Functions """
+
+
+def _pack_string(value: str, length: struct.Struct) -> bytes:
+    encoded: bytes = value.encode()
+    return length.pack(len(encoded)) + encoded
+
+
+def _pack_deck(deck: Deck) -> bytes:
+    """
+    Description:    Function which packs the order of a deck's stack and discard pile as indices into its cards, and
+                    the in_use flag of every card as a bitmask.
+    :param deck:    Deck to pack.
+    :return:        Packed bytes.
+    """
+    index_of: dict[int, int] = {id(card): index for index, card in enumerate(deck.cards)}
+    in_use: int = 0
+    for index, card in enumerate(deck.cards):
+        if card.in_use:
+            in_use |= 1 << index
+    return b"".join([
+        _U8.pack(len(deck.stack)), bytes(index_of[id(card)] for card in deck.stack),
+        _U8.pack(len(deck.discard)), bytes(index_of[id(card)] for card in deck.discard),
+        _U32.pack(in_use)
+    ])
+
+
+def _unpack_deck(deck: Deck, reader: "_Reader") -> None:
+    """
+    Description:    Function which restores a deck packed by _pack_deck().
+    :param deck:    Deck to restore. Must have been made with the same cards.
+    :param reader:  Reader positioned at the packed deck.
+    :return:        None.
+    """
+    deck.stack = [deck.cards[index] for index in reader.indices(reader.unpack(_U8)[0], len(deck.cards))]
+    deck.discard = [deck.cards[index] for index in reader.indices(reader.unpack(_U8)[0], len(deck.cards))]
+    in_use: int = reader.unpack(_U32)[0]
+    for index, card in enumerate(deck.cards):
+        card.in_use = bool(in_use >> index & 1)
+
+
+class _Reader:
+
+    def __init__(self, data: bytes) -> None:
+        """
+        Description:    Cursor over the snapshot bytes being unpacked.
+        :param data:    Snapshot bytes.
+        :returns:       None.
+        """
+        self.data: memoryview = memoryview(data)
+        self.offset: int = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        try:
+            values: tuple = layout.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise ValueError("Truncated snapshot")
+        self.offset += layout.size
+        return values
+
+    def take(self, length: int) -> bytes:
+        if self.offset + length > len(self.data):
+            raise ValueError("Truncated snapshot")
+        chunk: bytes = bytes(self.data[self.offset:self.offset + length])
+        self.offset += length
+        return chunk
+
+    def indices(self, length: int, bound: int) -> bytes:
+        # Indices into a list (ex. tile IDs or player indices), checked so a corrupt snapshot can't index out of range
+        chunk: bytes = self.take(length)
+        if any(index >= bound for index in chunk):
+            raise ValueError("Invalid snapshot")
+        return chunk
+
+    def string(self, length: struct.Struct) -> str:
+        return self.take(self.unpack(length)[0]).decode()
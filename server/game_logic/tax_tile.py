@@ -10,6 +10,7 @@ from .player_updates import MoneyUpdate
 
 
 class TaxTile(Tile):
+    __slots__ = ("amount",)
 
     def __init__(self, id: int, name: str, amount: int) -> None:
         """
@@ -10,6 +10,8 @@ from .roll import Roll
 from typing import Any
 
 class Tile:
+    # Slotted since every game holds a board of tiles, which keeps them small and their attributes quick to access
+    __slots__ = ("id", "name", "_owner", "_dirty", "_client_bindings")
 
     def __init__(self, id: int, name: str) -> None:
         """
@@ -20,7 +22,36 @@ class Tile:
         self.id: int = id
         self.name: str = name
         # Basic Tile has no owner
-        self.owner: Player = None
+        self._owner: Player = None
+        # Client bindings are cached and only rebuilt by to_dict() once the tile has been marked dirty.
+        self._dirty: bool = True
+        self._client_bindings: dict[str, Any] = None
+
+    @property
+    def owner(self) -> Player:
+        """
+        Description:    Player who owns the tile (None if it is unowned).
+        :return:        Player object or None.
+        """
+        return self._owner
+
+    @owner.setter
+    def owner(self, owner: Player) -> None:
+        # The previous owner no longer lists this tile in their assets
+        if self._owner is not None:
+            self._owner._dirty = True
+        self._owner = owner
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        """
+        Description:    Method used to invalidate the cached client bindings when the tile state changes. The owner is
+                        marked dirty as well since their client bindings include their assets.
+        :return:        None.
+        """
+        self._dirty = True
+        if self._owner is not None:
+            self._owner._dirty = True
 
     def land(self, player: Player, roll: Roll = None) -> dict:
         """
@@ -33,7 +64,18 @@ class Tile:
 
     def to_dict(self) -> dict[str, Any]:
         """
-        Description:    Method returning a dictionary representation of a Tile object.
+        Description:    Method returning a dictionary representation of a Tile object. The dictionary is cached until the
+                        tile is marked dirty, so it must not be modified by the caller.
+        :return:        Dictionary with relevant client bindings.
+        """
+        if self._dirty or self._client_bindings is None:
+            self._client_bindings = self._make_client_bindings()
+            self._dirty = False
+        return self._client_bindings
+
+    def _make_client_bindings(self) -> dict[str, Any]:
+        """
+        Description:    Method which builds the client bindings from scratch. Overridden in subclasses to add fields.
         :return:        Dictionary with relevant client bindings.
         """
         client_bindings: dict = {
@@ -14,6 +14,7 @@ from typing import Any
 
 
 class UtilityTile(AssetTile):
+    __slots__ = ()
 
     def __init__(self, id: int, name: str) -> None:
         """
@@ -40,12 +41,12 @@ class UtilityTile(AssetTile):
                 self.owner.id: MoneyUpdate(self.rent * roll.total)
             }
 
-    def to_dict(self) -> dict[str, Any]:
+    def _make_client_bindings(self) -> dict[str, Any]:
         """
-        Description:    Overridden to_dict() method which replaces 'rent' with 'rentMultiplier'.
+        Description:    Overridden _make_client_bindings() method which replaces 'rent' with 'rentMultiplier'.
         :return:        Dictionary for the tile state.
         """
-        client_bindings: dict = super().to_dict()
+        client_bindings: dict = super()._make_client_bindings()
         client_bindings.pop("rent")
         client_bindings["type"] = "utility"
         client_bindings["rentMultiplier"] = self.rent
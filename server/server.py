@@ -4,20 +4,103 @@ Date:           10/06/23
 Author:         Jordan Bourdeau
 """
 
-from game_logic.constants import SECRET_KEY
+from game_logic.commands import run_batch
+from game_logic.constants import (DEFAULT_ROOM_ID, INTERNAL_PATHS, LONG_POLL_TIMEOUT, MAX_LONG_POLL_TIMEOUT,
+                                  MIGRATION_TARGETS, MIGRATION_TOKEN, MIGRATION_TOKEN_HEADER, SECRET_KEY)
 from game_logic.game import Game
+from game_logic.game_registry import GameRegistry
+from game_logic.game_store import GameStore
+from game_logic import migration
 from game_logic.types import CardType, JailMethod
 
 from pprint import pprint
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from random import randint
 from typing import Any
 
+import hmac
+import json
+import math
+import os
+
 DEBUG: bool = False
+# Path of the SQLite database rooms are persisted to. Rooms are only kept in memory if it isn't set.
+DATABASE_PATH: str = os.environ.get("MONOPOLY_DATABASE_PATH")
 
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
-game: Game = Game()
+# Every table being hosted by this process. The default room is kept around for clients which don't pass a room ID.
+registry: GameRegistry = GameRegistry(store=GameStore(DATABASE_PATH) if DATABASE_PATH else None)
+# Bring back the rooms which were open before a restart
+registry.restore()
+registry.create(DEFAULT_ROOM_ID, pinned=True)
+game: Game = registry.get(DEFAULT_ROOM_ID)
+
+
+def get_room() -> Game:
+    """
+    Description:    Helper which looks up the Game for the room ID passed in the query parameters. Requests without a
+                    room ID are sent to the default room.
+    :return:        Game object for the room or None if the room does not exist.
+    """
+    room_id: str = request.args.get("room_id")
+    if room_id is None:
+        room_id = DEFAULT_ROOM_ID
+    return registry.get(room_id.lower())
+
+
+def state_response(client_bindings: dict[str, Any], state: str) -> Response:
+    """
+    Description:            Helper which sends data along with the game state. The state is spliced in already encoded
+                            (see Game.to_json()) rather than being encoded again on every request.
+    :param client_bindings: Data to send with the game state. Must not share any keys with it.
+    :param state:           JSON-encoded game state.
+    :return:                JSON response with the data and game state in one object.
+    """
+    encoded: str = json.dumps(client_bindings, separators=(",", ":"))
+    return Response(f"{encoded[:-1]},{state[1:]}", mimetype="application/json")
+
+
+@app.before_request
+def authenticate_internal():
+    """
+    Description:    Hook which only lets requests carrying the migration token reach the internal endpoints used to move
+                    rooms between servers. They are refused outright if no token is configured.
+    :return:        None to handle the request normally, or the json-formatted refusal.
+    """
+    if request.path not in INTERNAL_PATHS:
+        return None
+    token: str = request.headers.get(MIGRATION_TOKEN_HEADER, "")
+    if MIGRATION_TOKEN and hmac.compare_digest(token.encode(), MIGRATION_TOKEN.encode()):
+        return None
+    return jsonify({"success": False}), 403
+
+
+@app.before_request
+def redirect_moved_room():
+    """
+    Description:    Hook which tells clients of a room that was moved to another server where to find it. Clients
+                    should repeat the request against the URL in `redirect`.
+    :return:        None to handle the request normally, or the json-formatted redirect.
+    """
+    if not request.path.startswith("/game/") and request.endpoint != "join_room":
+        return None
+    target: str = registry.redirect(request.args.get("room_id", DEFAULT_ROOM_ID).lower())
+    if target is None:
+        return None
+    return jsonify({"success": False, "redirect": target})
+
+
+@app.after_request
+def persist_room(response):
+    """
+    Description:    Hook which writes the commands the request's room accepted to the database in one batch once the
+                    request is done.
+    :return:        The response, unchanged.
+    """
+    if registry.store is not None:
+        registry.persist(request.args.get("room_id", DEFAULT_ROOM_ID).lower())
+    return response
 
 
 @app.route("/game/data", methods=["GET"])
@@ -25,11 +108,15 @@ def state():
     """
     Description:    Base endpoint which returns JSON formatted with the game state.
                     No authentication required to receive the game state.
+                    Clients can pass the last state version they received as `since` to only get the players and tiles
+                    which changed after it. If nothing changed, only the events are returned with `unchanged` set.
     :return:        Returns json-formatted data with the game state.
     """
     if DEBUG:
         print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
     # No query parameters passed in
@@ -39,15 +126,84 @@ def state():
     # Can only get the game state if they are a valid player or use the admin override
     if player_id not in game.players.keys() and player_id.lower() != "admin":
         return jsonify({"success": False})
-    client_bindings: dict = {
-        "success": True,
-        "events": game.flush_events(player_id)
-    }
-    client_bindings.update(game.to_dict())
+    try:
+        since: int = int(request.args.get("since"))
+    # No version passed in, send the full game state
+    except (TypeError, ValueError) as e:
+        since: int = None
+    # Hold the read lock so the events and state are consistent with one another
+    with game.lock.read():
+        client_bindings: dict = {
+            "success": True,
+            "events": game.flush_events(player_id)
+        }
+        if since == game.version:
+            client_bindings["version"] = game.version
+            client_bindings["unchanged"] = True
+            state: str = None
+        else:
+            state = game.to_json(since=since)
     if DEBUG:
         print(f"Server Response:")
         pprint(client_bindings["events"])
-        pprint(client_bindings["players"])
+        print(state)
+    if state is None:
+        return jsonify(client_bindings)
+    return state_response(client_bindings, state)
+
+
+@app.route("/game/events", methods=["GET"])
+def events():
+    """
+    Description:    Long-polling endpoint which blocks until there are events for the player (or the timeout expires)
+                    and returns only the events, without the full game state.
+    :return:        Returns json-formatted data with the player's events.
+    """
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"success": False})
+    try:
+        player_id: str = request.args.get("player_id").lower()
+    # No query parameters passed in
+    except AttributeError as e:
+        player_id: str = ""
+    try:
+        timeout: float = float(request.args.get("timeout", LONG_POLL_TIMEOUT))
+    except ValueError as e:
+        timeout: float = LONG_POLL_TIMEOUT
+    # NaN gets through the clamp below and makes waiting spin, so anything which isn't finite gets the default
+    if not math.isfinite(timeout):
+        timeout = LONG_POLL_TIMEOUT
+    timeout = min(max(timeout, 0), MAX_LONG_POLL_TIMEOUT)
+    if player_id not in game.players.keys():
+        return jsonify({"success": False})
+    client_bindings: dict = {
+        "success": True,
+        "events": game.wait_for_events(player_id, timeout)
+    }
+    return jsonify(client_bindings)
+
+
+@app.route("/game/history", methods=["GET"])
+def history():
+    """
+    Description:    Endpoint which returns the event history after the sequence number passed as `since`. If the events
+                    after it are no longer kept, the latest full state checkpoint is included to replay from.
+    :return:        Returns json-formatted data with the checkpoint and events.
+    """
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"success": False})
+    player_id: str = request.args.get("player_id", "").lower()
+    if player_id not in game.players.keys():
+        return jsonify({"success": False})
+    try:
+        since: int = int(request.args.get("since"))
+    # No sequence number passed in, replay from the latest checkpoint
+    except (TypeError, ValueError) as e:
+        since: int = None
+    client_bindings: dict = {"success": True}
+    client_bindings.update(game.get_history(since))
     return jsonify(client_bindings)
 
 
@@ -58,7 +214,9 @@ def register_player():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "registerPlayer", "registered": False})
     try:
         display_name: str = request.args.get("display_name")
     # No query parameters passed in
@@ -92,7 +250,9 @@ def start_game():
                     start.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "startGame", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
     # No query parameters passed in
@@ -117,7 +277,9 @@ def roll_dice():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "rollDice", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
     # No query parameters passed in
@@ -152,7 +314,9 @@ def buy_property():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "buyProperty", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
         tile_id: int = int(request.args.get("tile_id"))
@@ -190,7 +354,9 @@ def set_improvements():
     :return:        Returns a JSON-serliazable status response.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "setImprovements", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
         tile_id: int = int(request.args.get("tile_id"))
@@ -233,7 +399,9 @@ def set_mortgage():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "setMortgage", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
         tile_id: int = int(request.args.get("tile_id"))
@@ -273,7 +441,9 @@ def get_out_of_jail():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "getOutOfJail", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
         method_arg: str = request.args.get("method").lower()
@@ -321,7 +491,9 @@ def end_turn():
     :return:        Returns json-formatted data with the game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "endTurn", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
     # No query parameters passed in
@@ -352,7 +524,9 @@ def reset():
     :return:        Returns json-formatted data with the cleared game state.
     """
     print(f"Client Request: \n{request.args}")
-    global game
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "reset", "success": False})
     try:
         player_id: str = request.args.get("player_id").lower()
     # No query parameters passed in
@@ -376,5 +550,180 @@ def reset():
     return jsonify(client_bindings)
 
 
+@app.route("/game/batch", methods=["POST"])
+def batch():
+    """
+    Description:    Endpoint for sending several commands in one request, ex. a whole turn. The body is a JSON list of
+                    commands named like the endpoints with the same parameters, ex.
+                    [{"command": "get_out_of_jail", "method": "money"}, {"command": "roll_dice"}].
+                    They run atomically: in order with no other player's command in between, and if one fails the
+                    game is rolled back to before the batch. A roll can't be rolled back, so roll_dice may only come
+                    last.
+                    The player's events are returned with the results, along with the game state when `since` is
+                    passed (as for /game/data), so no follow-up request is needed.
+    :return:        Returns json-formatted data with the result of each command and the player's events.
+    """
+    print(f"Client Request: \n{request.args}")
+    game: Game = get_room()
+    if game is None:
+        return jsonify({"event": "batch", "success": False})
+    player_id: str = request.args.get("player_id", "").lower()
+    commands: Any = request.get_json(silent=True)
+    if not isinstance(commands, list):
+        return jsonify({"event": "batch", "success": False})
+    try:
+        since: int = int(request.args.get("since"))
+    # No version passed in, so no game state is sent
+    except (TypeError, ValueError) as e:
+        since: int = None
+    # Hold the write lock until the response is built so it reflects exactly the state the batch left
+    with game.lock.write():
+        results: list[dict[str, Any]] = run_batch(game, player_id, commands)
+        client_bindings: dict[str, Any] = {
+            "event": "batch",
+            "success": all(result["success"] for result in results),
+            "results": results,
+            "events": game.flush_events(player_id)
+        }
+        state: str = game.to_json(since=since) if since is not None else None
+    print(f"Server Response:")
+    pprint(client_bindings)
+    if state is None:
+        return jsonify(client_bindings)
+    return state_response(client_bindings, state)
+
+
+@app.route("/room/create", methods=["GET"])
+def create_room():
+    """
+    Description:    Endpoint for opening a new room with its own Game. The room ID can be passed in (ex. by the room
+                    router so the room is created on the server it will be routed to), otherwise one is generated.
+    :return:        Returns json-formatted data with the room ID.
+    """
+    print(f"Client Request: \n{request.args}")
+    room_id: str = request.args.get("room_id")
+    room_id = registry.create(room_id.lower() if room_id else None)
+    client_bindings: dict[str, Any] = {
+        "event": "createRoom",
+        "roomId": room_id,
+        "success": room_id != ""
+    }
+    print(f"Server Response:")
+    pprint(client_bindings)
+    return jsonify(client_bindings)
+
+
+@app.route("/room/join", methods=["GET"])
+def join_room():
+    """
+    Description:    Endpoint for registering a player into a specific room. Requires the room ID and their username.
+    :return:        Returns json-formatted data with the issued player ID.
+    """
+    print(f"Client Request: \n{request.args}")
+    room_id: str = request.args.get("room_id", "").lower()
+    display_name: str = request.args.get("display_name")
+    game: Game = registry.get(room_id)
+    if game is None or display_name is None:
+        return jsonify({"event": "joinRoom", "roomId": room_id, "success": False})
+    player_id: str = game.register_player(display_name)
+    client_bindings: dict[str, Any] = {
+        "event": "joinRoom",
+        "roomId": room_id,
+        "playerId": player_id,
+        "success": player_id != ""
+    }
+    print(f"Server Response:")
+    pprint(client_bindings)
+    return jsonify(client_bindings)
+
+
+@app.route("/room/list", methods=["GET"])
+def list_rooms():
+    """
+    Description:    Endpoint for listing every open room.
+    :return:        Returns json-formatted data with a summary of each room.
+    """
+    client_bindings: dict[str, Any] = {
+        "event": "listRooms",
+        "rooms": registry.list_rooms(),
+        "success": True
+    }
+    return jsonify(client_bindings)
+
+
+@app.route("/room/close", methods=["GET"])
+def close_room():
+    """
+    Description:    Endpoint for closing a room. Must be requested by a player in the room.
+    :return:        Returns json-formatted data with whether the room was closed.
+    """
+    print(f"Client Request: \n{request.args}")
+    room_id: str = request.args.get("room_id", "").lower()
+    player_id: str = request.args.get("player_id", "").lower()
+    game: Game = registry.get(room_id)
+    success: bool = False
+    if game is not None and game._valid_player(player_id, require_active_player=False):
+        success = registry.close(room_id)
+    client_bindings: dict[str, Any] = {
+        "event": "closeRoom",
+        "success": success
+    }
+    print(f"Server Response:")
+    pprint(client_bindings)
+    return jsonify(client_bindings)
+
+
+@app.route("/room/export", methods=["GET"])
+def export_room():
+    """
+    Description:    Internal endpoint used when moving a room to another server. Freezes the room so it stops
+                    accepting commands and returns it packed for /room/import on the target.
+    :return:        Returns the packed room, or json-formatted data with success set to False.
+    """
+    room_id: str = request.args.get("room_id", "").lower()
+    game: Game = registry.freeze(room_id)
+    if game is None:
+        return jsonify({"event": "exportRoom", "success": False})
+    return Response(migration.export_room(game), mimetype="application/octet-stream")
+
+
+@app.route("/room/import", methods=["POST"])
+def import_room():
+    """
+    Description:    Internal endpoint used when moving a room to another server. Starts hosting the room packed by
+                    /room/export on the source.
+    :return:        Returns json-formatted data with whether the room was imported.
+    """
+    room_id: str = request.args.get("room_id", "").lower()
+    try:
+        game: Game = migration.import_room(request.get_data())
+    except ValueError as e:
+        return jsonify({"event": "importRoom", "success": False})
+    return jsonify({"event": "importRoom", "success": room_id != "" and registry.adopt(room_id, game)})
+
+
+@app.route("/room/release", methods=["GET"])
+def release_room():
+    """
+    Description:    Internal endpoint used once a room has been imported on the target. Drops the room here and
+                    redirects its clients to the target, which must be one of the known migration targets.
+    :return:        Returns json-formatted data with whether the room was released.
+    """
+    room_id: str = request.args.get("room_id", "").lower()
+    target: str = request.args.get("target", "").rstrip("/")
+    success: bool = target in MIGRATION_TARGETS and registry.release(room_id, target)
+    return jsonify({"event": "releaseRoom", "success": success})
+
+
+@app.route("/room/thaw", methods=["GET"])
+def thaw_room():
+    """
+    Description:    Internal endpoint used if moving a room failed. Lets the room accept commands again.
+    :return:        Returns json-formatted data with whether the room was thawed.
+    """
+    room_id: str = request.args.get("room_id", "").lower()
+    return jsonify({"event": "thawRoom", "success": registry.thaw(room_id)})
+
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    app.run(debug=True, port=int(os.environ.get("MONOPOLY_PORT", 5000)))
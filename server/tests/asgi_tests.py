@@ -0,0 +1,187 @@
+"""
+Description:    Test suite for the ASGI server, driving it the way an ASGI server would with in-memory WebSockets.
+Author:         Jordan Bourdeau
+Date:           12/13/23
+"""
+
+from server.asgi import ROOM_NOT_FOUND, app, registry
+
+from typing import Any
+
+import asyncio
+import json
+import threading
+import unittest
+
+
+class Client:
+
+    def __init__(self, room_id: str, player_id: str = "") -> None:
+        """
+        Description:        In-memory WebSocket connection to the app.
+        :param room_id:     ID of the room to connect to.
+        :param player_id:   ID of the player connecting, if they are already registered.
+        :returns:           None.
+        """
+        query: str = f"room_id={room_id}" + (f"&player_id={player_id}" if player_id else "")
+        self.inbound: asyncio.Queue = asyncio.Queue()
+        self.outbound: asyncio.Queue = asyncio.Queue()
+        # Events pushed to the client which haven't been checked yet
+        self.events: list[dict] = []
+        self.inbound.put_nowait({"type": "websocket.connect"})
+        self.task: asyncio.Task = asyncio.create_task(
+            app({"type": "websocket", "path": "/ws", "query_string": query.encode()}, self.inbound.get,
+                self.outbound.put))
+
+    async def accepted(self) -> bool:
+        return (await self.outbound.get())["type"] == "websocket.accept"
+
+    async def command(self, command: str, **args) -> dict[str, Any]:
+        """
+        Description:    Helper which sends a command and waits for its reply, collecting the events pushed meanwhile.
+        :param command: Name of the command.
+        :param args:    Arguments of the command.
+        :return:        Reply to the command.
+        """
+        self.inbound.put_nowait({"type": "websocket.receive", "text": json.dumps({"id": 1, "command": command, **args})})
+        while True:
+            message: dict[str, Any] = await self.receive()
+            if message.get("id") == 1:
+                return message
+            self.events += message["events"]
+
+    async def receive(self) -> dict[str, Any]:
+        return json.loads((await asyncio.wait_for(self.outbound.get(), 1))["text"])
+
+    async def drain_events(self) -> list[dict]:
+        # Yield to the event loop so every wakeup is handled before collecting what was pushed
+        await asyncio.sleep(0.01)
+        while not self.outbound.empty():
+            self.events += json.loads(self.outbound.get_nowait()["text"])["events"]
+        events, self.events = self.events, []
+        return events
+
+    async def close(self) -> None:
+        self.inbound.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+class ASGITests(unittest.TestCase):
+
+    def request(self, path: str) -> tuple[int, dict]:
+        sent: list[dict] = []
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        asyncio.run(app({"type": "http", "path": path, "query_string": b""}, None, send))
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    def test_rooms(self):
+        status, body = self.request("/room/create")
+        self.assertEqual(200, status)
+        self.assertTrue(body["success"])
+        room_id: str = body["roomId"]
+        status, body = self.request("/room/list")
+        self.assertIn(room_id, [room["roomId"] for room in body["rooms"]])
+        # Games are only played over WebSockets
+        self.assertEqual(404, self.request("/game/data")[0])
+        registry.close(room_id)
+
+    def test_game(self):
+        room_id: str = registry.create()
+
+        async def play() -> None:
+            first: Client = Client(room_id)
+            second: Client = Client(room_id)
+            self.assertTrue(await first.accepted())
+            self.assertTrue(await second.accepted())
+            # Commands need a registered player
+            self.assertFalse((await first.command("start_game"))["success"])
+            reply: dict = await first.command("register_player", display_name="player1")
+            self.assertEqual({"id": 1, "event": "registerPlayer", "playerId": reply["playerId"], "success": True},
+                             reply)
+            self.assertEqual(["showPlayerJoin", "promptStartGame"], [event["type"] for event in await first.drain_events()])
+            await second.command("register_player", display_name="player2")
+            # Events are pushed to the players they are for without being asked for
+            self.assertEqual(["showPlayerJoin"], [event["type"] for event in await first.drain_events()])
+            second.events = []
+            self.assertTrue((await first.command("start_game"))["success"])
+            active: Client = first if registry.get(room_id).active_player_id == reply["playerId"] else second
+            other: Client = second if active is first else first
+            self.assertIn("promptRoll", [event["type"] for event in await active.drain_events()])
+            self.assertNotIn("promptRoll", [event["type"] for event in await other.drain_events()])
+            self.assertEqual({"id": 1, "event": "rollDice", "success": True}, await active.command("roll_dice"))
+            self.assertIn("showRoll", [event["type"] for event in await other.drain_events()])
+            # Missing arguments fail the command rather than the connection
+            self.assertFalse((await active.command("buy_property"))["success"])
+            self.assertFalse((await active.command("fly"))["success"])
+            reply = await active.command("batch", commands=[{"command": "fly"}, {"command": "end_turn"}])
+            self.assertEqual([{"event": "fly", "success": False}, {"event": "endTurn", "success": False, "skipped": True}],
+                             reply["results"])
+            state: dict = await active.command("data")
+            self.assertTrue(state["success"])
+            self.assertTrue((await active.command("data", since=state["version"]))["unchanged"])
+            await first.close()
+            await second.close()
+            # Closed connections stop listening to the game
+            self.assertEqual([], registry.get(room_id)._listeners)
+
+        asyncio.run(play())
+        registry.close(room_id)
+
+    def test_blocking(self):
+        blocked: str = registry.create()
+        other: str = registry.create()
+        release: threading.Event = threading.Event()
+        locked: threading.Event = threading.Event()
+
+        def hold_lock() -> None:
+            with registry.get(blocked).lock.write():
+                locked.set()
+                release.wait(5)
+
+        async def play() -> None:
+            first: Client = Client(blocked)
+            second: Client = Client(other)
+            self.assertTrue(await first.accepted())
+            self.assertTrue(await second.accepted())
+            holder: threading.Thread = threading.Thread(target=hold_lock)
+            holder.start()
+            locked.wait(5)
+            # A command waiting on its game's lock doesn't hold up connections to other rooms
+            waiting: asyncio.Task = asyncio.create_task(first.command("register_player", display_name="player1"))
+            self.assertTrue((await second.command("register_player", display_name="player2"))["success"])
+            self.assertTrue(holder.is_alive())
+            self.assertFalse(waiting.done())
+            release.set()
+            self.assertTrue((await waiting)["success"])
+            holder.join()
+            await first.close()
+            await second.close()
+
+        asyncio.run(play())
+        registry.close(blocked)
+        registry.close(other)
+
+    def test_reconnect(self):
+        room_id: str = registry.create()
+        player_id: str = registry.get(room_id).register_player("player1")
+
+        async def reconnect() -> None:
+            # Events enqueued while disconnected are sent on connecting
+            client: Client = Client(room_id, player_id)
+            self.assertTrue(await client.accepted())
+            self.assertEqual(["showPlayerJoin", "promptStartGame"], [event["type"] for event in await client.drain_events()])
+            await client.close()
+            # Unknown rooms and players are refused
+            for client in (Client("missing", player_id), Client(room_id, "missing")):
+                self.assertEqual({"type": "websocket.close", "code": ROOM_NOT_FOUND}, await client.outbound.get())
+                await client.task
+
+        asyncio.run(reconnect())
+        registry.close(room_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Description:    Stress tests verifying the Game stays consistent when it is hammered from many threads at once.
+Author:         Jordan Bourdeau
+Date:           12/01/23
+"""
+
+from server.game_logic.asset_tile import AssetTile
+from server.game_logic.constants import MAX_NUM_PLAYERS, NUM_TILES, STARTING_MONEY
+from server.game_logic.game import Game
+from server.game_logic.read_write_lock import ReadWriteLock
+from server.server import app, registry
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import random
+import sys
+import threading
+import time
+import unittest
+
+NUM_THREADS: int = 16
+
+
+class ConcurrencyTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Switch threads as often as possible to shake out races
+        self.switch_interval: float = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self) -> None:
+        sys.setswitchinterval(self.switch_interval)
+
+    def assert_invariants(self, game: Game) -> None:
+        """
+        Description:    Helper verifying every asset has a single owner who lists it exactly once.
+        :return:        None.
+        """
+        owned: list[AssetTile] = []
+        for player in game.players.values():
+            self.assertEqual(len(player.assets), len(set(player.assets)))
+            for asset in player.assets:
+                self.assertIs(player, asset.owner)
+            owned.extend(player.assets)
+        self.assertEqual(len(owned), len(set(owned)))
+        for tile in game.tiles:
+            if isinstance(tile, AssetTile) and tile.owner is not None:
+                self.assertIn(tile, tile.owner.assets)
+
+    def test_read_write_lock(self):
+        lock: ReadWriteLock = ReadWriteLock()
+        # Multiple readers can hold the lock at once
+        readers_inside: threading.Barrier = threading.Barrier(2, timeout=5)
+
+        def reader():
+            with lock.read():
+                readers_inside.wait()
+
+        threads: list[threading.Thread] = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(readers_inside.broken)
+
+        # Nested reads don't deadlock behind a waiting writer
+        with lock.read():
+            writer_thread: threading.Thread = threading.Thread(
+                target=lambda: lock.acquire_write() or lock.release_write())
+            writer_thread.start()
+            while lock._waiting_writers == 0:
+                time.sleep(0.001)
+            with lock.read():
+                pass
+        writer_thread.join(timeout=5)
+        self.assertFalse(writer_thread.is_alive())
+
+        # The write lock is reentrant and can be used to read
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+
+        # Writers exclude everyone else
+        counter: list[int] = [0]
+
+        def writer():
+            for _ in range(1000):
+                with lock.write():
+                    value: int = counter[0]
+                    time.sleep(0)
+                    counter[0] = value + 1
+
+        with ThreadPoolExecutor(max_workers=NUM_THREADS) as pool:
+            for future in [pool.submit(writer) for _ in range(NUM_THREADS)]:
+                future.result()
+        self.assertEqual(1000 * NUM_THREADS, counter[0])
+
+    def test_concurrent_purchases(self):
+        game: Game = Game()
+        ids: list[str] = [game.register_player(f"player{n}") for n in range(MAX_NUM_PLAYERS)]
+        game.start_game(ids[0])
+        player_id: str = game.active_player_id
+
+        def buy_everything():
+            tile_ids: list[int] = list(range(NUM_TILES))
+            random.shuffle(tile_ids)
+            for tile_id in tile_ids:
+                game.buy_property(player_id, tile_id)
+                game.to_dict()
+
+        with ThreadPoolExecutor(max_workers=NUM_THREADS) as pool:
+            for future in [pool.submit(buy_everything) for _ in range(NUM_THREADS)]:
+                future.result()
+
+        # Every property was bought exactly once and money was only taken once per property
+        player = game.players[player_id]
+        self.assert_invariants(game)
+        spent: int = sum(asset.price for asset in player.assets)
+        self.assertEqual(STARTING_MONEY, player.money + spent)
+        total_money: int = sum(player.money for player in game.players.values())
+        self.assertEqual(MAX_NUM_PLAYERS * STARTING_MONEY, total_money + spent)
+
+    def test_concurrent_endpoints(self):
+        room_id: str = registry.create()
+        game: Game = registry.get(room_id)
+        ids: list[str] = [game.register_player(f"player{n}") for n in range(4)]
+        game.start_game(ids[0])
+
+        def take_turn():
+            client = app.test_client()
+            player_id: str = game.active_player_id
+            args: dict = {"room_id": room_id, "player_id": player_id}
+            client.get("/game/roll_dice", query_string=args)
+            location: int = game.players[player_id].location
+            client.get("/game/buy_property", query_string=dict(args, tile_id=location))
+            client.get("/game/end_turn", query_string=args)
+            response = client.get("/game/data", query_string=args)
+            self.assertTrue(json.loads(response.data)["success"])
+
+        with ThreadPoolExecutor(max_workers=NUM_THREADS) as pool:
+            for future in [pool.submit(take_turn) for _ in range(200)]:
+                future.result()
+
+        self.assert_invariants(game)
+        # Nobody rolled again within a turn unless their last roll was doubles
+        last_roll: dict = None
+        for event in game.event_history:
+            parameters: dict = event.parameters
+            if parameters["type"] == "showStartTurn":
+                last_roll = None
+            elif parameters["type"] == "showRoll":
+                if last_roll is not None:
+                    self.assertEqual(last_roll["first"], last_roll["second"])
+                    self.assertEqual(last_roll["playerId"], parameters["playerId"])
+                last_roll = parameters
+        registry.close(room_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ Date:           11/5/23
 from server.game_logic.cards import Card
 from server.game_logic.deck import Deck
 
+import random
 import unittest
 
 
@@ -94,6 +95,17 @@ class DeckTests(unittest.TestCase):
         self.assertEqual([], deck.stack)
         self.assertEqual([], deck.discard)
 
+    def test_rng(self):
+        # Decks shuffled with identically seeded generators come out in the same order, including reshuffles
+        cards: list[Card] = [Card(str(idx)) for idx in range(16)]
+        deck1: Deck = Deck(cards, random.Random(7))
+        deck2: Deck = Deck(cards, random.Random(7))
+        self.assertEqual(deck1.stack, deck2.stack)
+        for _ in range(2 * len(cards)):
+            self.assertIs(deck1.draw(), deck2.draw())
+        # Without a generator, each deck gets its own
+        self.assertIsNot(Deck(cards).rng, Deck(cards).rng)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,18 +5,20 @@ Date:           10/24/23
 """
 
 from server.game_logic.asset_tile import AssetTile
-from server.game_logic.constants import (JAIL_COST, JAIL_LOCATION, JAIL_TURNS, MAX_NUM_PLAYERS, MIN_NUM_PLAYERS,
-                                         PLAYER_ID_LENGTH, START_LOCATION, STARTING_MONEY)
+from server.game_logic.constants import (JAIL_COST, JAIL_LOCATION, JAIL_TURNS, MAX_NUM_PLAYERS, MIGRATION_TOKEN_HEADER,
+                                         MIN_NUM_PLAYERS, PLAYER_ID_LENGTH, START_LOCATION, STARTING_MONEY)
 from server.game_logic.event import Event
+from server.game_logic.event_log import EventLog
 from server.game_logic.improvable_tile import ImprovableTile
 from server.game_logic.player import Player
 from server.game_logic.player_updates import BuyUpdate, GoToJailUpdate, LeaveJailUpdate
 from server.game_logic.railroad_tile import RailroadTile
 from server.game_logic.roll import Roll
 from server.game_logic.types import JailMethod, PropertyStatus, RailroadStatus, UtilityStatus
-from server.server import app, game
+from server.server import app, game, registry
 
 from flask_testing import TestCase
+from unittest.mock import patch
 import json
 import unittest
 
@@ -110,13 +112,7 @@ class EndpointTests(TestCase):
             # End turn requires a last roll
             player: Player = game.players[player_ids[0]]
             if endpoint == "/game/end_turn":
-                game.event_history.append(Event({
-                    "type": "showRoll",
-                    "displayName": player.display_name,
-                    "playerId": player.id,
-                    "first": 1,
-                    "second": 2
-                }))
+                game.rolled_this_turn = True
             expected["success"] = True
             query_string["player_id"] = game.active_player_id
             response = self.client.get(endpoint, query_string=query_string)
@@ -155,6 +151,82 @@ class EndpointTests(TestCase):
         response = self.client.get(endpoint, query_string={"player_id": id2})
         self.assertEqual(player2_queue, json.loads(response.data)["events"])
 
+    def test_data_since(self):
+        endpoint: str = "/game/data"
+        self.fill_players(2)
+        id1, id2 = game.players.keys()
+        response = self.client.get(endpoint, query_string={"player_id": id1})
+        json_data: dict = json.loads(response.data)
+        version: int = json_data["version"]
+        self.assertEqual(game.version, version)
+
+        # Nothing changed, so only the events and version are sent back
+        response = self.client.get(endpoint, query_string={"player_id": id1, "since": version})
+        self.assertEqual({"success": True, "events": [], "version": version, "unchanged": True},
+                         json.loads(response.data))
+
+        # Only the changed players are sent back
+        game.start_game(id1)
+        game.roll_dice(game.active_player_id, Roll(1, 2))
+        response = self.client.get(endpoint, query_string={"player_id": id1, "since": version})
+        json_data = json.loads(response.data)
+        self.assertEqual(game.version, json_data["version"])
+        self.assertEqual([game.turn_order[0]], [player["id"] for player in json_data["players"]])
+        self.assertEqual([], json_data["tiles"])
+
+    def test_events(self):
+        endpoint: str = "/game/events"
+        self.fill_players(2)
+        id1, id2 = game.players.keys()
+        # Verify events can't be retrieved without a valid player ID
+        response = self.client.get(endpoint, query_string={"player_id": "bogus", "timeout": 0})
+        self.assert200(response)
+        self.assertEqual({"success": False}, json.loads(response.data))
+
+        # Verify only the events are sent back, and they are cleared from the queue
+        player1_queue: list[dict] = [event.serialize() for event in game.event_queue[id1]]
+        response = self.client.get(endpoint, query_string={"player_id": id1, "timeout": 0})
+        self.assert200(response)
+        self.assertEqual({"success": True, "events": player1_queue}, json.loads(response.data))
+        self.assertEqual(0, len(game.event_queue[id1]))
+
+        # Times out with no events
+        response = self.client.get(endpoint, query_string={"player_id": id1, "timeout": 0.01})
+        self.assertEqual({"success": True, "events": []}, json.loads(response.data))
+
+        # Timeouts which aren't finite get the default instead of waiting forever (or spinning on NaN)
+        with patch("server.server.LONG_POLL_TIMEOUT", 0.01), \
+                patch.object(game, "wait_for_events", wraps=game.wait_for_events) as wait_for_events:
+            for timeout in ["nan", "inf", "-inf"]:
+                response = self.client.get(endpoint, query_string={"player_id": id1, "timeout": timeout})
+                self.assertEqual({"success": True, "events": []}, json.loads(response.data))
+                wait_for_events.assert_called_with(id1, 0.01)
+
+    def test_history(self):
+        endpoint: str = "/game/history"
+        self.fill_players(2)
+        id1, id2 = game.players.keys()
+        # Verify the history can't be retrieved without a valid player ID
+        response = self.client.get(endpoint, query_string={"player_id": "bogus"})
+        self.assert200(response)
+        self.assertEqual({"success": False}, json.loads(response.data))
+
+        # Without a sequence number the whole history is replayed
+        history: list[dict] = [event.serialize() for event in game.event_history]
+        response = self.client.get(endpoint, query_string={"player_id": id1})
+        expected: dict = {
+            "success": True,
+            "checkpoint": None,
+            "events": history,
+            "sequence": len(history) - 1
+        }
+        self.assertEqual(expected, json.loads(response.data))
+
+        # Only the events after the sequence number are sent back
+        response = self.client.get(endpoint, query_string={"player_id": id1, "since": 0})
+        expected["events"] = history[1:]
+        self.assertEqual(expected, json.loads(response.data))
+
     def test_start_game(self):
         endpoint: str = "/game/start_game"
         # Verify game cannot be started without players
@@ -227,12 +299,12 @@ class EndpointTests(TestCase):
         ids: list = [id1, id2]
         # Clear the event queue
         for id in ids:
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
             args["player_id"] = id
             response = self.client.get(endpoint, query_string=args)
             self.assert200(response)
             self.assertEqual(expected, json.loads(response.data))
-        game.event_history = []
+        game.event_history = EventLog()
 
         # Verify no events were enqueued
         for id in ids:
@@ -244,9 +316,9 @@ class EndpointTests(TestCase):
         self.assertTrue(game.started)
         # Clear the event queue
         for id in ids:
-            game.event_history = []
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_history = EventLog()
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         args["player_id"] = id1
         expected["success"] = True
@@ -604,13 +676,7 @@ class EndpointTests(TestCase):
         query_string: dict = {"player_id": player_ids[1]}
         expected: dict = {"event": event, "success": True}
         player: Player = game.players[player_ids[1]]
-        game.event_history.append(Event({
-            "type": "showRoll",
-            "displayName": player.display_name,
-            "playerId": player.id,
-            "first": 1,
-            "second": 2
-        }))
+        game.rolled_this_turn = True
         response = self.client.get(endpoint, query_string=query_string)
         self.assert200(response)
         self.assertEqual(expected, json.loads(response.data))
@@ -621,6 +687,166 @@ class EndpointTests(TestCase):
         event: str = "reset"
         self.authenticate(endpoint, event, require_active_player=False)
 
+    def test_rooms(self):
+        # Create a room and verify it shows up in the room list
+        response = self.client.get("/room/create")
+        self.assert200(response)
+        json_data: dict = json.loads(response.data)
+        self.assertEqual("createRoom", json_data["event"])
+        self.assertTrue(json_data["success"])
+        room_id: str = json_data["roomId"]
+        response = self.client.get("/room/list")
+        self.assert200(response)
+        self.assertIn(room_id, [room["roomId"] for room in json.loads(response.data)["rooms"]])
+
+        # Joining a room which doesn't exist fails
+        response = self.client.get("/room/join", query_string={"room_id": "bogus", "display_name": "Tester"})
+        self.assert200(response)
+        self.assertFalse(json.loads(response.data)["success"])
+        # Join the room and verify the player was only added to that room's game
+        player_ids: list[str] = []
+        for n in range(MIN_NUM_PLAYERS):
+            response = self.client.get("/room/join", query_string={"room_id": room_id, "display_name": f"player{n}"})
+            self.assert200(response)
+            json_data = json.loads(response.data)
+            self.assertTrue(json_data["success"])
+            player_ids.append(json_data["playerId"])
+        room = registry.get(room_id)
+        self.assertEqual(set(player_ids), set(room.players.keys()))
+        self.assertEqual(0, len(game.players))
+
+        # Game endpoints act on the room passed in
+        response = self.client.get("/game/start_game", query_string={"room_id": room_id, "player_id": player_ids[0]})
+        self.assertEqual({"event": "startGame", "success": True}, json.loads(response.data))
+        self.assertTrue(room.started)
+        self.assertFalse(game.started)
+        response = self.client.get("/game/data", query_string={"room_id": room_id, "player_id": player_ids[0]})
+        self.assertTrue(json.loads(response.data)["success"])
+        # Requests to a room which doesn't exist fail
+        response = self.client.get("/game/data", query_string={"room_id": "bogus", "player_id": player_ids[0]})
+        self.assertEqual({"success": False}, json.loads(response.data))
+
+        # Rooms can only be closed by their players
+        response = self.client.get("/room/close", query_string={"room_id": room_id, "player_id": "bogus"})
+        self.assertEqual({"event": "closeRoom", "success": False}, json.loads(response.data))
+        response = self.client.get("/room/close", query_string={"room_id": room_id, "player_id": player_ids[1]})
+        self.assertEqual({"event": "closeRoom", "success": True}, json.loads(response.data))
+        self.assertIsNone(registry.get(room_id))
+
+        # Room IDs can be passed in (ex. by the room router), but can't be reused
+        response = self.client.get("/room/create", query_string={"room_id": "Explicit"})
+        self.assertEqual({"event": "createRoom", "roomId": "explicit", "success": True}, json.loads(response.data))
+        response = self.client.get("/room/create", query_string={"room_id": "explicit"})
+        self.assertFalse(json.loads(response.data)["success"])
+        registry.close("explicit")
+
+    @patch("server.server.MIGRATION_TARGETS", ["http://target"])
+    @patch("server.server.MIGRATION_TOKEN", "secret")
+    def test_migration(self):
+        room_id: str = json.loads(self.client.get("/room/create").data)["roomId"]
+        # The internal endpoints are refused without the migration token
+        for headers in ({}, {MIGRATION_TOKEN_HEADER: "wrong"}):
+            response = self.client.get("/room/export", query_string={"room_id": room_id}, headers=headers)
+            self.assertEqual(403, response.status_code)
+            self.assertFalse(registry.get(room_id).frozen)
+        headers: dict[str, str] = {MIGRATION_TOKEN_HEADER: "secret"}
+        player_ids: list[str] = [json.loads(self.client.get("/room/join", query_string={
+            "room_id": room_id, "display_name": f"player{n}"}).data)["playerId"] for n in range(MIN_NUM_PLAYERS)]
+        self.client.get("/game/start_game", query_string={"room_id": room_id, "player_id": player_ids[0]})
+        active_id: str = registry.get(room_id).active_player_id
+
+        # Exporting freezes the room, so commands are rejected but the state can still be read
+        response = self.client.get("/room/export", query_string={"room_id": room_id}, headers=headers)
+        self.assert200(response)
+        self.assertEqual("application/octet-stream", response.mimetype)
+        response = self.client.get("/game/roll_dice", query_string={"room_id": room_id, "player_id": active_id})
+        self.assertFalse(json.loads(response.data)["success"])
+        response = self.client.get("/game/data", query_string={"room_id": room_id, "player_id": player_ids[0]})
+        self.assertTrue(json.loads(response.data)["success"])
+        # Pinned rooms can't be exported
+        response = self.client.get("/room/export", headers=headers)
+        self.assertEqual({"event": "exportRoom", "success": False}, json.loads(response.data))
+
+        # Import the room under another ID (standing in for the target server) and release the original
+        data: bytes = self.client.get("/room/export", query_string={"room_id": room_id}, headers=headers).data
+        response = self.client.post("/room/import", query_string={"room_id": "moved"}, data=data, headers=headers)
+        self.assertEqual({"event": "importRoom", "success": True}, json.loads(response.data))
+        response = self.client.post("/room/import", query_string={"room_id": "junk"}, data=b"junk", headers=headers)
+        self.assertEqual({"event": "importRoom", "success": False}, json.loads(response.data))
+        # Rooms can only be released to a known target
+        response = self.client.get("/room/release", query_string={"room_id": room_id, "target": "http://evil"},
+                                   headers=headers)
+        self.assertEqual({"event": "releaseRoom", "success": False}, json.loads(response.data))
+        response = self.client.get("/room/release", query_string={"room_id": room_id, "target": "http://target"},
+                                   headers=headers)
+        self.assertEqual({"event": "releaseRoom", "success": True}, json.loads(response.data))
+
+        # Clients of the released room are redirected
+        response = self.client.get("/game/data", query_string={"room_id": room_id, "player_id": player_ids[0]})
+        self.assertEqual({"success": False, "redirect": "http://target"}, json.loads(response.data))
+        response = self.client.get("/game/roll_dice", query_string={"room_id": "moved", "player_id": active_id})
+        self.assertTrue(json.loads(response.data)["success"])
+        registry.close("moved")
+
+    def test_batch(self):
+        player_ids: list[str] = self.fill_players(MIN_NUM_PLAYERS)
+        # Only lists of commands are accepted
+        response = self.client.post("/game/batch", query_string={"player_id": player_ids[0]}, json={})
+        self.assertEqual({"event": "batch", "success": False}, json.loads(response.data))
+        response = self.client.post("/game/batch", query_string={"player_id": player_ids[0]},
+                                    json=[{"command": "start_game"}])
+        data: dict = json.loads(response.data)
+        self.assertTrue(data["success"])
+        self.assertEqual([{"event": "startGame", "success": True}], data["results"])
+        self.assertIn("showStartGame", [event["type"] for event in data["events"]])
+
+        # The batch stops at the first command which fails
+        query_string: dict = {"player_id": game.active_player_id}
+        response = self.client.post("/game/batch", query_string=query_string, json=[
+            {"command": "buy_property", "tile_id": "invalid"}, {"command": "roll_dice"}])
+        data = json.loads(response.data)
+        self.assertFalse(data["success"])
+        self.assertEqual([{"event": "buyProperty", "success": False},
+                          {"event": "rollDice", "success": False, "skipped": True}], data["results"])
+        self.assertIsNone(game.last_roll)
+
+        # The batch is atomic, so a failure rolls back the commands which already ran without showing their events
+        version: int = game.version
+        num_commands: int = len(game.command_log)
+        response = self.client.post("/game/batch", query_string=query_string, json=[
+            {"command": "buy_property", "tile_id": 3}, {"command": "set_mortgage", "tile_id": 1, "mortgage": "true"},
+            {"command": "end_turn"}])
+        data = json.loads(response.data)
+        self.assertEqual([{"event": "buyProperty", "success": False, "rolledBack": True},
+                          {"event": "setMortgage", "success": False},
+                          {"event": "endTurn", "success": False, "skipped": True}], data["results"])
+        self.assertNotIn("showPurchase", [event["type"] for event in data["events"]])
+        self.assertIsNone(game.tiles[3].owner)
+        self.assertEqual((version, num_commands), (game.version, len(game.command_log)))
+        self.assertEqual(STARTING_MONEY, game.players[query_string["player_id"]].money)
+
+        # Rolls can't be rolled back, so batches which could fail after drawing the dice are refused
+        rng_state: tuple = game.rng.getstate()
+        for commands in [[{"command": "roll_dice"}, {"command": "roll_dice"}],
+                         [{"command": "roll_dice"}, {"command": "end_turn"}]]:
+            response = self.client.post("/game/batch", query_string=query_string, json=commands)
+            data = json.loads(response.data)
+            self.assertEqual([{"event": None, "success": False, "skipped": True}] * 2, data["results"])
+            self.assertNotIn("showRoll", [event["type"] for event in data["events"]])
+        # Nothing was drawn, so the next roll is still unseen
+        self.assertIsNone(game.last_roll)
+        self.assertEqual(rng_state, game.rng.getstate())
+        self.assertEqual((version, num_commands), (game.version, len(game.command_log)))
+
+        # The state is included when a version is passed
+        query_string["since"] = version
+        response = self.client.post("/game/batch", query_string=query_string, json=[{"command": "roll_dice"}])
+        data = json.loads(response.data)
+        self.assertEqual([{"event": "rollDice", "success": True}], data["results"])
+        self.assertIn("showRoll", [event["type"] for event in data["events"]])
+        self.assertIsNotNone(game.last_roll)
+        self.assertEqual(game.version, data["version"])
+        self.assertIn(query_string["player_id"], [player["id"] for player in data["players"]])
 
 if __name__ == '__main__':
     unittest.main()
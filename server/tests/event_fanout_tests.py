@@ -0,0 +1,112 @@
+"""
+Description:    Test suite for the EventFanout class holding every player's event queue.
+Author:         Jordan Bourdeau
+Date:           12/03/23
+"""
+
+from server.game_logic.event import Event
+from server.game_logic.event_fanout import EventFanout
+
+import unittest
+
+
+class EventFanoutTests(unittest.TestCase):
+
+    def test_add_player(self):
+        fanout: EventFanout = EventFanout()
+        self.assertNotIn("player1", fanout)
+        self.assertIsNone(fanout.get("player1"))
+        fanout.publish(Event({"type": "event0"}))
+        fanout.add_player("player1")
+        # Players only receive events published after they were added
+        self.assertIn("player1", fanout)
+        self.assertEqual([], fanout["player1"])
+        self.assertEqual(["player1"], list(fanout.keys()))
+        self.assertEqual(1, len(fanout))
+
+    def test_publish(self):
+        fanout: EventFanout = EventFanout()
+        fanout.add_player("player1")
+        fanout.add_player("player2")
+        broadcast: Event = Event({"type": "broadcast"})
+        targeted: Event = Event({"type": "targeted"})
+        fanout.publish(broadcast)
+        fanout.publish(targeted, ["player2"])
+        self.assertEqual([broadcast], fanout["player1"])
+        self.assertEqual([broadcast, targeted], fanout["player2"])
+        self.assertTrue(fanout.has_pending("player1"))
+        self.assertFalse(fanout.has_pending("bogus"))
+
+        # Clearing moves the player past their pending events
+        fanout.clear("player2")
+        self.assertEqual([], fanout["player2"])
+        self.assertFalse(fanout.has_pending("player2"))
+        self.assertEqual([broadcast], fanout["player1"])
+
+    def test_flush(self):
+        fanout: EventFanout = EventFanout()
+        fanout.add_player("player1")
+        fanout.add_player("player2")
+        fanout.publish(Event({"type": "event", "display_name": "player"}))
+        events1: list[dict] = fanout.flush("player1")
+        self.assertEqual([{"type": "event", "displayName": "player"}], events1)
+        self.assertEqual([], fanout.flush("player1"))
+        self.assertEqual([], fanout.flush("bogus"))
+        # The event is serialized once and shared between players
+        events2: list[dict] = fanout.flush("player2")
+        self.assertIs(events1[0], events2[0])
+        # Events every player has received are dropped
+        self.assertEqual(0, len(fanout._entries))
+
+    def test_max_events(self):
+        fanout: EventFanout = EventFanout(max_events=3)
+        fanout.add_player("player1")
+        events: list[Event] = [Event({"type": f"event{n}"}) for n in range(5)]
+        for event in events:
+            fanout.publish(event)
+        # Only the newest events are kept for players who stopped polling
+        self.assertEqual(events[2:], fanout["player1"])
+        # They are told to resync before the events which are left, and only once
+        self.assertTrue(fanout.has_pending("player1"))
+        expected: list[dict] = [{"type": "resync"}] + [event.serialize() for event in events[2:]]
+        self.assertEqual(expected, fanout.flush("player1"))
+        self.assertFalse(fanout.has_pending("player1"))
+        self.assertEqual([], fanout.flush("player1"))
+
+    def test_missed_targets(self):
+        fanout: EventFanout = EventFanout(max_events=2)
+        fanout.add_player("player1")
+        fanout.add_player("player2")
+        for n in range(3):
+            fanout.publish(Event({"type": f"event{n}"}), ["player2"])
+        # Only players who the dropped events were for need to resync
+        self.assertFalse(fanout.has_pending("player1"))
+        self.assertEqual([], fanout.flush("player1"))
+        self.assertEqual([{"type": "resync"}, {"type": "event1"}, {"type": "event2"}], fanout.flush("player2"))
+
+    def test_to_dict(self):
+        fanout: EventFanout = EventFanout()
+        fanout.add_player("player1")
+        fanout.add_player("player2")
+        fanout.publish(Event({"type": "event0", "display_name": "player"}))
+        fanout.flush("player1")
+        fanout.publish(Event({"type": "event1"}), ["player1"])
+        # Delivery resumes from each player's cursor
+        copy: EventFanout = EventFanout.from_dict(fanout.to_dict())
+        for player_id in ["player1", "player2"]:
+            self.assertEqual(fanout.flush(player_id), copy.flush(player_id))
+        # Cursors from before the oldest event kept start from it, and those players need to resync
+        copy = EventFanout.from_dict({"events": [{"event": {"type": f"event{n}"}, "targets": None} for n in range(4)],
+                                      "cursors": {"player1": 0}}, max_events=2)
+        self.assertEqual([{"type": "resync"}, {"type": "event2"}, {"type": "event3"}], copy.flush("player1"))
+        # Players who still need to resync carry over
+        fanout = EventFanout(max_events=1)
+        fanout.add_player("player1")
+        fanout.publish(Event({"type": "event0"}))
+        fanout.publish(Event({"type": "event1"}))
+        copy = EventFanout.from_dict(fanout.to_dict())
+        self.assertEqual([{"type": "resync"}, {"type": "event1"}], copy.flush("player1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Description:    Test suite for the EventLog class used for the game's event history.
+Author:         Jordan Bourdeau
+Date:           12/02/23
+"""
+
+from server.game_logic.event import Event
+from server.game_logic.event_log import EventLog
+
+import json
+import os
+import tempfile
+import unittest
+
+
+class EventLogTests(unittest.TestCase):
+
+    def test_append(self):
+        log: EventLog = EventLog(max_events=4, checkpoint_interval=2)
+        self.assertEqual(0, len(log))
+        events: list[Event] = [Event({"type": f"event{n}"}) for n in range(6)]
+        for n, event in enumerate(events):
+            self.assertEqual(n, log.append(event))
+        # Only the newest events are kept
+        self.assertEqual(4, len(log))
+        self.assertEqual(events[2:], list(log))
+        self.assertIs(events[-1], log[-1])
+        self.assertEqual(2, log.first_sequence)
+        self.assertEqual(6, log.next_sequence)
+        # No checkpoints without a snapshot function
+        self.assertIsNone(log.checkpoint_state)
+
+        with self.assertRaises(ValueError):
+            EventLog(snapshot=dict, max_events=4, checkpoint_interval=4)
+
+    def test_checkpoint(self):
+        state: dict = {"count": 0}
+        log: EventLog = EventLog(snapshot=lambda: dict(state), max_events=4, checkpoint_interval=3)
+        events: list[Event] = [Event({"type": f"event{n}"}) for n in range(8)]
+        # Each event is its own command, with the state updated before the command is done
+        for event in events:
+            log.append(event)
+            state["count"] += 1
+            log.checkpoint_if_due()
+        # Checkpoints were taken after the commands with sequence numbers 2 and 5
+        self.assertEqual(6, log.checkpoint_sequence)
+        self.assertEqual({"count": 6}, log.checkpoint_state)
+        self.assertEqual(4, log.first_sequence)
+
+    def test_checkpoint_boundary(self):
+        state: dict = {"count": 0}
+        log: EventLog = EventLog(snapshot=lambda: dict(state), max_events=4, checkpoint_interval=3)
+        # Appending alone never checkpoints, since the command may still be applying its changes
+        for n in range(6):
+            log.append(Event({"type": f"event{n}"}))
+            state["count"] += 1
+        self.assertIsNone(log.checkpoint_state)
+        self.assertEqual(0, log.checkpoint_sequence)
+        # Events since the last checkpoint are kept past the limit until the command is done
+        self.assertEqual(6, len(log))
+        self.assertEqual(0, log.first_sequence)
+
+        log.checkpoint_if_due()
+        self.assertEqual({"count": 6}, log.checkpoint_state)
+        self.assertEqual(6, log.checkpoint_sequence)
+        self.assertEqual(4, len(log))
+        self.assertEqual(2, log.first_sequence)
+        # Nothing is taken until another interval has passed
+        log.append(Event({"type": "event6"}))
+        state["count"] += 1
+        log.checkpoint_if_due()
+        self.assertEqual(6, log.checkpoint_sequence)
+
+    def test_since(self):
+        state: dict = {"count": 0}
+        log: EventLog = EventLog(snapshot=lambda: dict(state), max_events=4, checkpoint_interval=3)
+        events: list[Event] = [Event({"type": f"event{n}"}) for n in range(8)]
+        for event in events:
+            log.append(event)
+            state["count"] += 1
+            log.checkpoint_if_due()
+        # Events after the sequence number are still in memory
+        self.assertEqual((None, events[5:]), log.since(4))
+        self.assertEqual((None, events[4:]), log.since(3))
+        self.assertEqual((None, []), log.since(7))
+        # Fell too far behind (or no sequence number) so they get the checkpoint and everything after it
+        self.assertEqual(({"count": 6}, events[6:]), log.since(2))
+        self.assertEqual(({"count": 6}, events[6:]), log.since())
+
+        expected: dict = {
+            "checkpoint": None,
+            "events": [{"type": "event7"}],
+            "sequence": 7
+        }
+        self.assertEqual(expected, log.to_dict(6))
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "events.jsonl")
+            log: EventLog = EventLog(max_events=2, spill_path=path)
+            for n in range(4):
+                log.append(Event({"type": f"event{n}"}))
+            with open(path) as file:
+                lines: list[dict] = [json.loads(line) for line in file]
+        expected: list[dict] = [
+            {"sequence": 0, "event": {"type": "event0"}},
+            {"sequence": 1, "event": {"type": "event1"}}
+        ]
+        self.assertEqual(expected, lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,6 +25,10 @@ class TestEventClass(unittest.TestCase):
         event = Event(parameters)
         expected_result = {'paramOne': 'value1', 'paramTwo': 'value2'}
         self.assertEqual(event.serialize(), expected_result)
+        # The serialized form is memoized until the parameters are replaced
+        self.assertIs(event.serialize(), event.serialize())
+        event.parameters = {'param_three': 'value3'}
+        self.assertEqual({'paramThree': 'value3'}, event.serialize())
 
 
 if __name__ == '__main__':
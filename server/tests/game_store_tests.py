@@ -0,0 +1,103 @@
+"""
+Description:    Test suite for the GameStore class persisting rooms to SQLite.
+Author:         Jordan Bourdeau
+Date:           12/09/23
+"""
+
+from server.game_logic.command_log import CommandLog
+from server.game_logic.constants import DEFAULT_ROOM_ID
+from server.game_logic.game import Game
+from server.game_logic.game_registry import GameRegistry
+from server.game_logic.game_store import GameStore
+
+import os
+import tempfile
+import unittest
+
+
+class GameStoreTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.path: str = os.path.join(self.directory.name, "rooms.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_save(self):
+        store: GameStore = GameStore(self.path)
+        self.assertEqual("wal", store._connection.execute("PRAGMA journal_mode").fetchone()[0])
+        log: CommandLog = CommandLog(2 ** 64 - 1)
+        log.append("register_player", "player1", "abc")
+        # Rooms which weren't added aren't saved
+        self.assertEqual(0, store.save("room", log))
+        store.add_room("room", log.seed)
+        self.assertEqual(1, store.save("room", log))
+        # Only new commands are written
+        self.assertEqual(0, store.save("room", log))
+        log.append("mortgage", "abc", 1, True)
+        log.append("get_out_of_jail", "abc", 1)
+        self.assertEqual(2, store.save("room", log))
+        store.add_room("pinned", 5, pinned=True)
+        store.close()
+
+        store = GameStore(self.path)
+        rooms: dict = {room_id: (pinned, loaded) for room_id, pinned, loaded in store.load()}
+        self.assertEqual({"room": (False, log), "pinned": (True, CommandLog(5))}, rooms)
+        # Loaded rooms keep saving from where they left off
+        log.append("end_turn", "abc")
+        self.assertEqual(1, store.save("room", log))
+        store.remove_room("room")
+        self.assertEqual(["pinned"], [room_id for room_id, _, _ in store.load()])
+        store.close()
+
+    def test_restore(self):
+        registry: GameRegistry = GameRegistry(store=GameStore(self.path))
+        registry.create(DEFAULT_ROOM_ID, pinned=True)
+        room_id: str = registry.create()
+        closed: str = registry.create()
+        game: Game = registry.get(room_id)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        for _ in range(10):
+            player_id: str = game.active_player_id
+            game.roll_dice(player_id)
+            if game.active_player_id == player_id:
+                game.buy_property(player_id, game.players[player_id].location)
+                game.end_turn(player_id)
+        self.assertEqual(len(game.command_log), registry.persist(room_id))
+        self.assertEqual(0, registry.persist(room_id))
+        self.assertEqual(0, registry.persist("bogus"))
+        registry.close(closed)
+        registry.store.close()
+
+        # A new process restores every room which wasn't closed
+        restored: GameRegistry = GameRegistry(store=GameStore(self.path))
+        self.assertEqual({DEFAULT_ROOM_ID, room_id}, set(restored.restore()))
+        self.assertEqual(game.to_dict(), restored.get(room_id).to_dict())
+        self.assertFalse(restored.close(DEFAULT_ROOM_ID))
+        self.assertEqual([], restored.restore())
+        restored.store.close()
+
+    def test_restore_quarantine(self):
+        store: GameStore = GameStore(self.path)
+        store.add_room("good", 1)
+        store.add_room("bad", 2)
+        store.save("bad", CommandLog(2, [("register_player", "player1", "abc"), ("end_turn", "abc")]))
+        store.add_room("corrupt", 3)
+        store.save("corrupt", CommandLog(3, [("roll_dice",)]))
+        # Rooms which can't be replayed are set aside without stopping the rest from being restored
+        registry: GameRegistry = GameRegistry(store=store)
+        with self.assertLogs("server.game_logic.game_registry", "ERROR"):
+            self.assertEqual(["good"], registry.restore())
+        self.assertEqual(["good"], [room_id for room_id, _, _ in store.load()])
+        self.assertEqual({"bad", "corrupt"}, {room_id for (room_id,) in store._connection.execute(
+            "SELECT room_id FROM quarantine")})
+        # Their IDs can be reused
+        self.assertEqual("bad", registry.create("bad"))
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
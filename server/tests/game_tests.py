@@ -4,14 +4,20 @@ Author:         Jordan Bourdeau
 Date:           10/24/23
 """
 
-from server.game_logic.constants import (CHANCE_TILES, COMMUNITY_CHEST_TILES, MAX_NUM_PLAYERS, NUM_CHANCE_CARDS,
+from server.game_logic.board import BOARD, CHANCE_CARDS, COMMUNITY_CHEST_CARDS, SHARED_TILES
+from server.game_logic.constants import (CHANCE_TILES, COMMUNITY_CHEST_TILES, EVENT_CHECKPOINT_INTERVAL,
+                                         MAX_EVENT_HISTORY, MAX_NUM_PLAYERS, MAX_QUEUED_EVENTS, NUM_CHANCE_CARDS,
                                          NUM_COMMUNITY_CHEST_CARDS, PLAYER_ID_LENGTH, STARTING_MONEY)
 from server.game_logic.event import Event
+from server.game_logic.event_log import EventLog
 from server.game_logic.game import Game
 from server.game_logic.player_updates import *
 from server.game_logic.tile import Tile
 from server.game_logic.types import CardType, EventType, PlayerStatus
 
+import json
+import threading
+import time
 import unittest
 
 
@@ -29,8 +35,8 @@ class GameTests(unittest.TestCase):
 
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Test case: Empty event queue
         result_empty_queue: list[dict] = game.flush_events(id1)
@@ -64,6 +70,76 @@ class GameTests(unittest.TestCase):
         self.assertEqual(expected_result_multiple_players_player2, result_multiple_players_player2)
         self.assertEqual([], game.event_queue[id2] )  # Player2's queue should be cleared
 
+    def test_wait_for_events(self):
+        game: Game = Game()
+        id1: str = game.register_player("test1")
+        id2: str = game.register_player("test2")
+        game.flush_events(id1)
+        game.flush_events(id2)
+
+        # Times out with no events
+        self.assertEqual([], game.wait_for_events(id1, timeout=0))
+        # Returns immediately when there are already events queued
+        event1: Event = Event({"type": "event1"})
+        game._enqueue_event(event1, EventType.STATUS)
+        self.assertEqual([event1.serialize()], game.wait_for_events(id1, timeout=0))
+        self.assertEqual([event1.serialize()], game.wait_for_events(id2, timeout=0))
+        self.assertEqual([], game.event_queue[id1])
+
+        # Blocks until an event is enqueued for the player from another thread
+        event2: Event = Event({"type": "event2"})
+        timer: threading.Timer = threading.Timer(0.05, game._enqueue_event, args=[event2],
+                                                 kwargs={"target": id2})
+        start: float = time.monotonic()
+        timer.start()
+        self.assertEqual([event2.serialize()], game.wait_for_events(id2, timeout=5))
+        self.assertLess(time.monotonic() - start, 5)
+        timer.join()
+        # Other players are not sent targeted events
+        self.assertEqual([], game.wait_for_events(id1, timeout=0.01))
+
+        # Invalid player IDs don't block
+        self.assertEqual([], game.wait_for_events("bogus", timeout=5))
+
+    def test_get_history(self):
+        game: Game = Game()
+        id1: str = game.register_player("player1")
+        id2: str = game.register_player("player2")
+        game.start_game(id1)
+        # Flood the history with far more events than are kept, one per command
+        for n in range(2 * MAX_EVENT_HISTORY):
+            game._enqueue_event(Event({"type": f"event{n}"}), EventType.UPDATE)
+            game.event_history.checkpoint_if_due()
+        self.assertEqual(MAX_EVENT_HISTORY, len(game.event_history))
+        # Player queues are capped as well, keeping the newest events
+        for id in [id1, id2]:
+            self.assertEqual(MAX_QUEUED_EVENTS, len(game.event_queue[id]))
+            self.assertEqual(f"event{2 * MAX_EVENT_HISTORY - 1}", game.event_queue[id][-1].parameters["type"])
+
+        # Catching up from a recent sequence number only returns the newer events
+        last: int = game.event_history.next_sequence - 1
+        history: dict = game.get_history(last - 1)
+        self.assertIsNone(history["checkpoint"])
+        self.assertEqual([game.event_history[-1].serialize()], history["events"])
+        self.assertEqual(last, history["sequence"])
+
+        # Catching up from the start replays from the latest checkpoint of the full state
+        history = game.get_history()
+        self.assertEqual(game.to_dict(), history["checkpoint"])
+        self.assertLessEqual(len(history["events"]), EVENT_CHECKPOINT_INTERVAL)
+        self.assertEqual(game.event_history[-1].serialize(), history["events"][-1])
+
+    def test_checkpoint_after_command(self):
+        game: Game = Game(seed=1)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        # Checkpoint after every event, so one would land mid-command if they were taken as events are appended
+        game.event_history.checkpoint_interval = 1
+        game.roll_dice(game.active_player_id)
+        self.assertEqual(game.event_history.next_sequence, game.event_history.checkpoint_sequence)
+        self.assertEqual(game.to_dict(), game.event_history.checkpoint_state)
+
     def test_start_game(self):
         game: Game = Game()
         # Can't start game with no players and without valid player ID
@@ -128,6 +204,28 @@ class GameTests(unittest.TestCase):
         self.assertTrue(id == "")
         self.assertEqual(MAX_NUM_PLAYERS, len(game.players))
 
+    def test_seed(self):
+        # Games with the same seed shuffle the turn order, decks, and dice identically
+        games: list[Game] = [Game(seed=42), Game(seed=42)]
+        for game in games:
+            id1: str = game.register_player("player1")
+            game.register_player("player2")
+            game.start_game(id1)
+        orders: list[list[str]] = [[game.players[id].display_name for id in game.turn_order] for game in games]
+        self.assertEqual(orders[0], orders[1])
+        self.assertEqual([card.description for card in games[0].chance_deck.stack],
+                         [card.description for card in games[1].chance_deck.stack])
+        self.assertEqual([card.description for card in games[0].community_chest_deck.stack],
+                         [card.description for card in games[1].community_chest_deck.stack])
+        for _ in range(20):
+            for game in games:
+                game.roll_dice(game.active_player_id)
+                game.end_turn(game.active_player_id)
+            self.assertEqual((games[0].last_roll.first, games[0].last_roll.second),
+                             (games[1].last_roll.first, games[1].last_roll.second))
+            self.assertEqual([player.location for player in games[0].players.values()],
+                             [player.location for player in games[1].players.values()])
+
     def test_roll_dice(self):
         game: Game = Game()
         # Can't roll dice when there is < 2 players or the active player ID is invalid
@@ -152,8 +250,8 @@ class GameTests(unittest.TestCase):
         ids: list[str] = [id1, id2]
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Can't roll the dice without being the active player
         self.assertEqual(False, game.roll_dice(id2))
@@ -195,11 +293,15 @@ class GameTests(unittest.TestCase):
         self.assertEqual(expected, game.event_queue[id1][2].parameters)
         expected = {"type": "promptEndTurn"}
         self.assertEqual(expected, game.event_queue[id1][3].parameters)
+        # The roll is tracked for the rest of the turn
+        self.assertIs(roll, game.last_roll)
+        self.assertTrue(game.rolled_this_turn)
         game.end_turn(id1)
+        self.assertFalse(game.rolled_this_turn)
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Verify player cannot roll again since they did not get doubles
         self.assertFalse(game.roll_dice(id1), roll)
@@ -245,8 +347,8 @@ class GameTests(unittest.TestCase):
         self.assertEqual(start_length - 1, len(game.community_chest_deck.stack))
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Resets doubles condition. Test rolling onto a tile which does nothing (Jail).
         roll = Roll(3, 5)
@@ -277,8 +379,8 @@ class GameTests(unittest.TestCase):
         self.assertEqual(id1, game.active_player_id)
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Test rolling doubles 3 times to go to jail.
         roll = Roll(1, 1)
@@ -315,8 +417,8 @@ class GameTests(unittest.TestCase):
         # Roll doubles onto community chest
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Test rolling doubles 3 times to go to jail.
         roll = Roll(6, 6)
@@ -349,8 +451,8 @@ class GameTests(unittest.TestCase):
         # Roll doubles on last time. Verify they go straight to jail and do not enqueue an event from landing on a tile.
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Test rolling doubles 3 times to go to jail.
         self.assertTrue(game.roll_dice(id1, roll))
@@ -404,8 +506,8 @@ class GameTests(unittest.TestCase):
         self.assertEqual(0, player2.turns_in_jail)
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Roll a non-double and verify the player lands on Luxury Tax and pays the money.
         roll = Roll(1, 3)
@@ -444,8 +546,8 @@ class GameTests(unittest.TestCase):
         game.end_turn(id2)
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Have a player pass go when rolling and verify it increments their money.
         player.turns_in_jail = 0
@@ -471,8 +573,8 @@ class GameTests(unittest.TestCase):
         ids: list[str] = [id1, id2]
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Verify non-active player cannot buy a property
         self.assertFalse(game.buy_property(id2, 3))
@@ -555,8 +657,8 @@ class GameTests(unittest.TestCase):
         ids: list[str] = [player_id1, player_id2]
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Buy an improvable monopoly, utility monopoly, and railroad monopoly
         improvable_ids: list[int] = [16, 18, 19]
@@ -578,9 +680,9 @@ class GameTests(unittest.TestCase):
         # Clear out event queue
         for id in ids:
             self.assertEqual(len(improvable_ids) + len(utility_ids) + len(railroad_ids), len(game.event_queue[id]))
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
         self.assertEqual(len(improvable_ids) + len(utility_ids) + len(railroad_ids), len(game.event_history))
-        game.event_history = []
+        game.event_history = EventLog()
 
         # Verify improvements return False on utility and railroad tiles
         for id in utility_ids:
@@ -684,8 +786,8 @@ class GameTests(unittest.TestCase):
 
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
 
         # Shouldn't allow the non-active player to go
         self.assertFalse(game.mortgage(id2, 1, True))
@@ -761,18 +863,12 @@ class GameTests(unittest.TestCase):
         self.assertEqual(False, event.parameters["isMortgaged"])
 
         # Transition to next player (must enqueue roll event)
-        game.event_history.append(Event({
-            "type": "showRoll",
-            "displayName": player1.display_name,
-            "playerId": player1.id,
-            "first": 1,
-            "second": 2
-        }))
+        game.rolled_this_turn = True
         game.end_turn(id1)
         # Clear out event queue
         for id in ids:
-            game.event_queue[id] = []
-        game.event_history = []
+            game.event_queue.clear(id)
+        game.event_history = EventLog()
         baltic: ImprovableTile = game.tiles[3]
         player2: Player = game.players[id2]
         player2.update(BuyUpdate(baltic))
@@ -801,7 +897,7 @@ class GameTests(unittest.TestCase):
         ids: list[str] = [id1, id2]
         player: Player = game.players[id1]
         for id in ids:
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
 
         # Verify pre-conditions
         self.assertEqual(STARTING_MONEY, player.money)
@@ -880,9 +976,9 @@ class GameTests(unittest.TestCase):
         self.assertEqual(game.active_player_id, id1)
 
         # Clear event queues
-        game.event_history = []
+        game.event_history = EventLog()
         for id in ids:
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
 
         # Nothing should happen since they aren't the active player
         self.assertFalse(game.end_turn(id2))
@@ -897,13 +993,7 @@ class GameTests(unittest.TestCase):
 
         # Simulate a roll
         player1: Player = game.players[id1]
-        game.event_history.append(Event({
-            "type": "showRoll",
-            "displayName": player1.display_name,
-            "playerId": player1.id,
-            "first": 1,
-            "second": 2
-        }))
+        game.rolled_this_turn = True
 
         self.assertTrue(game.end_turn(id1))
         self.assertEqual(game.active_player_id, id2)
@@ -923,7 +1013,7 @@ class GameTests(unittest.TestCase):
             self.assertEqual(expected_end, game.event_queue[id][0].parameters)
             # Skip manually enqueued event
             self.assertEqual(expected_start, game.event_queue[id][2].parameters)
-        self.assertEqual(4, len(game.event_history))
+        self.assertEqual(3, len(game.event_history))
 
         # Verify next player has 1 additional event for the promptRoll
         self.assertEqual(4, len(game.event_queue[id2]))  # Two events for the player ending the turn
@@ -942,25 +1032,13 @@ class GameTests(unittest.TestCase):
         self.assertEqual(3, len(game.event_queue[id3]))
 
         player2: Player = game.players[id2]
-        game.event_history.append(Event({
-            "type": "showRoll",
-            "displayName": player2.display_name,
-            "playerId": player2.id,
-            "first": 1,
-            "second": 2
-        }))
+        game.rolled_this_turn = True
         game.end_turn(id2)
         self.assertEqual(game.active_player_id, id3)
 
         # Make sure it wraps back around properly
         player3: Player = game.players[id3]
-        game.event_history.append(Event({
-            "type": "showRoll",
-            "displayName": player3.display_name,
-            "playerId": player3.id,
-            "first": 1,
-            "second": 2
-        }))
+        game.rolled_this_turn = True
         game.end_turn(id3)
         self.assertEqual(game.active_player_id, id1)
 
@@ -979,8 +1057,151 @@ class GameTests(unittest.TestCase):
         # Start the game then verify it can be reset
         game.start_game(id)
         self.assertTrue(game.started)
+        lock, event_lock, event_condition = game.lock, game._event_lock, game._event_condition
+        # Anyone waiting on events is woken up by the reset rather than waiting out their timeout
+        waiter: threading.Thread = threading.Thread(target=game.wait_for_events, args=(id, 5))
+        game.flush_events(id)
+        waiter.start()
+        time.sleep(0.05)
         self.assertTrue(game.reset(id))
+        waiter.join(1)
+        self.assertFalse(waiter.is_alive())
         self.assertEqual(0, len(game.players))
+        # The locks other threads may be waiting on are kept
+        self.assertIs(lock, game.lock)
+        self.assertIs(event_lock, game._event_lock)
+        self.assertIs(event_condition, game._event_condition)
+
+    def test_freeze(self):
+        game: Game = Game()
+        id1: str = game.register_player("player1")
+        game.freeze()
+        # Commands are rejected while the game is frozen
+        self.assertEqual("", game.register_player("player2"))
+        self.assertFalse(game.start_game(id1))
+        self.assertEqual(1, len(game.players))
+        self.assertEqual(1, len(game.command_log))
+        game.thaw()
+        game.register_player("player2")
+        self.assertTrue(game.start_game(id1))
+
+    def test_slots(self):
+        game: Game = Game()
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        game.roll_dice(game.active_player_id)
+        # None of the objects made per game or per action should carry an attribute dictionary
+        for instance in (game.tiles + game.chance_deck.cards + list(game.players.values()) +
+                         [game.last_roll, Event({"type": "test"})]):
+            self.assertFalse(hasattr(instance, "__dict__"), type(instance).__name__)
+        for update in PlayerUpdate.__subclasses__():
+            self.assertIn("__slots__", vars(update), update.__name__)
+
+    def test_board_template(self):
+        game: Game = Game()
+        other: Game = Game()
+        # The board and decks match the template
+        for template, tile in zip(BOARD, game.tiles):
+            self.assertIs(template.kind, type(tile))
+            self.assertEqual((template.id, template.name), (tile.id, tile.name))
+            if template.group is not None:
+                self.assertEqual((template.price, template.group), (tile.price, tile.group))
+        self.assertEqual(list(CHANCE_CARDS), [card.description for card in game.chance_deck.cards])
+        self.assertEqual(list(COMMUNITY_CHEST_CARDS), [card.description for card in game.community_chest_deck.cards])
+        # Stateless tiles are shared between games while the ones holding state are not
+        for shared, tile, other_tile in zip(SHARED_TILES, game.tiles, other.tiles):
+            if shared is not None:
+                self.assertIs(shared, tile)
+                self.assertIs(tile, other_tile)
+            else:
+                self.assertIsNot(tile, other_tile)
+        self.assertIsNot(game.chance_deck.cards[0], other.chance_deck.cards[0])
+        self.assertIs(game.chance_deck, game.tiles[CHANCE_TILES[0]].deck)
+        self.assertIs(game.community_chest_deck, game.tiles[COMMUNITY_CHEST_TILES[0]].deck)
+
+    def test_listeners(self):
+        game: Game = Game()
+        calls: list[list[str]] = []
+        game.add_listener(calls.append)
+        id1: str = game.register_player("player1")
+        # Joining is shown to everyone, while the ready prompt only goes to the new player
+        self.assertEqual([None, [id1]], calls)
+        game.register_player("player2")
+        game.start_game(id1)
+        calls.clear()
+        game.reset(id1)
+        # Listeners are kept across resets and told about them
+        self.assertEqual([None], calls)
+        game.remove_listener(calls.append)
+        game.register_player("player1")
+        self.assertEqual([None], calls)
+
+    def test_to_dict_since(self):
+        game: Game = Game()
+        id1: str = game.register_player("player1")
+        id2: str = game.register_player("player2")
+        game.start_game(id1)
+        id1, id2 = game.turn_order
+        # Full state is returned without a version
+        version: int = game.version
+        state: dict = game.to_dict()
+        self.assertEqual(version, state["version"])
+        self.assertEqual(2, len(state["players"]))
+        self.assertEqual(len(game.tiles), len(state["tiles"]))
+        # Nothing changed since the current version
+        state = game.to_dict(since=version)
+        self.assertEqual([], state["players"])
+        self.assertEqual([], state["tiles"])
+
+        # Rolling only changes the player who rolled
+        game.roll_dice(id1, Roll(1, 2))
+        self.assertGreater(game.version, version)
+        state = game.to_dict(since=version)
+        self.assertEqual([id1], [player["id"] for player in state["players"]])
+        self.assertEqual([], state["tiles"])
+
+        # Buying a property changes the player and the tile
+        version = game.version
+        self.assertTrue(game.buy_property(id1, 3))
+        state = game.to_dict(since=version)
+        self.assertEqual([id1], [player["id"] for player in state["players"]])
+        self.assertEqual([3], [tile["id"] for tile in state["tiles"]])
+        self.assertEqual(id1, state["tiles"][0]["owner"])
+
+        # Ending a turn only changes the active player
+        version = game.version
+        self.assertTrue(game.end_turn(id1))
+        state = game.to_dict(since=version)
+        self.assertEqual(id2, state["activePlayerId"])
+        self.assertEqual([], state["players"])
+
+        # Versions from the future or from before a reset get the full state
+        self.assertEqual(2, len(game.to_dict(since=game.version + 1)["players"]))
+        version = game.version
+        self.assertTrue(game.reset(id1))
+        self.assertGreater(game.version, version)
+        state = game.to_dict(since=version)
+        self.assertEqual(len(game.tiles), len(state["tiles"]))
+
+    def test_to_json(self):
+        game: Game = Game()
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        id1 = game.active_player_id
+        version: int = game.version
+        encoded: str = game.to_json()
+        self.assertEqual(game.to_dict(), json.loads(encoded))
+        # The encoding is reused until the version changes
+        self.assertIs(encoded, game.to_json())
+        self.assertEqual(game.to_dict(since=version), json.loads(game.to_json(since=version)))
+        # Versions from the future get the full state, as for to_dict()
+        self.assertIs(encoded, game.to_json(since=game.version + 1))
+
+        game.roll_dice(id1, Roll(1, 2))
+        self.assertEqual(game.to_dict(), json.loads(game.to_json()))
+        self.assertEqual(game.to_dict(since=version), json.loads(game.to_json(since=version)))
 
     """ Test Private Helper Methods """
 
@@ -993,10 +1214,8 @@ class GameTests(unittest.TestCase):
             "player1": player1,
             "player2": player2
         }
-        game.event_queue = {
-            "player1": [],
-            "player2": []
-        }
+        game.event_queue.add_player("player1")
+        game.event_queue.add_player("player2")
         game._players.extend([player1, player2])
         game.turn_order = ["player1", "player2"]
         game.active_player_id = "player1"
@@ -1016,7 +1235,7 @@ class GameTests(unittest.TestCase):
             self.assertEqual(1, len(game.event_queue[id]))
             self.assertIs(event, game.event_queue[id][0])
             # Clear out queue to stage for next text
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
 
         # Test enqueueing a valid UPDATE event which goes to players and the game history.
         game._enqueue_event(event, EventType.UPDATE)
@@ -1025,15 +1244,15 @@ class GameTests(unittest.TestCase):
             self.assertEqual(1, len(game.event_queue[id]))
             self.assertIs(event, game.event_queue[id][0])
             # Clear out queue to stage for next text
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
 
         # Test enqueueing a valid PROMPT event which only goes to the active player.
-        game.event_history = []
+        game.event_history = EventLog()
         game._enqueue_event(event, EventType.PROMPT)
         self.assertEqual(0, len(game.event_history))
         self.assertEqual(1, len(game.event_queue["player1"]))
         self.assertEqual(0, len(game.event_queue["player2"]))
-        game.event_queue["player1"] = []
+        game.event_queue.clear("player1")
 
         # Test adding another event and verify the order is as expected
         event1 = Event({"type": "event1"})
@@ -1044,13 +1263,22 @@ class GameTests(unittest.TestCase):
         expected_order = [event1, event2]
         for id in game.turn_order:
             self.assertEqual(expected_order, game.event_queue[id])
-            game.event_queue[id] = []
+            game.event_queue.clear(id)
 
         # Test enqueueing an event with a specific target player
         target_event = Event({"type": "targetEvent"})
         game._enqueue_event(target_event, EventType.STATUS, target="player2")
         self.assertEqual(1, len(game.event_queue["player2"]))
         self.assertIs(target_event, game.event_queue["player2"][0])
+        game.event_queue.clear("player2")
+
+        # Players still see UPDATE events when the game history is turned off
+        game.record_history = False
+        game.event_history = EventLog()
+        game._enqueue_event(event, EventType.UPDATE)
+        self.assertEqual(0, len(game.event_history))
+        for id in game.turn_order:
+            self.assertEqual([event], game.event_queue[id])
 
     def test_apply_updates(self):
         game: Game = Game()
@@ -0,0 +1,187 @@
+"""
+Description:    Test suite for the consistent hash ring and the room router built on it.
+Author:         Jordan Bourdeau
+Date:           12/12/23
+"""
+
+from server.game_logic.constants import DEFAULT_ROOM_ID, INTERNAL_PATHS, ROOM_ID_LENGTH
+from server.game_logic.hash_ring import HashRing
+from server.game_logic.room_router import RoomRouter, ThreadingWSGIServer
+
+from collections import Counter
+from unittest.mock import patch
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import io
+import json
+import threading
+import unittest
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_backend(name: str) -> tuple[ThreadingWSGIServer, str]:
+    """
+    Description:    Helper starting a backend which echoes back its name, the request, and a fixed room list.
+    :param name:    Name of the backend.
+    :return:        The server and its base URL.
+    """
+    def app(environ, start_response):
+        if environ["PATH_INFO"] == "/room/list":
+            body: dict = {"rooms": [{"roomId": DEFAULT_ROOM_ID}, {"roomId": f"room-{name}"}]}
+        else:
+            length: int = int(environ.get("CONTENT_LENGTH") or 0)
+            body = {
+                "backend": name,
+                "method": environ["REQUEST_METHOD"],
+                "path": environ["PATH_INFO"],
+                "query": parse_qs(environ["QUERY_STRING"]),
+                "body": environ["wsgi.input"].read(length).decode()
+            }
+        data: bytes = json.dumps(body).encode()
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(data)))])
+        return [data]
+    server: ThreadingWSGIServer = make_server("127.0.0.1", 0, app, server_class=ThreadingWSGIServer,
+                                              handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class HashRingTests(unittest.TestCase):
+
+    def test_get(self):
+        ring: HashRing = HashRing()
+        self.assertIsNone(ring.get("room"))
+        ring = HashRing(["a", "b", "c"])
+        self.assertEqual(3, len(ring))
+        self.assertEqual(["a", "b", "c"], ring.nodes)
+        self.assertFalse(ring.add("a"))
+        # Keys always map to the same node, and every node gets a fair share
+        keys: list[str] = [f"room{n}" for n in range(3000)]
+        owners: dict[str, str] = {key: ring.get(key) for key in keys}
+        reordered: HashRing = HashRing(["c", "a", "b"])
+        self.assertEqual(owners, {key: reordered.get(key) for key in keys})
+        for count in Counter(owners.values()).values():
+            self.assertGreater(count, 700)
+
+    def test_membership(self):
+        ring: HashRing = HashRing(["a", "b", "c"])
+        keys: list[str] = [f"room{n}" for n in range(3000)]
+        before: dict[str, str] = {key: ring.get(key) for key in keys}
+        # A new node only takes keys from the others, about a quarter of them
+        self.assertTrue(ring.add("d"))
+        moved: list[str] = [key for key in keys if ring.get(key) != before[key]]
+        self.assertTrue(all(ring.get(key) == "d" for key in moved))
+        self.assertLess(len(moved), 1000)
+        # Removing it again puts every key back
+        self.assertTrue(ring.remove("d"))
+        self.assertFalse(ring.remove("d"))
+        self.assertNotIn("d", ring)
+        self.assertEqual(before, {key: ring.get(key) for key in keys})
+
+
+class RoomRouterTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.servers: list[ThreadingWSGIServer] = []
+        self.backends: list[str] = []
+        for name in ["a", "b"]:
+            server, url = start_backend(name)
+            self.servers.append(server)
+            self.backends.append(url)
+        self.names: dict[str, str] = dict(zip(self.backends, ["a", "b"]))
+        self.router: RoomRouter = RoomRouter(self.backends)
+
+    def tearDown(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def request(self, path: str, query: str = "", method: str = "GET", body: bytes = b"") -> tuple[str, dict]:
+        """
+        Description:    Helper sending a request through the router.
+        :return:        The status and the decoded JSON body.
+        """
+        environ: dict = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_LENGTH": str(len(body)),
+            "CONTENT_TYPE": "application/octet-stream",
+            "wsgi.input": io.BytesIO(body)
+        }
+        status: list[str] = []
+        data: bytes = b"".join(self.router(environ, lambda line, headers: status.append(line)))
+        return status[0], json.loads(data)
+
+    def test_forward(self):
+        for n in range(20):
+            room_id: str = f"room{n}"
+            status, body = self.request("/game/data", f"room_id={room_id.upper()}&player_id=abc")
+            self.assertEqual("200 OK", status)
+            self.assertEqual(self.names[self.router.route(room_id)], body["backend"])
+            self.assertEqual({"room_id": [room_id.upper()], "player_id": ["abc"]}, body["query"])
+        # Requests without a room go to the owner of the default room
+        status, body = self.request("/game/data")
+        self.assertEqual(self.names[self.router.route(DEFAULT_ROOM_ID)], body["backend"])
+        # Bodies are forwarded
+        status, body = self.request("/game/batch", "room_id=abc", method="POST", body=b"data")
+        self.assertEqual(("POST", "data"), (body["method"], body["body"]))
+        # The endpoints used to move rooms can't be reached through the router
+        for path in INTERNAL_PATHS:
+            self.assertEqual("404 Not Found", self.request(path, "room_id=abc")[0])
+
+    def test_create(self):
+        # New rooms get an ID which routes to the backend creating them
+        status, body = self.request("/room/create")
+        room_id: str = body["query"]["room_id"][0]
+        self.assertEqual(ROOM_ID_LENGTH, len(room_id))
+        self.assertEqual(self.names[self.router.route(room_id)], body["backend"])
+
+    def test_list_rooms(self):
+        status, body = self.request("/room/list")
+        self.assertEqual([DEFAULT_ROOM_ID, "room-a", "room-b"], sorted(room["roomId"] for room in body["rooms"]))
+
+    def test_rebalance(self):
+        calls: list[tuple[str, str, str]] = []
+        failing: list[str] = ["room-b"]
+
+        def migrate(room_id: str, source: str, target: str, timeout: float) -> float:
+            # Rooms are still routed to where they are while they are being moved
+            self.assertEqual(source, self.router.route(room_id))
+            calls.append((room_id, source, target))
+            if room_id in failing:
+                raise RuntimeError("Import failed")
+            return 0
+
+        with patch("server.game_logic.room_router.migrate", migrate):
+            # Draining a backend moves its rooms. One which fails to move is logged and keeps being routed to it.
+            with self.assertLogs("server.game_logic.room_router", "ERROR"):
+                self.assertEqual([], self.router.remove_backend(self.backends[1]))
+            self.assertEqual([("room-b", self.backends[1], self.backends[0])], calls)
+            self.assertEqual(self.backends[1], self.router.route("room-b"))
+            self.assertEqual(self.backends[0], self.router.route("room-a"))
+            # Rebalancing retries it, after which it is routed to its owner
+            failing.clear()
+            self.assertEqual(["room-b"], self.router.rebalance([self.backends[1]]))
+            self.assertEqual(self.backends[0], self.router.route("room-b"))
+            # Backends which can't be reached are skipped
+            with self.assertLogs("server.game_logic.room_router", "ERROR"):
+                self.assertEqual([], self.router.rebalance(["http://127.0.0.1:1"]))
+
+    def test_unavailable(self):
+        router: RoomRouter = RoomRouter(["http://127.0.0.1:1"])
+        self.router = router
+        status, body = self.request("/game/data")
+        self.assertEqual("502 Bad Gateway", status)
+        self.router = RoomRouter([])
+        status, body = self.request("/game/data")
+        self.assertEqual("503 Service Unavailable", status)
+
+
+if __name__ == '__main__':
+    unittest.main()
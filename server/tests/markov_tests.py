@@ -0,0 +1,87 @@
+"""
+Description:    Test suite for the Markov chain landing probability analytics.
+Author:         Jordan Bourdeau
+Date:           12/07/23
+"""
+
+from server.game_logic.constants import JAIL_LOCATION, NUM_TILES
+from server.game_logic.game import Game
+from server.game_logic.improvable_tile import ImprovableTile
+from server.game_logic.simulate import AlwaysBuyBot, Simulation
+from server.game_logic.types import PropertyStatus
+
+import unittest
+
+try:
+    import numpy as np
+    from server.game_logic.markov import (NUM_STATES, expected_rents, improvement_costs, improvement_roi,
+                                          landing_probabilities, steady_state, transition_matrix)
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class MarkovTests(unittest.TestCase):
+
+    def test_transition_matrix(self):
+        for card_moves in [False, True]:
+            matrix = transition_matrix(card_moves)
+            self.assertEqual((NUM_STATES, NUM_STATES), matrix.shape)
+            self.assertTrue(np.all(matrix >= 0))
+            self.assertTrue(np.allclose(matrix.sum(axis=1), 1))
+
+    def test_steady_state(self):
+        matrix = transition_matrix()
+        solved = steady_state(matrix, "solve")
+        iterated = steady_state(matrix, "power")
+        self.assertTrue(np.allclose(solved, iterated, atol=1e-9))
+        self.assertTrue(np.allclose(solved @ matrix, solved))
+        with self.assertRaises(ValueError):
+            steady_state(matrix, "bogus")
+
+    def test_landing_probabilities(self):
+        probabilities = landing_probabilities()
+        self.assertEqual((NUM_TILES,), probabilities.shape)
+        self.assertAlmostEqual(1, probabilities.sum())
+        # Nobody stays on Go To Jail and jail is the most likely tile
+        self.assertAlmostEqual(0, probabilities[30])
+        self.assertEqual(JAIL_LOCATION, probabilities.argmax())
+        # Movement cards make Go and jail more likely and the card tiles themselves less likely
+        with_cards = landing_probabilities(card_moves=True)
+        self.assertGreater(with_cards[0], probabilities[0])
+        self.assertGreater(with_cards[JAIL_LOCATION], probabilities[JAIL_LOCATION])
+        self.assertLess(with_cards[36], probabilities[36])
+
+    def test_matches_simulation(self):
+        probabilities = landing_probabilities()
+        landings = np.zeros(NUM_TILES)
+        for seed in range(20):
+            landings += Simulation([AlwaysBuyBot(), AlwaysBuyBot()], seed=seed, max_turns=500).run().landings
+        self.assertTrue(np.allclose(landings / landings.sum(), probabilities, atol=0.01))
+
+    def test_expected_rents(self):
+        probabilities = landing_probabilities()
+        rents = expected_rents(probabilities)
+        self.assertEqual((NUM_TILES, len(PropertyStatus)), rents.shape)
+        self.assertAlmostEqual(probabilities[39] * 2000, rents[39, PropertyStatus.FIVE_IMPROVEMENTS])
+        self.assertEqual(0, rents[0].sum())
+
+        roi = improvement_roi(probabilities)
+        self.assertEqual((NUM_TILES, 5), roi.shape)
+        # Boardwalk's first house adds $100 of rent for $200
+        self.assertAlmostEqual(probabilities[39] * 100 / 200, roi[39, 0])
+        # Railroads and utilities can't be improved
+        self.assertEqual(0, roi[5].sum())
+        self.assertEqual(0, roi[12].sum())
+
+
+    def test_improvement_costs(self):
+        # Read from the board template, so they match the tiles of a game
+        costs = improvement_costs()
+        for tile in Game(headless=True).tiles:
+            expected: int = tile.improvement_cost if isinstance(tile, ImprovableTile) else 0
+            self.assertEqual(expected, costs[tile.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
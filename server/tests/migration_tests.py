@@ -0,0 +1,42 @@
+"""
+Description:    Test suite for moving rooms between server processes.
+Author:         Jordan Bourdeau
+Date:           12/11/23
+"""
+
+from server.game_logic.game import Game
+from server.game_logic.migration import export_room, import_room
+
+import unittest
+
+
+class MigrationTests(unittest.TestCase):
+
+    def test_export_room(self):
+        game: Game = Game(seed=6)
+        id1: str = game.register_player("player1")
+        id2: str = game.register_player("player2")
+        game.start_game(id1)
+        game.flush_events(id1)
+        game.roll_dice(game.active_player_id)
+        game.freeze()
+        data: bytes = export_room(game)
+
+        moved: Game = import_room(data)
+        self.assertFalse(moved.frozen)
+        self.assertEqual(game.to_dict(), moved.to_dict())
+        self.assertEqual(game.command_log, moved.command_log)
+        # Players pick up their events where they left off
+        for player_id in [id1, id2]:
+            self.assertEqual(game.flush_events(player_id), moved.flush_events(player_id))
+        # The moved room keeps playing
+        self.assertTrue(moved.roll_dice(moved.active_player_id) or moved.end_turn(moved.active_player_id))
+
+    def test_invalid(self):
+        data: bytes = export_room(Game())
+        self.assertRaises(ValueError, import_room, b"")
+        self.assertRaises(ValueError, import_room, data[:-5])
+
+
+if __name__ == '__main__':
+    unittest.main()
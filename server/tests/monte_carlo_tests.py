@@ -0,0 +1,52 @@
+"""
+Description:    Test suite for the parallel Monte Carlo runner.
+Author:         Jordan Bourdeau
+Date:           12/06/23
+"""
+
+from server.game_logic.constants import NUM_TILES
+from server.game_logic.monte_carlo import MonteCarloReport, run_monte_carlo, run_shard
+from server.game_logic.simulate import BOTS
+
+import unittest
+
+BOT_NAMES: list[str] = list(BOTS.keys())
+
+
+class MonteCarloTests(unittest.TestCase):
+
+    def test_run_shard(self):
+        report: MonteCarloReport = run_shard(BOT_NAMES, 4, seed=1, max_turns=150)
+        self.assertEqual(4, report.num_games)
+        self.assertEqual(4, sum(report.wins))
+        self.assertLessEqual(report.total_turns, 4 * 150)
+        # Every turn ends with at least one roll
+        self.assertGreaterEqual(sum(report.landings), report.total_turns)
+        self.assertEqual(NUM_TILES, len(report.rent_collected))
+        # Shards are reproducible from their seed
+        self.assertEqual(report.to_dict(), run_shard(BOT_NAMES, 4, seed=1, max_turns=150).to_dict())
+
+    def test_merge(self):
+        report1: MonteCarloReport = run_shard(BOT_NAMES, 2, seed=1, max_turns=100)
+        report2: MonteCarloReport = run_shard(BOT_NAMES, 3, seed=2, max_turns=100)
+        merged: MonteCarloReport = MonteCarloReport(BOT_NAMES)
+        merged.merge(report1)
+        merged.merge(report2)
+        self.assertEqual(5, merged.num_games)
+        self.assertEqual(report1.total_turns + report2.total_turns, merged.total_turns)
+        self.assertEqual([a + b for a, b in zip(report1.landings, report2.landings)], merged.landings)
+        with self.assertRaises(ValueError):
+            merged.merge(MonteCarloReport(BOT_NAMES[:2]))
+
+    def test_run_monte_carlo(self):
+        # The report doesn't depend on the number of workers
+        serial: MonteCarloReport = run_monte_carlo(BOT_NAMES, 6, seed=3, workers=1, max_turns=100, shard_size=2)
+        parallel: MonteCarloReport = run_monte_carlo(BOT_NAMES, 6, seed=3, workers=2, max_turns=100, shard_size=2)
+        self.assertEqual(6, serial.num_games)
+        self.assertEqual(serial.to_dict(), parallel.to_dict())
+        with self.assertRaises(ValueError):
+            run_monte_carlo(["bogus"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
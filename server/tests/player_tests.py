@@ -6,8 +6,12 @@ Date:           10/24/23
 
 from server.game_logic.asset_tile import AssetTile
 from server.game_logic.constants import JAIL_LOCATION, JAIL_TURNS, MAX_ROLL, MIN_ROLL, STARTING_MONEY
+from server.game_logic.improvable_tile import ImprovableTile
 from server.game_logic.player import Player
-from server.game_logic.types import AssetGroups, PlayerStatus
+from server.game_logic.simulate import BOTS, simulate
+from server.game_logic.types import AssetGroups, PlayerStatus, PropertyStatus
+
+from unittest.mock import patch
 
 import unittest
 
@@ -46,6 +50,66 @@ class PlayerTests(unittest.TestCase):
         property.is_mortgaged = True
         self.assertEqual(STARTING_MONEY, player.net_worth)
 
+    def test_net_worth_tracking(self):
+        player1: Player = self.make_player()
+        player2: Player = Player(id="1234567abcdefghi", display_name="Other")
+        property: ImprovableTile = ImprovableTile(id=1, name="Test", price=60, group=AssetGroups.BROWN)
+        property.owner = player1
+        player1.assets.append(property)
+        # Improvements are sold back at half their cost
+        property.status = PropertyStatus.TWO_IMPROVEMENTS
+        self.assertEqual(STARTING_MONEY + 30 + 50, player1.net_worth)
+        self.assertIsInstance(player1.net_worth, int)
+        # The value moves with the tile when it changes hands
+        property.owner = player2
+        player1.assets.remove(property)
+        player2.assets.append(property)
+        self.assertEqual(STARTING_MONEY, player1.net_worth)
+        self.assertEqual(STARTING_MONEY + 80, player2.net_worth)
+
+    def test_group_index(self):
+        player1: Player = self.make_player()
+        player2: Player = Player(id="1234567abcdefghi", display_name="Other")
+        tiles: list[AssetTile] = [AssetTile(id=id, name="Test", price=200, group=AssetGroups.ORANGE) for id in (19, 16)]
+        tiles.append(AssetTile(id=5, name="Test", price=200, group=AssetGroups.RAILROAD))
+        for tile in tiles:
+            tile.owner = player1
+            player1.assets.append(tile)
+        self.assertEqual(2, player1.group_count(AssetGroups.ORANGE))
+        self.assertEqual(0, player1.group_count(AssetGroups.RED))
+        # Tiles are kept in the order they were acquired
+        self.assertEqual(tiles[:2], player1.group_share(AssetGroups.ORANGE))
+        self.assertTrue(player1.owns(tiles[2]))
+        self.assertFalse(player2.owns(tiles[2]))
+        # Transferring a tile moves it between the indices
+        tiles[0].owner = player2
+        self.assertEqual([tiles[1]], player1.group_share(AssetGroups.ORANGE))
+        self.assertTrue(player2.owns(tiles[0]))
+        self.assertEqual(1, player2.group_count(AssetGroups.ORANGE))
+
+    def test_net_worth_invariant(self):
+        # Play whole games checking the tracked net worth against a full recomputation on every read
+        with patch("server.game_logic.player.CHECK_INVARIANTS", True):
+            simulate(list(BOTS.values()), 5, seed=3, max_turns=300)
+
+    def test_to_dict_cache(self):
+        player: Player = self.make_player()
+        state: dict = player.to_dict()
+        self.assertIs(state, player.to_dict())
+        # Every serialized state variable invalidates the cached dictionary
+        for attribute, value in [("money", 1), ("location", 5), ("doubles_streak", 1), ("jail_cards", 1),
+                                 ("turns_in_jail", 2), ("status", PlayerStatus.BANKRUPT)]:
+            setattr(player, attribute, value)
+            new_state: dict = player.to_dict()
+            self.assertIsNot(state, new_state)
+            state = new_state
+        self.assertEqual(1, state["money"])
+        self.assertEqual(5, state["location"])
+        self.assertEqual(1, state["doublesStreak"])
+        self.assertEqual(1, state["getOutOfJailFreeCards"])
+        self.assertEqual(2, state["turnsInJail"])
+        self.assertFalse(state["active"])
+
 
 if __name__ == '__main__':
     unittest.main()
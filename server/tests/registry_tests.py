@@ -0,0 +1,136 @@
+"""
+Description:    Test suite for the GameRegistry class managing multiple rooms.
+Author:         Jordan Bourdeau
+Date:           11/27/23
+"""
+
+from server.game_logic.constants import DEFAULT_ROOM_ID, ROOM_ID_LENGTH
+from server.game_logic.game import Game
+from server.game_logic.game_registry import GameRegistry
+
+import unittest
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class GameRegistryTests(unittest.TestCase):
+
+    def test_create(self):
+        registry: GameRegistry = GameRegistry(max_rooms=3)
+        room_id: str = registry.create()
+        self.assertEqual(ROOM_ID_LENGTH, len(room_id))
+        self.assertIn(room_id, registry)
+        self.assertTrue(isinstance(registry.get(room_id), Game))
+        # Explicit room IDs can't be reused
+        self.assertEqual("test", registry.create("test"))
+        self.assertEqual("", registry.create("test"))
+        # Rooms are independent Game objects
+        self.assertIsNot(registry.get(room_id), registry.get("test"))
+        registry.get(room_id).register_player("player1")
+        self.assertEqual(0, len(registry.get("test").players))
+        # Can't go beyond the room cap
+        self.assertNotEqual("", registry.create())
+        self.assertEqual("", registry.create())
+        self.assertEqual(3, len(registry))
+
+    def test_get(self):
+        registry: GameRegistry = GameRegistry()
+        self.assertIsNone(registry.get("bogus"))
+        registry.create(DEFAULT_ROOM_ID, pinned=True)
+        self.assertIsNotNone(registry.get(DEFAULT_ROOM_ID))
+
+    def test_close(self):
+        registry: GameRegistry = GameRegistry()
+        room_id: str = registry.create()
+        registry.create(DEFAULT_ROOM_ID, pinned=True)
+        self.assertFalse(registry.close("bogus"))
+        self.assertTrue(registry.close(room_id))
+        self.assertIsNone(registry.get(room_id))
+        self.assertFalse(registry.close(room_id))
+        # Pinned rooms can't be closed
+        self.assertFalse(registry.close(DEFAULT_ROOM_ID))
+        self.assertIn(DEFAULT_ROOM_ID, registry)
+
+    def test_list_rooms(self):
+        registry: GameRegistry = GameRegistry()
+        self.assertEqual([], registry.list_rooms())
+        room_id: str = registry.create()
+        registry.get(room_id).register_player("player1")
+        expected: list[dict] = [{"roomId": room_id, "numPlayers": 1, "started": False}]
+        self.assertEqual(expected, registry.list_rooms())
+
+    def test_evict_idle(self):
+        clock: FakeClock = FakeClock()
+        registry: GameRegistry = GameRegistry(ttl=10, clock=clock)
+        registry.create(DEFAULT_ROOM_ID, pinned=True)
+        room1: str = registry.create()
+        clock.now = 5
+        room2: str = registry.create()
+        # Nothing is idle yet
+        self.assertEqual([], registry.evict_idle())
+        # Accessing a room resets its time to live
+        clock.now = 9
+        registry.get(room1)
+        clock.now = 16
+        self.assertEqual([room2], registry.evict_idle())
+        self.assertIsNone(registry.get(room2))
+        self.assertIsNotNone(registry.get(room1))
+        # Pinned rooms are never evicted
+        clock.now = 100
+        self.assertEqual([room1], registry.evict_idle())
+        self.assertIsNotNone(registry.get(DEFAULT_ROOM_ID))
+        self.assertEqual(1, len(registry))
+
+    def test_get_expired(self):
+        clock: FakeClock = FakeClock()
+        registry: GameRegistry = GameRegistry(ttl=10, clock=clock)
+        room1: str = registry.create()
+        clock.now = 5
+        room2: str = registry.create()
+        # An expired room isn't returned (or brought back to life) even if no sweep has run
+        clock.now = 12
+        self.assertIsNone(registry.get(room1))
+        self.assertNotIn(room1, registry)
+        self.assertIsNotNone(registry.get(room2))
+        clock.now = 30
+        self.assertIsNone(registry.get(room2))
+        self.assertEqual(0, len(registry))
+
+    def test_migration(self):
+        source: GameRegistry = GameRegistry()
+        target: GameRegistry = GameRegistry(max_rooms=1)
+        source.create(DEFAULT_ROOM_ID, pinned=True)
+        room_id: str = source.create()
+        game: Game = source.get(room_id)
+        # Pinned rooms can't be moved and rooms have to be frozen before they are released
+        self.assertIsNone(source.freeze(DEFAULT_ROOM_ID))
+        self.assertIsNone(source.freeze("bogus"))
+        self.assertFalse(source.release(room_id, "http://target"))
+        self.assertIs(game, source.freeze(room_id))
+        self.assertTrue(game.frozen)
+        self.assertTrue(source.thaw(room_id))
+        self.assertFalse(game.frozen)
+        self.assertFalse(source.thaw("bogus"))
+
+        source.freeze(room_id)
+        self.assertTrue(target.adopt(room_id, Game()))
+        self.assertFalse(target.adopt(room_id, Game()))
+        # The target is full
+        self.assertFalse(target.adopt("other", Game()))
+        self.assertTrue(source.release(room_id, "http://target"))
+        self.assertNotIn(room_id, source)
+        self.assertEqual("http://target", source.redirect(room_id))
+        self.assertIsNone(source.redirect(DEFAULT_ROOM_ID))
+        # Moving the room back clears the redirect
+        self.assertTrue(source.adopt(room_id, Game()))
+        self.assertIsNone(source.redirect(room_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Description:    Test suite for the command log and replay engine.
+Author:         Jordan Bourdeau
+Date:           12/08/23
+"""
+
+from server.game_logic.command_log import CommandLog
+from server.game_logic.game import Game
+from server.game_logic.replay import replay
+from server.game_logic.roll import Roll
+from server.game_logic.simulate import AlwaysBuyBot, CashThresholdBot, MonopolySeekerBot, Simulation
+from server.game_logic.types import JailMethod
+
+import unittest
+
+
+class ReplayTests(unittest.TestCase):
+
+    def test_command_log(self):
+        log: CommandLog = CommandLog(7)
+        log.append("register_player", "player1", "abc")
+        log.append("roll_dice", "abc", 3, 4, True)
+        log.append("mortgage", "abc", 1, False)
+        self.assertEqual(3, len(log))
+        self.assertEqual([("roll_dice", "abc", 3, 4, True), ("mortgage", "abc", 1, False)], log.since(1))
+        self.assertEqual(log, CommandLog.loads(log.dumps()))
+        self.assertNotEqual(log, CommandLog(8, list(log.commands)))
+
+    def test_game_log(self):
+        game: Game = Game(seed=3)
+        registered: list[str] = [game.register_player("player1"), game.register_player("player2")]
+        # Rejected commands aren't logged
+        self.assertFalse(game.end_turn(registered[0]))
+        self.assertTrue(game.start_game(registered[0]))
+        id1: str = game.turn_order[0]
+        self.assertTrue(game.roll_dice(id1, Roll(1, 2)))
+        self.assertTrue(game.buy_property(id1, 3))
+        self.assertTrue(game.mortgage(id1, 3, True))
+        self.assertTrue(game.end_turn(id1))
+        self.assertEqual(3, game.command_log.seed)
+        self.assertEqual([
+            ("register_player", "player1", registered[0]),
+            ("register_player", "player2", registered[1]),
+            ("start_game", registered[0]),
+            ("roll_dice", id1, 1, 2, False),
+            ("buy_property", id1, 3),
+            ("mortgage", id1, 3, True),
+            ("end_turn", id1)
+        ], game.command_log.commands)
+
+    def test_replay(self):
+        game: Game = Game(seed=11)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        for turn in range(40):
+            player_id: str = game.active_player_id
+            player = game.players[player_id]
+            if player.in_jail:
+                game.get_out_of_jail(player_id, JailMethod.MONEY)
+            # Mix rolls from the game's generator with ones passed in
+            game.roll_dice(player_id, Roll(2, 3) if turn % 5 == 0 else None)
+            if game.active_player_id == player_id:
+                game.buy_property(player_id, player.location)
+                game.end_turn(player_id)
+        game.reset(id1)
+        rebuilt: Game = replay(CommandLog.loads(game.command_log.dumps()))
+        self.assertEqual(game.command_log, rebuilt.command_log)
+        self.assertEqual(game.to_dict(), rebuilt.to_dict())
+        self.assertFalse(rebuilt.headless)
+        # Nothing was enqueued during the replay, but the history starts from a checkpoint of the rebuilt state
+        self.assertEqual(0, len(rebuilt.event_history))
+        self.assertEqual(rebuilt.to_dict(), rebuilt.get_history()["checkpoint"])
+
+    def test_replay_rejected_roll(self):
+        game: Game = Game(seed=3)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        for turn in range(6):
+            player_id: str = game.active_player_id
+            if game.players[player_id].in_jail:
+                game.get_out_of_jail(player_id, JailMethod.MONEY)
+            game.roll_dice(player_id)
+            if game.active_player_id == player_id:
+                # Rolling again without doubles is rejected and must not draw from the game's generator
+                if not game.players[player_id].roll_again:
+                    self.assertFalse(game.roll_dice(player_id))
+                game.end_turn(player_id)
+        rebuilt: Game = replay(game.command_log)
+        self.assertEqual(game.to_dict(), rebuilt.to_dict())
+
+    def test_replay_simulation(self):
+        simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(), MonopolySeekerBot()], seed=5,
+                                            max_turns=200)
+        simulation.run()
+        rebuilt: Game = replay(simulation.game.command_log, record_history=False, headless=True)
+        self.assertEqual(simulation.game.to_dict(), rebuilt.to_dict())
+
+    def test_diverged(self):
+        game: Game = Game(seed=1)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.start_game(id1)
+        game.roll_dice(game.active_player_id)
+        log: CommandLog = CommandLog.loads(game.command_log.dumps())
+        # Tampering with a generated roll is caught
+        name, player_id, first, second, generated = log.commands[-1]
+        log.commands[-1] = (name, player_id, first % 6 + 1, second, generated)
+        self.assertRaises(ValueError, replay, log)
+        # So is an unknown command or one which is rejected
+        self.assertRaises(ValueError, replay, CommandLog(1, [("teleport", id1)]))
+        self.assertRaises(ValueError, replay, CommandLog(1, [("end_turn", id1)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
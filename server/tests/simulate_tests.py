@@ -0,0 +1,79 @@
+"""
+Description:    Test suite for the headless simulation engine and its bots.
+Author:         Jordan Bourdeau
+Date:           12/05/23
+"""
+
+from server.game_logic.asset_tile import AssetTile
+from server.game_logic.player_updates import BuyUpdate, MoneyUpdate
+from server.game_logic.simulate import (AlwaysBuyBot, BOTS, CashThresholdBot, MonopolySeekerBot, Simulation,
+                                        SimulationResult, simulate)
+from server.game_logic.types import PlayerStatus, PropertyStatus
+
+import unittest
+
+
+class SimulateTests(unittest.TestCase):
+
+    def test_simulation(self):
+        simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(), MonopolySeekerBot()], seed=0,
+                                            max_turns=300)
+        result: SimulationResult = simulation.run()
+        game = simulation.game
+        # Nothing was enqueued or logged since the game is headless
+        self.assertEqual(0, len(game.event_history))
+        for player in simulation.players:
+            self.assertEqual([], game.event_queue[player.id])
+        self.assertLessEqual(result.turns, 300)
+        self.assertEqual(["always_buy", "cash_threshold", "monopoly_seeker"], result.bot_names)
+        self.assertIn(result.winner, range(3))
+        # Every turn ended cleanly and ownership is consistent
+        for player in simulation.players:
+            self.assertNotEqual(PlayerStatus.IN_THE_HOLE, player.status)
+            for asset in player.assets:
+                self.assertIs(player, asset.owner)
+        for tile in game.tiles:
+            if isinstance(tile, AssetTile) and tile.owner is not None:
+                self.assertIn(tile, tile.owner.assets)
+
+    def test_bots(self):
+        simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(threshold=300)], seed=0)
+        game = simulation.game
+        player1, player2 = simulation.players
+        tile: AssetTile = game.tiles[39]
+        self.assertTrue(AlwaysBuyBot().should_buy(game, player1, tile))
+        # Boardwalk would take the bot below its reserve
+        self.assertFalse(CashThresholdBot(threshold=1200).should_buy(game, player2, tile))
+        self.assertTrue(CashThresholdBot(threshold=1000).should_buy(game, player2, tile))
+        # The monopoly seeker won't buy into a group someone else has a stake in
+        game.tiles[37].owner = player2
+        self.assertFalse(MonopolySeekerBot().should_buy(game, player1, tile))
+        self.assertTrue(MonopolySeekerBot().should_buy(game, player2, tile))
+        self.assertTrue(MonopolySeekerBot().should_buy(game, player1, game.tiles[5]))
+
+    def test_liquidate(self):
+        simulation: Simulation = Simulation([AlwaysBuyBot(), AlwaysBuyBot()], seed=0)
+        game = simulation.game
+        game.start_game(simulation.players[0].id)
+        player = game.players[game.active_player_id]
+        for tile_id in [1, 3, 5]:
+            player.update(BuyUpdate(game.tiles[tile_id]))
+        # Improvements can't be sold while another tile in the group is mortgaged
+        game.tiles[1].status = PropertyStatus.THREE_IMPROVEMENTS
+        game.tiles[3].mortgage()
+        player.update(MoneyUpdate(-player.money - 10))
+        self.assertEqual(PlayerStatus.IN_THE_HOLE, player.status)
+        simulation._liquidate(player)
+        self.assertEqual(PlayerStatus.GOOD, player.status)
+        self.assertGreaterEqual(player.money, 0)
+
+    def test_simulate(self):
+        results: list[SimulationResult] = simulate(list(BOTS.values()), 3, seed=1, max_turns=200)
+        self.assertEqual(3, len(results))
+        for result in results:
+            self.assertEqual(3, len(result.net_worths))
+            self.assertEqual(3, len(result.bankrupt))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Description:    Test suite for binary Game snapshots.
+Author:         Jordan Bourdeau
+Date:           12/10/23
+"""
+
+from server.game_logic.constants import SNAPSHOT_FORMAT_VERSION
+from server.game_logic.deck import Deck
+from server.game_logic.game import Game
+from server.game_logic.roll import Roll
+from server.game_logic.simulate import AlwaysBuyBot, CashThresholdBot, MonopolySeekerBot, Simulation
+from server.game_logic.snapshot import _HEADER, _PLAYER, _TILES, MAGIC, from_bytes, to_bytes
+
+import json
+import unittest
+
+
+def play(game: Game, turns: int) -> None:
+    """
+    Description:    Helper which plays turns where everyone buys what they land on and leaves jail right away.
+    :param game:    Game to play.
+    :param turns:   Number of turns to play.
+    :return:        None.
+    """
+    for _ in range(turns):
+        player_id: str = game.active_player_id
+        player = game.players[player_id]
+        if player.in_jail:
+            game.get_out_of_jail(player_id, 1)
+        game.roll_dice(player_id)
+        if game.active_player_id == player_id:
+            game.buy_property(player_id, player.location)
+            game.end_turn(player_id)
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def assertDecksEqual(self, expected: Deck, actual: Deck) -> None:
+        self.assertEqual([expected.cards.index(card) for card in expected.stack],
+                         [actual.cards.index(card) for card in actual.stack])
+        self.assertEqual([expected.cards.index(card) for card in expected.discard],
+                         [actual.cards.index(card) for card in actual.discard])
+        self.assertEqual([card.in_use for card in expected.cards], [card.in_use for card in actual.cards])
+
+    def test_round_trip(self):
+        simulation: Simulation = Simulation([AlwaysBuyBot(), CashThresholdBot(), MonopolySeekerBot()], seed=9,
+                                            max_turns=150)
+        simulation.run()
+        game: Game = simulation.game
+        data: bytes = to_bytes(game)
+        self.assertEqual(MAGIC, data[:4])
+        self.assertEqual(SNAPSHOT_FORMAT_VERSION, data[4])
+        # Much smaller than the JSON state
+        self.assertLess(len(data) * 4, len(json.dumps(game.to_dict(), separators=(",", ":"))))
+
+        restored: Game = from_bytes(data)
+        self.assertEqual(game.to_dict(), restored.to_dict())
+        self.assertEqual(game.seed, restored.seed)
+        self.assertEqual(game.turn_order, restored.turn_order)
+        self.assertEqual(game.active_player_id, restored.active_player_id)
+        self.assertEqual(game.rolled_this_turn, restored.rolled_this_turn)
+        self.assertEqual((game.last_roll.first, game.last_roll.second),
+                         (restored.last_roll.first, restored.last_roll.second))
+        self.assertEqual(game._player_versions, restored._player_versions)
+        self.assertEqual(game._tile_versions, restored._tile_versions)
+        self.assertDecksEqual(game.chance_deck, restored.chance_deck)
+        self.assertDecksEqual(game.community_chest_deck, restored.community_chest_deck)
+        for player in game.players.values():
+            self.assertEqual([asset.id for asset in player.assets],
+                             [asset.id for asset in restored.players[player.id].assets])
+            for asset in restored.players[player.id].assets:
+                self.assertIs(restored.players[player.id], asset.owner)
+        # The card tiles see the restored players
+        self.assertEqual(list(restored.players.values()), restored.tiles[2].players)
+        # Without the command log only the seed carries over
+        self.assertEqual(0, len(restored.command_log))
+        self.assertEqual(game.command_log, from_bytes(to_bytes(game, include_commands=True)).command_log)
+
+    def test_continue(self):
+        # A restored game keeps playing exactly like the original since the generator state carries over
+        game: Game = Game(seed=4)
+        id1: str = game.register_player("player1")
+        game.register_player("player2")
+        game.register_player("player3")
+        game.start_game(id1)
+        play(game, 30)
+        game.roll_dice(game.active_player_id, Roll(1, 1))
+        restored: Game = from_bytes(to_bytes(game))
+        self.assertTrue(restored.players[game.active_player_id].roll_again)
+        # Clients can catch up from a checkpoint of the restored state
+        self.assertEqual(restored.to_dict(), restored.get_history()["checkpoint"])
+        for id in restored.players:
+            self.assertEqual([], restored.event_queue[id])
+        play(game, 30)
+        play(restored, 30)
+        self.assertEqual(game.to_dict(), restored.to_dict())
+        self.assertDecksEqual(game.chance_deck, restored.chance_deck)
+
+    def test_empty(self):
+        game: Game = Game(seed=1)
+        restored: Game = from_bytes(to_bytes(game))
+        self.assertEqual(game.to_dict(), restored.to_dict())
+        self.assertIsNone(restored.last_roll)
+        self.assertEqual("", restored.active_player_id)
+
+    def test_invalid(self):
+        data: bytes = to_bytes(Game())
+        self.assertRaises(ValueError, from_bytes, b"JUNK" + data[4:])
+        self.assertRaises(ValueError, from_bytes, data[:4] + bytes([SNAPSHOT_FORMAT_VERSION + 1]) + data[5:])
+        self.assertRaises(ValueError, from_bytes, data[:-10])
+
+    def test_out_of_range(self):
+        game: Game = Game(seed=2)
+        id1: str = game.register_player("p1")
+        id2: str = game.register_player("p2")
+        game.start_game(id1)
+        game.tiles[1].owner = game.players[id1]
+        game.players[id1].assets.append(game.tiles[1])
+        data: bytearray = bytearray(to_bytes(game))
+        # Offsets of the first player's asset, the turn order, and the chance deck's stack
+        asset: int = _HEADER.size + 1 + len(id1) + 2 + len("p1") + _PLAYER.size
+        turn_order: int = asset + 1 + 1 + len(id2) + 2 + len("p2") + _PLAYER.size
+        stack: int = turn_order + 2 + _TILES.size + 1
+        # Indices past the end of what they index (or at a tile which can't be owned) are rejected as invalid
+        for offset, value in ((asset, 40), (asset, 0), (turn_order, 2), (stack, 200)):
+            corrupt: bytearray = bytearray(data)
+            corrupt[offset] = value
+            self.assertRaises(ValueError, from_bytes, bytes(corrupt))
+        self.assertEqual(game.to_dict(), from_bytes(bytes(data)).to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
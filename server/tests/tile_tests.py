@@ -7,7 +7,8 @@ Date:           11/5/23
 from server.game_logic.asset_tile import AssetTile
 from server.game_logic.cards import Card
 from server.game_logic.card_tile import CardTile
-from server.game_logic.constants import JAIL_LOCATION, JAIL_TURNS, GO_MONEY, STARTING_MONEY
+from server.game_logic.constants import (JAIL_LOCATION, JAIL_TURNS, GO_MONEY, NUM_TILES, RENT_TABLE, RENT_TABLE_WIDTH,
+                                         RENTS, STARTING_MONEY)
 from server.game_logic.deck import Deck
 from server.game_logic.go_to_jail_tile import GoToJailTile
 from server.game_logic.improvable_tile import ImprovableTile
@@ -92,6 +93,29 @@ class TileTests(unittest.TestCase):
             self.assertEqual(100, tile.liquid_value)
             self.assertFalse(tile.is_mortgaged)
 
+    def test_to_dict_cache(self):
+        tile: ImprovableTile = ImprovableTile(id=1, name="Mediterranean Avenue", price=60, group=AssetGroups.BROWN)
+        player: Player = self.make_player1()
+        # Cached dictionary is reused until something changes
+        state: dict = tile.to_dict()
+        self.assertIs(state, tile.to_dict())
+        self.assertEqual(0, state["rent"])
+        # Changing the owner, status, or mortgage rebuilds the dictionary and dirties the owner
+        tile.owner = player
+        player.assets.append(tile)
+        self.assertIsNot(state, tile.to_dict())
+        self.assertEqual(player.id, tile.to_dict()["owner"])
+        self.assertEqual(2, tile.to_dict()["rent"])
+        player_state: dict = player.to_dict()
+        self.assertIs(player_state, player.to_dict())
+        tile.status = PropertyStatus.MONOPOLY
+        self.assertEqual("MONOPOLY", tile.to_dict()["status"])
+        self.assertIsNot(player_state, player.to_dict())
+        self.assertEqual("MONOPOLY", player.to_dict()["assets"][0]["status"])
+        tile.mortgage()
+        self.assertTrue(tile.to_dict()["isMortgaged"])
+        self.assertTrue(player.to_dict()["assets"][0]["isMortgaged"])
+
     def test_go_to_jail_tile(self):
         tile: GoToJailTile = GoToJailTile()
         player: Player = self.make_player1()
@@ -206,6 +230,16 @@ class TileTests(unittest.TestCase):
         self.assertEqual(UtilityStatus.MONOPOLY, electric_company.status)
         self.assertEqual(UtilityStatus.MONOPOLY, water_works.status)
 
+    def test_rent_table(self):
+        self.assertEqual(NUM_TILES, len(RENT_TABLE))
+        for tile_id, rents in enumerate(RENT_TABLE):
+            self.assertEqual(RENT_TABLE_WIDTH, len(rents))
+            for status, rent in enumerate(rents):
+                self.assertEqual(RENTS.get(tile_id, {}).get(status, -1), rent)
+        # Railroads and utilities are covered too
+        self.assertEqual(200, RENT_TABLE[35][RailroadStatus.FOUR_OWNED])
+        self.assertEqual(10, RENT_TABLE[28][UtilityStatus.MONOPOLY])
+
     def test_tax_tile(self):
         tile: TaxTile = TaxTile(4, "Income Tax", -200)
         player: Player = self.make_player1()